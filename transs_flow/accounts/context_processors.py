@@ -1,8 +1,13 @@
-from .models import PasswordChangeRequest
+from django.utils.functional import SimpleLazyObject
+
+from .models import pending_password_request_count
+
 
 def admin_notifications(request):
-    if request.user.is_authenticated and (request.user.is_superuser or getattr(request.user, "role", "") == "admin"):
-        pending_count = PasswordChangeRequest.objects.filter(status="pending").count()
+    # Lazy: the count is only read (from the cache, or one COUNT) when a template shows it.
+    user = request.user
+    if user.is_authenticated and (user.is_superuser or getattr(user, "role", "").upper() == "ADMIN"):
+        pending_count = SimpleLazyObject(pending_password_request_count)
     else:
         pending_count = 0
 
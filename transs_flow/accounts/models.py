@@ -1,6 +1,9 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
-from django.db import models
+from django.db import models, router, transaction
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
 
@@ -101,3 +104,26 @@ class PasswordChangeRequest(models.Model):
 
     def __str__(self):
         return f"Password request for {self.employee_id} - {self.full_name} ({self.status})"
+
+
+PENDING_PASSWORD_REQUESTS_CACHE_KEY = "accounts:pending_password_requests"
+PENDING_PASSWORD_REQUESTS_TTL = 60 * 60  # safety net for bulk updates that send no signals
+
+
+def pending_password_request_count():
+    """Number of pending password change requests, from the cache when possible"""
+    count = cache.get(PENDING_PASSWORD_REQUESTS_CACHE_KEY)
+    if count is None:
+        count = PasswordChangeRequest.objects.filter(status=PasswordChangeRequest.STATUS_PENDING).count()
+        cache.set(PENDING_PASSWORD_REQUESTS_CACHE_KEY, count, PENDING_PASSWORD_REQUESTS_TTL)
+    return count
+
+
+@receiver(post_save, sender=PasswordChangeRequest)
+@receiver(post_delete, sender=PasswordChangeRequest)
+def invalidate_pending_password_request_count(sender, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(
+        lambda: cache.delete(PENDING_PASSWORD_REQUESTS_CACHE_KEY), using=router.db_for_write(sender)
+    )
@@ -1,3 +1,41 @@
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Employee, PasswordChangeRequest, pending_password_request_count
+
+
+class PendingPasswordRequestCountTests(TestCase):
+    databases = "__all__"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Employee.objects.create_user(employee_id="E1001", full_name="Test Inspector", password="x")
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_cached_until_a_request_changes(self):
+        self.assertEqual(pending_password_request_count(), 0)
+        with self.assertNumQueries(0, using="accountsdb"):
+            self.assertEqual(pending_password_request_count(), 0)
+
+        with self.captureOnCommitCallbacks(using="accountsdb", execute=False) as callbacks:
+            request = PasswordChangeRequest.objects.create(user=self.user)
+        # Not cleared before the transaction commits
+        self.assertEqual(pending_password_request_count(), 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(pending_password_request_count(), 1)
+
+        with self.captureOnCommitCallbacks(using="accountsdb", execute=True):
+            request.status = PasswordChangeRequest.STATUS_COMPLETED
+            request.save()
+        self.assertEqual(pending_password_request_count(), 0)
+
+    def test_delete_clears_the_count(self):
+        request = PasswordChangeRequest.objects.create(user=self.user)
+        self.assertEqual(pending_password_request_count(), 1)
+        with self.captureOnCommitCallbacks(using="accountsdb", execute=True):
+            request.delete()
+        self.assertEqual(pending_password_request_count(), 0)
@@ -4,8 +4,6 @@ from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden
 from django.contrib import messages
 from django.utils import timezone
-from django.http import HttpResponse
-import csv
 from datetime import timedelta
 from django.db.models import Avg
 from django.db.models import F, ExpressionWrapper, DurationField
@@ -17,6 +15,7 @@ from .forms import (
     AdminPasswordChangeForm,
 )
 from .models import Employee, PasswordChangeRequest
+from core.exports import streaming_export
 
 # ----------------- Auth -----------------
 def login_view(request):
@@ -232,12 +231,12 @@ def password_request_list(request):
     # Pending Requests Today
     # -------------------------------
     pending_today = PasswordChangeRequest.objects.filter(
-        status="pending",
+        status=PasswordChangeRequest.STATUS_PENDING,
         created_at__date=today
     ).count()
 
     pending_yesterday = PasswordChangeRequest.objects.filter(
-        status="pending",
+        status=PasswordChangeRequest.STATUS_PENDING,
         created_at__date=yesterday
     ).count()
 
@@ -349,21 +348,17 @@ def admin_change_user_password(request, pk):
     )
     
     
+@login_required
 def export_password_requests(request):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="password_requests.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(['Employee ID', 'Email', 'Status', 'Created At'])
-
-    requests = PasswordChangeRequest.objects.all().order_by('-created_at')
-
-    for req in requests:
-        writer.writerow([
-            req.user.employee_id,
-            req.user.email,
-            req.status,
-            req.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-        ])
+    if not (request.user.is_superuser or getattr(request.user, "role", "").lower() == "admin"):
+        return HttpResponseForbidden("You are not authorized to view this page.")
 
-    return response
\ No newline at end of file
+    # One joined query instead of a user lookup per request
+    rows = PasswordChangeRequest.objects.order_by('-created_at').values_list(
+        'user__employee_id', 'user__email', 'status', 'created_at'
+    )
+    return streaming_export(
+        ['Employee ID', 'Email', 'Status', 'Created At'],
+        rows.iterator(chunk_size=2000),
+        'password_requests',
+    )
@@ -8,6 +8,7 @@ from .models import (
     BTBFitmentChecksheet,
     AssDummyTest,
     IPQCDisassembleCheckList,
+    BitableOutbox,
 )
 
 # --- IPQC Work Info ---
@@ -61,3 +62,10 @@ class IPQCDisassembleCheckListAdmin(admin.ModelAdmin):
     list_display = ('date', 'shift', 'emp_id', 'name', 'line', 'model', 'color')
     list_filter = ('shift', 'line', 'model')
     search_fields = ('emp_id', 'name', 'model')
+
+# --- Lark Bitable Outbox ---
+@admin.register(BitableOutbox)
+class BitableOutboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'model_label', 'object_id', 'action', 'table_id', 'status', 'attempts', 'next_attempt_at', 'created_at')
+    list_filter = ('status', 'action', 'model_label')
+    search_fields = ('model_label', 'table_id', 'last_error')
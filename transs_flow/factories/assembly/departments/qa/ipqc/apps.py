@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class IpqcConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'factories.assembly.departments.qa.ipqc'
+
+    def ready(self):
+        # Compile the Bitable field mappings once at startup.
+        from . import bitable_mapping  # noqa: F401
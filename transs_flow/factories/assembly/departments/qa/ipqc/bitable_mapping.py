@@ -0,0 +1,704 @@
+"""
+Declarative Lark Bitable column mappings for the synced IPQC models.
+
+Each mapping lists, once, the Bitable column, the model field it comes from
+and the converter applied to the value. ``register()`` compiles a mapping
+into two serializers: ``serialize(instance)`` for saved model instances and
+``serialize_row(row)`` for ``.values()`` dicts, so bulk paths such as
+``serialize_queryset()`` never instantiate models.
+
+File fields are declared separately as ``Attachment``s: their content is
+uploaded through the media API and the Bitable attachment columns are
+filled in afterwards by the outbox worker (see ``outbox.send_attachments``).
+Columns edited on the Lark side are declared as ``PullColumn``s and copied
+back by ``manage.py pull_bitable_changes``.
+"""
+import hashlib
+import math
+import re
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+from operator import attrgetter, itemgetter
+
+import pytz
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from .models import (
+    IPQCWorkInfo, BTBFitmentChecksheet, AssDummyTest, IPQCDisassembleCheckList, IPQCAssemblyAudit,
+    NCIssueTracking, ESDComplianceChecklist, DustCountCheck, TestingFirstArticleInspection,
+)
+
+
+# ---------------------------------------------------------------------------
+# Converters
+# ---------------------------------------------------------------------------
+
+def date_to_ms(date_obj):
+    """Convert datetime.date or ISO date string to milliseconds since epoch (IST)"""
+    ist = pytz.timezone('Asia/Kolkata')
+
+    if isinstance(date_obj, str):
+        # Convert ISO string to date object
+        date_obj = datetime.strptime(date_obj, "%Y-%m-%d").date()
+
+    ist_datetime = ist.localize(datetime.combine(date_obj, datetime.min.time()))
+    return int(ist_datetime.timestamp() * 1000)
+
+
+def safe_int(val):
+    """Convert value to integer safely."""
+    try:
+        return int(val or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def text(value):
+    return value or ""
+
+
+def raw(value):
+    return value
+
+
+def to_str(value):
+    return str(value)
+
+
+def yes_no(value):
+    return "Yes" if value else "No"
+
+
+def date_ms(value):
+    return date_to_ms(value)
+
+
+def optional_date_ms(value):
+    return date_to_ms(value) if value else ""
+
+
+def file_url(value):
+    # FieldFile on instances, the stored name in .values() rows
+    return default_storage.url(str(value)) if value else ""
+
+
+integer = safe_int
+
+
+def cell_value(value):
+    """
+    Flatten a Bitable cell to a comparable string. Text cells come back from
+    the API as lists of segments, links as dicts and numbers possibly as floats.
+    """
+    if isinstance(value, list):
+        return "".join(
+            (part.get("text") or part.get("name") or "") if isinstance(part, dict) else str(part) for part in value
+        )
+    if isinstance(value, dict):
+        return str(value.get("link") or value.get("text") or "")
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return "" if value is None else str(value)
+
+
+_NUMBER_TEXT = re.compile(r"-?\d+(\.\d+)?")
+
+
+def digest_value(value):
+    """
+    ``cell_value()`` with numbers in one canonical form, so the Decimal("1.50")
+    or "1.50" serialized locally and the 1.5 Bitable returns compare equal.
+    """
+    if isinstance(value, float) and math.isfinite(value):
+        value = Decimal(repr(value))
+    text = cell_value(value)
+    if _NUMBER_TEXT.fullmatch(text):
+        number = Decimal(text)
+        text = "0" if number == 0 else format(number.normalize(), "f")
+    return text
+
+
+def fields_digest(fields, columns=None):
+    """
+    8-byte digest of a record's fields, comparable between a local
+    serialization and the record returned by Bitable (which omits empty cells).
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for name in sorted(columns if columns is not None else fields):
+        value = digest_value(fields.get(name))
+        if value:
+            digest.update(f"{name}\x00{value}\x01".encode())
+    return digest.digest()
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+Column = namedtuple("Column", ["name", "field", "converter"], defaults=[text])
+Attachment = namedtuple("Attachment", ["name", "field"])
+PullColumn = namedtuple("PullColumn", ["name", "field", "parser"], defaults=[cell_value])
+
+
+class BitableMapping:
+    def __init__(self, model, columns, attachments=(), pull=()):
+        self.model = model
+        self.label = model._meta.label_lower
+        self.columns = tuple(columns)
+        self.attachments = tuple(attachments)
+        self.pull = tuple(pull)
+        self.fields = tuple(dict.fromkeys(column.field for column in self.columns))
+        self.column_names = tuple(column.name for column in self.columns)
+
+        plan = tuple((c.name, attrgetter(c.field), c.converter) for c in self.columns)
+        row_plan = tuple((c.name, itemgetter(c.field), c.converter) for c in self.columns)
+
+        def serialize(instance):
+            return {name: convert(get(instance)) for name, get, convert in plan}
+
+        def serialize_row(row):
+            return {name: convert(get(row)) for name, get, convert in row_plan}
+
+        def serialize_columns(instance, column_names):
+            wanted = set(column_names)
+            return {name: convert(get(instance)) for name, get, convert in plan if name in wanted}
+
+        self.serialize = serialize
+        self.serialize_row = serialize_row
+        self.serialize_columns = serialize_columns
+
+    def columns_for_fields(self, field_names):
+        """Bitable columns fed by any of the given model fields"""
+        return [column.name for column in self.columns if column.field in field_names]
+
+    @property
+    def table_id(self):
+        return getattr(settings, self.model.bitable_table_setting, None)
+
+    def serialize_queryset(self, queryset, extra=(), chunk_size=2000):
+        """
+        Yield (row, fields) for every row of ``queryset`` straight from
+        ``.values()``; ``row`` holds "pk" plus any ``extra`` model fields.
+        """
+        extra = tuple(extra)
+        for row in queryset.values("pk", *extra, *self.fields).iterator(chunk_size=chunk_size):
+            yield {key: row[key] for key in ("pk", *extra)}, self.serialize_row(row)
+
+
+REGISTRY = {}
+
+
+def register(model, columns, attachments=(), pull=()):
+    mapping = BitableMapping(model, columns, attachments, pull)
+    REGISTRY[mapping.label] = mapping
+    return mapping
+
+
+def get_mapping(model_or_label):
+    """Mapping for a model class, instance or "app_label.modelname" label (None if not synced)"""
+    label = model_or_label if isinstance(model_or_label, str) else model_or_label._meta.label_lower
+    return REGISTRY.get(label)
+
+
+# ---------------------------------------------------------------------------
+# Mappings
+# ---------------------------------------------------------------------------
+
+register(IPQCWorkInfo, [
+    Column("Date", "date", date_ms),
+    Column("Shift", "shift", raw),
+    Column("Emp_ID", "emp_id", raw),
+    Column("Name", "name", raw),
+    Column("Section", "section", raw),
+    Column("Line", "line", raw),
+    Column("Group", "group", raw),
+    Column("Model", "model", raw),
+    Column("Color", "color", raw),
+], pull=[
+    PullColumn("Status", "status"),
+])
+
+register(BTBFitmentChecksheet, [
+    # Text fields
+    Column("Date", "date", date_ms),
+    Column("Shift", "shift"),
+    Column("Employee ID", "emp_id"),
+    Column("Employee Name", "name"),
+    Column("Line", "line"),
+    Column("Group", "group"),
+    Column("Model", "model"),
+    Column("Colour", "color"),
+    Column("Frequency", "frequency"),
+    Column("Submitted By", "name"),
+    Column("Created At", "created_at", date_ms),
+
+    # Numeric fields
+    Column("Input - 9:00", "input_9", integer),
+    Column("Input - 10:00", "input_10", integer),
+    Column("Input - 11:00", "input_11", integer),
+    Column("Input - 12:00", "input_12", integer),
+    Column("Input - 1:00", "input_1", integer),
+    Column("Input - 2:00", "input_2", integer),
+    Column("Input - 3:00", "input_3", integer),
+    Column("Input - 4:00", "input_4", integer),
+    Column("Input - 5:00", "input_5", integer),
+    Column("Input - 6:00", "input_6", integer),
+    Column("Input - Total", "input_total", integer),
+
+    Column("CAM BTB - 9:00", "cam_btb_9", integer),
+    Column("CAM BTB - 10:00", "cam_btb_10", integer),
+    Column("CAM BTB - 11:00", "cam_btb_11", integer),
+    Column("CAM BTB - 12:00", "cam_btb_12", integer),
+    Column("CAM BTB - 1:00", "cam_btb_1", integer),
+    Column("CAM BTB - 2:00", "cam_btb_2", integer),
+    Column("CAM BTB - 3:00", "cam_btb_3", integer),
+    Column("CAM BTB - 4:00", "cam_btb_4", integer),
+    Column("CAM BTB - 5:00", "cam_btb_5", integer),
+    Column("CAM BTB - 6:00", "cam_btb_6", integer),
+    Column("CAM BTB - Total", "cam_btb_total", integer),
+
+    Column("LCD Fitment - 9:00", "lcd_fitment_9", integer),
+    Column("LCD Fitment - 10:00", "lcd_fitment_10", integer),
+    Column("LCD Fitment - 11:00", "lcd_fitment_11", integer),
+    Column("LCD Fitment - 12:00", "lcd_fitment_12", integer),
+    Column("LCD Fitment - 1:00", "lcd_fitment_1", integer),
+    Column("LCD Fitment - 2:00", "lcd_fitment_2", integer),
+    Column("LCD Fitment - 3:00", "lcd_fitment_3", integer),
+    Column("LCD Fitment - 4:00", "lcd_fitment_4", integer),
+    Column("LCD Fitment - 5:00", "lcd_fitment_5", integer),
+    Column("LCD Fitment - 6:00", "lcd_fitment_6", integer),
+    Column("LCD Fitment - Total", "lcd_fitment_total", integer),
+
+    Column("MAIN FPC - 9:00", "main_fpc_9", integer),
+    Column("MAIN FPC - 10:00", "main_fpc_10", integer),
+    Column("MAIN FPC - 11:00", "main_fpc_11", integer),
+    Column("MAIN FPC - 12:00", "main_fpc_12", integer),
+    Column("MAIN FPC - 1:00", "main_fpc_1", integer),
+    Column("MAIN FPC - 2:00", "main_fpc_2", integer),
+    Column("MAIN FPC - 3:00", "main_fpc_3", integer),
+    Column("MAIN FPC - 4:00", "main_fpc_4", integer),
+    Column("MAIN FPC - 5:00", "main_fpc_5", integer),
+    Column("MAIN FPC - 6:00", "main_fpc_6", integer),
+    Column("MAIN FPC - Total", "main_fpc_total", integer),
+
+    Column("Battery - 9:00", "battery_9", integer),
+    Column("Battery - 10:00", "battery_10", integer),
+    Column("Battery - 11:00", "battery_11", integer),
+    Column("Battery - 12:00", "battery_12", integer),
+    Column("Battery - 1:00", "battery_1", integer),
+    Column("Battery - 2:00", "battery_2", integer),
+    Column("Battery - 3:00", "battery_3", integer),
+    Column("Battery - 4:00", "battery_4", integer),
+    Column("Battery - 5:00", "battery_5", integer),
+    Column("Battery - 6:00", "battery_6", integer),
+    Column("Battery - Total", "battery_total", integer),
+
+    Column("Finger Printer - 9:00", "finger_printer_9", integer),
+    Column("Finger Printer - 10:00", "finger_printer_10", integer),
+    Column("Finger Printer - 11:00", "finger_printer_11", integer),
+    Column("Finger Printer - 12:00", "finger_printer_12", integer),
+    Column("Finger Printer - 1:00", "finger_printer_1", integer),
+    Column("Finger Printer - 2:00", "finger_printer_2", integer),
+    Column("Finger Printer - 3:00", "finger_printer_3", integer),
+    Column("Finger Printer - 4:00", "finger_printer_4", integer),
+    Column("Finger Printer - 5:00", "finger_printer_5", integer),
+    Column("Finger Printer - 6:00", "finger_printer_6", integer),
+    Column("Finger Printer - Total", "finger_printer_total", integer),
+
+    Column("Total - 9:00", "total_9", integer),
+    Column("Total - 10:00", "total_10", integer),
+    Column("Total - 11:00", "total_11", integer),
+    Column("Total - 12:00", "total_12", integer),
+    Column("Total - 1:00", "total_1", integer),
+    Column("Total - 2:00", "total_2", integer),
+    Column("Total - 3:00", "total_3", integer),
+    Column("Total - 4:00", "total_4", integer),
+    Column("Total - 5:00", "total_5", integer),
+    Column("Total - 6:00", "total_6", integer),
+
+    # Remarks (Text)
+    Column("Remark - Input", "remark_input"),
+    Column("Remark - CAM BTB", "remark_cam_btb"),
+    Column("Remark - LCD Fitment", "remark_lcd_fitment"),
+    Column("Remark - MAIN FPC", "remark_main_fpc"),
+    Column("Remark - Battery", "remark_battery"),
+    Column("Remark - Finger Printer", "remark_finger_printer"),
+
+    # Grand Total (Text)
+    Column("Grand Total", "grand_total", raw),
+])
+
+register(AssDummyTest, [
+    # Text / Boolean fields
+    Column("Date", "date", date_ms),
+    Column("Shift", "shift"),
+    Column("Emp ID", "emp_id"),
+    Column("Name", "name"),
+    Column("Area", "area"),
+    Column("Section", "section"),
+    Column("Line", "line"),
+    Column("Group", "group"),
+    Column("Model", "model"),
+    Column("Color", "color"),
+    Column("Test Stage", "test_stage"),
+    Column("Test Item", "test_item"),
+    Column("Operator Name", "operator_name"),
+    Column("Operator ID", "operator_id"),
+    Column("Result", "result"),
+    Column("Cause", "cause"),
+    Column("Measure", "measure"),
+    Column("LL Confirm", "ll_confirm", yes_no),  # ✅ Convert boolean to string
+    Column("Remark", "remark"),
+    Column("Created At", "created_at", date_ms),
+    Column("Updated At", "updated_at", date_ms),
+])
+
+register(IPQCDisassembleCheckList, [
+    # Work Info
+    Column("Date", "date", date_ms),
+    Column("Shift", "shift"),
+    Column("Employee ID", "emp_id"),
+    Column("Employee Name", "name"),
+    Column("Section", "section"),
+    Column("Line", "line"),
+    Column("Group", "group"),
+    Column("Model", "model"),
+    Column("Color", "color"),
+
+    # Test Fields (OK / Not OK / NA)
+    Column("Colour Match", "color_match"),
+    Column("TP SOP", "tp_sop"),
+    Column("Camera Lens", "cam_lens_assembly"),
+    Column("Key Feel", "key_feel"),
+    Column("Screw Check", "screw_missing"),
+    Column("Front Housing", "front_housing_damage"),
+    Column("Back Housing", "back_housing_damage"),
+    Column("Proof Label", "proof_label_position"),
+    Column("Mic SOP", "mic_solder"),
+    Column("LED SOP", "led_solder"),
+    Column("Coaxial Line", "coaxial_line"),
+    Column("LCD SOP", "lcd_stick"),
+    Column("Speaker SOP", "speaker_solder"),
+    Column("Motor SOP", "motor_solder"),
+    Column("Key SOP", "key_solder"),
+    Column("SIM Subboard", "sim_subboard_solder"),
+    Column("Subboard SOP", "subboard_solder"),
+    Column("Antenna Shrapnel", "antenna_shrapnel"),
+    Column("Conductive Fabric", "conductive_fabric"),
+    Column("Insulation Paste", "insulation_paste"),
+    Column("Camera SOP", "camera_solder"),
+    Column("Mainboard OK", "mainboard_component_ok"),
+    Column("Antenna FPC", "antenna_fpc"),
+    Column("Receiver SOP", "receiver_solder"),
+    Column("LCD FPC Defect", "lcd_fpc_defect"),
+    Column("TP FPC Defect", "tp_fpc_defect"),
+    Column("Key FPC Solder", "key_fpc_solder"),
+    Column("Keypad Defect", "keypad_defect"),
+    Column("Solder Splash", "solder_splash"),
+    Column("Foam Stick", "foam_stick"),
+    Column("Camera Glue", "cam_glue"),
+    Column("Paste Cover", "ins_paste_cover"),
+    Column("LED Position", "led_position"),
+    Column("Jig/Fixture Test", "jig_fixture_test"),
+    Column("Glue Location", "glue_location"),
+
+    # IMEI & Remarks
+    Column("IMEI 1", "imei1"),
+    Column("IMEI 2", "imei2"),
+    Column("Defect cause analysis", "defect_cause"),
+    Column("PQE", "pqe"),
+    Column("PE", "pe"),
+    Column("APD LL", "apd_ll"),
+
+    # System Fields
+    Column("Created At", "created_at", date_ms),
+    Column("Updated At", "updated_at", date_ms),
+], attachments=[
+    Attachment("Color Match Photo", "color_match_photo"),
+    Attachment("Cam Lens Photo", "cam_lens_photo"),
+    Attachment("Key Photo", "key_photo"),
+    Attachment("Screw Photo", "screw_photo"),
+    Attachment("Housing Photo", "housing_photo"),
+    Attachment("Proof Label Photo", "proof_label_photo"),
+    Attachment("Assembly Overview Photo", "assembly_overview_photo"),
+    Attachment("Defect Photo", "defect_photo"),
+])
+
+register(IPQCAssemblyAudit, [
+    # --- BASIC INFO ---
+    Column("Date", "date", date_ms),
+    Column("Shift", "shift"),
+    Column("IPQC Name", "name"),
+    Column("Employee ID", "emp_id"),
+    Column("Section", "section"),
+    Column("Group", "group"),
+    Column("Line", "line"),
+    Column("Model", "model"),
+    Column("Colour", "color"),
+    Column("Created At", "created_at", date_ms),
+
+    # --- MACHINE ---
+    Column("EPA Check", "mach_epa_check"),
+    Column("Screw Torque", "mach_screw_torque"),
+    Column("Light Illuminance", "mach_light"),
+    Column("Fixture Cleanliness", "mach_fixture_clean"),
+    Column("Jig Label Validity", "mach_jig_label"),
+    Column("Teflon Condition", "mach_teflon"),
+    Column("Press Parameters", "mach_press_params"),
+    Column("Glue Parameters", "mach_glue_params"),
+    Column("Equipment Move Notification", "mach_eq_move_notify"),
+    Column("Feeler Gauge Check", "mach_feeler_gauge"),
+    Column("Hot/Cold Press Parameters", "mach_hot_cold_press"),
+    Column("Ion Fan Position", "mach_ion_fan"),
+    Column("Clean Room Equipment", "mach_cleanroom_eq"),
+    Column("RTI Check", "mach_rti_check"),
+    Column("Current Test Parameters", "mach_current_test"),
+    Column("PAL QR Check", "mach_pal_qr"),
+    Column("Automatic Screwing", "mach_auto_screw"),
+
+    # --- MATERIAL ---
+    Column("Key Material Check", "mat_key_check"),
+    Column("Special Stop Material", "mat_special_stop"),
+    Column("Improved Material Monitor", "mat_improved_monitor"),
+    Column("Material Result Check", "mat_result_check"),
+    Column("Battery Issue Handling", "mat_battery_issue"),
+    Column("IPA Usage Check", "mat_ipa_check"),
+    Column("Thermal Gel Check", "mat_thermal_gel"),
+    Column("Material Verification", "mat_verification"),
+
+    # --- METHOD ---
+    Column("SOP Sequence Verification", "meth_sop_seq"),
+    Column("Distance Sensor Height", "meth_distance_sensor"),
+    Column("Rear Camera Seal Check", "meth_rear_camera"),
+    Column("Material Handling", "meth_material_handling"),
+    Column("Guideline Document", "meth_guideline_doc"),
+    Column("Operation Document", "meth_operation_doc"),
+    Column("Defective Feedback Process", "meth_defective_feedback"),
+    Column("Line Record Verification", "meth_line_record"),
+    Column("No Self Repair", "meth_no_self_repair"),
+    Column("Battery Fix Check", "meth_battery_fix"),
+    Column("Line Change Verification", "meth_line_change"),
+    Column("Trial Run Monitoring", "meth_trail_run"),
+    Column("Dummy Conduct Check", "meth_dummy_conduct"),
+
+    # --- ENVIRONMENT ---
+    Column("Production Environment Monitoring", "env_prod_monitor"),
+    Column("5S Check", "env_5s"),
+
+    # --- TRC / FAI / DEFECT / SPOT CHECK ---
+    Column("TRC Flow Chart", "trc_flow_chart"),
+    Column("FAI Check", "fai_check"),
+    Column("Defect Monitoring", "defect_monitor"),
+    Column("Spot Check", "spot_check"),
+    Column("Auto Screw Sampling", "auto_screw_sample"),
+
+    # --- MANUAL INPUT ---
+    Column("Manufacture", "manufacture"),
+    Column("Work Order", "work_order"),
+    Column("Brand", "brand"),
+    Column("Material Code", "material_code"),
+    Column("WO / Input Qty", "wo_input_qty"),
+
+    # --- TOP 3 DEFECTS & REMARKS ---
+    Column("Top 3 Defects", "top3_defects"),
+    Column("Remarks", "remarks"),
+
+    # --- SIGNATURES ---
+    Column("IPQC Sign", "ipqc_sign"),
+    Column("PQE/TL Sign", "pqe_tl_sign"),
+])
+
+register(NCIssueTracking, [
+    # Work Info
+    Column("Date", "date", date_ms),
+    Column("Shift", "shift"),
+    Column("Employee ID", "emp_id"),
+    Column("Employee Name", "name"),
+    Column("Section", "section"),
+    Column("Line", "line"),
+    Column("Group", "group"),
+    Column("Model", "model"),
+    Column("Color", "color"),
+
+    # Issue Tracking
+    Column("Stage", "stage"),
+    Column("Time", "date", date_ms),  # timestamp from TimeField
+    Column("Issue", "issue"),
+    Column("3 Why", "three_why"),
+    Column("Solution", "solution"),
+    Column("Operator Name", "operator_name"),
+    Column("Operator ID", "operator_id"),
+    Column("Responsible Dept.", "responsible_dept"),
+    Column("Responsible Person", "responsible_person"),
+    Column("Close Time", "close_time", optional_date_ms),
+    Column("Status", "status"),
+    Column("Remark", "remark"),
+
+    # System Fields
+    Column("Created At", "created_at", date_ms),
+    Column("Updated At", "updated_at", date_ms),
+])
+
+register(ESDComplianceChecklist, [
+    Column("Date", "date", date_ms),
+    Column("Shift", "shift", raw),
+    Column("Employee ID", "emp_id", raw),
+    Column("Name", "name", raw),
+    Column("Line", "line", raw),
+    Column("Group", "group", raw),
+    Column("Model", "model", raw),
+    Column("Color", "color", raw),
+    Column("EPA Wear ESD Clothes", "epa_clothes", to_str),
+    Column("No ESD Clothes Outside", "forbid_wear_out", to_str),
+    Column("No Accessories on Clothes", "no_accessories", to_str),
+    Column("Clothes Clean & Tidy", "clothes_clean", to_str),
+    Column("Collar & Button Rules", "collar_cover", to_str),
+    Column("Hair Inside Cap", "hair_cap", to_str),
+    Column("Check Slipper & Band", "slipper_check", to_str),
+    Column("Wrist Band Precheck", "pre_line_check", to_str),
+    Column("Wrist Band Touch Skin", "wrist_touch_skin", to_str),
+    Column("No Touch PCBA/ESDS", "no_touch_pcba", to_str),
+    Column("Alert When Plug Out", "alert_plug_out", to_str),
+    Column("Trolley Grounded", "trolley_grounding", to_str),
+    Column("Ion Fan Distance OK", "ion_fan_distance", to_str),
+    Column("Ion Fan Direction OK", "ion_fan_direction", to_str),
+    Column("Audit Label Valid", "audit_label_valid", to_str),
+    Column("Devices Grounded", "device_grounded", to_str),
+    Column("Gloves/Fingers OK", "gloves_condition", to_str),
+    Column("Mat Grounded", "mat_grounded", to_str),
+    Column("ESDS in ESD Box", "esds_box", to_str),
+    Column("Table No ESD Source", "table_no_source", to_str),
+    Column("Tools Daily Audit", "tools_audit", to_str),
+    Column("Temp & Humidity SPEC", "temp_humidity", to_str),
+    Column("Tray Voltage < ±100V", "tray_voltage", to_str),
+    Column("Remark", "remark"),
+    Column("Created At", "created_at", date_ms),
+    Column("Updated At", "updated_at", date_ms),
+], attachments=[
+    Attachment("ESD Clothes Photo", "epa_clothes_photo"),
+    Attachment("ESD Cap Photo", "hair_cap_photo"),
+    Attachment("Wrist Band Photo", "wristband_photo"),
+    Attachment("Trolley Grounding Photo", "trolley_photo"),
+    Attachment("Ion Fan Photo", "ion_fan_photo"),
+    Attachment("ESD Mat Photo", "mat_photo"),
+    Attachment("Working Table Photo", "table_photo"),
+    Attachment("Overview Photo", "photo_overview"),
+])
+
+register(DustCountCheck, [
+    Column("Date", "date", date_ms),
+    Column("Shift", "shift", raw),
+    Column("Employee ID", "emp_id", raw),
+    Column("Name", "name", raw),
+    Column("Line", "line", raw),
+    Column("Group", "group", raw),
+    Column("Model", "model", raw),
+    Column("Color", "color", raw),
+    Column("≥0.3 micrometer", "micrometer_0_3", raw),
+    Column("≥0.5 micrometer", "micrometer_0_5", raw),
+    Column("≥1.0 micrometer", "micrometer_1_0", raw),
+    Column("Checked By", "checked_by", raw),
+    Column("Verified By", "verified_by", raw),
+    Column("Remark", "remark"),
+    Column("Created At", "created_at", date_ms),
+    Column("Updated At", "updated_at", date_ms),
+])
+
+register(TestingFirstArticleInspection, [
+    Column("Date", "date", date_ms),
+    Column("Shift", "shift", raw),
+    Column("Employee ID", "emp_id", raw),
+    Column("Employee Name", "name", raw),
+    Column("Section", "section", raw),
+    Column("Line", "line", raw),
+    Column("Group", "group", raw),
+    Column("Model", "model", raw),
+    Column("Color", "color", raw),
+    Column("Production Work Order No", "production_work_order_no", raw),
+    Column("First Article Type", "first_article_type", raw),
+    Column("Software Version Check", "software_ver_check", raw),
+    Column("Android Version Check", "android_ver_check", raw),
+    Column("Memory Inbuilt Check Result", "memory_inbuilt_check", raw),
+    Column("Order Confirmation Check", "order_confirm_check", raw),
+    Column("Label Check", "label_check", raw),
+    Column("Label Position Check", "label_position_check", raw),
+    Column("Visual Handset Appearance Check", "visual_inspection_handset", raw),
+    Column("Logo Check", "logo_check", raw),
+    Column("Battery Assembly Check", "assembly_battery_check", raw),
+    Column("Net Color Check", "net_color_check", raw),
+    Column("TP Key Function Check", "tp_with_key_check", raw),
+    Column("Screw Check", "screw_check", raw),
+    Column("TP Charge Test", "tp_with_charge_test", raw),
+    Column("15-Min Charge Test", "charge_15min_test", raw),
+    Column("Boot Time Test", "boot_time_test", raw),
+    Column("Initialization & Settings Test", "init_settings_test", raw),
+    Column("Button & Key Feel Test", "buttons_keys_test", raw),
+    Column("Touch Screen Pen Test", "touch_screen_pen_test", raw),
+    Column("Calling Test", "calling_test", raw),
+    Column("Bluetooth Function Test", "bluetooth_test", raw),
+    Column("Flashlight/Induction Test", "flashlight_test", raw),
+    Column("Camera Flash Test", "camera_flash_test", raw),
+    Column("Front/Rear Camera Test", "camera_photo_test", raw),
+    Column("Camera Dark Test", "camera_dark_test", raw),
+    Column("Long Distance Camera Check", "camera_long_distance_check", raw),
+    Column("High Light Defect Check", "highlight_defect_check", raw),
+    Column("Multimedia Play Test", "multimedia_play_test", raw),
+    Column("FM Play Test", "fm_play_test", raw),
+    Column("TV Function Test", "tv_fn_test", raw),
+    Column("Taping Function Test", "taping_fn_test", raw),
+    Column("Shaking Screen Test", "shaking_screen_test", raw),
+    Column("WiFi Function Test", "wifi_test", raw),
+    Column("Gravity Sensor Test", "gravity_sensor_test", raw),
+    Column("Light & Distance Sensor Test", "light_distance_sensor_test", raw),
+    Column("Hall Function Test", "hall_fn_test", raw),
+    Column("QR Code Scan Test", "qr_scan_test", raw),
+    Column("RAM/ROM/T Card Capacity Test", "ram_rom_cap_test", raw),
+    Column("Mode Switch Test", "mode_switch_test", raw),
+    Column("Touch in Developer Options Test", "touch_in_dev_opt_test", raw),
+    Column("MAC Address Check", "mac_add_test", raw),
+    Column("OTG Function Test", "otg_fn_test", raw),
+    Column("T-Card/SIM Plug-Pull Test", "tcard_sim_plug_test", raw),
+    Column("Auto Focus Clarity Test", "focus_test", raw),
+    Column("Front/Back Camera Photo Test", "front_back_cam_test", raw),
+    Column("Slight Drop Test", "slight_drop_test", raw),
+    Column("Charging & USB Stability Test", "slight_touch_test", raw),
+    Column("Coupling RF Test", "coumpling_rf_test", raw),
+    Column("Power Consumption Test", "power_consumption_test", raw),
+    Column("High Temperature Simulation Test", "high_temp_simul_test", raw),
+    Column("Post Factory Reset Function Test", "factory_reset_fn_test", raw),
+    Column("SAR Value Test", "sar_value_test", raw),
+    Column("Post Factory Reset Call Noise Test", "factory_reset_call_noise_test", raw),
+    Column("Factory Reset Visual Test", "factory_reset_test", raw),
+    Column("High Temp Boot Test", "high_temp_boot_check", raw),
+    Column("High Temp Engineering Mode Test", "high_temp_engi_mode_test", raw),
+    Column("High Temp Call Test", "high_temp_call_test", raw),
+    Column("High Temp Charging Test", "high_temp_charging_test", raw),
+    Column("High Temp Camera Test", "high_temp_camera_test", raw),
+    Column("High Temp Camera Photo", "high_temp_camera_test_evidence", file_url),
+    Column("Shutdown Behavior Test", "shutdown_test", raw),
+    Column("Sample Serial Number", "sample_serial_number", raw),
+    Column("IMEI Number", "imei_number", raw),
+    Column("Visual & Functional Result", "visual_functional_result", raw),
+    Column("Reliability Test Result", "reliability_result", raw),
+    Column("Public Token", "public_token", to_str),
+    Column("Remarks", "remarks", raw),
+    Column("QE Confirm Name", "qe_confirm_name"),
+    Column("QE Confirm Status", "qe_confirm_status"),
+    Column("Public URL", "public_url"),
+], attachments=[
+    Attachment("Label Evidence", "label_check_evidence"),
+    Attachment("Label Position Evidence", "label_position_check_evidence"),
+    Attachment("Logo Evidence", "logo_check_evidence"),
+    Attachment("Assembly Battery Evidence", "assembly_battery_check_evidence"),
+    Attachment("Boot Time Evidence", "boot_time_test_evidence"),
+    Attachment("Front Camera Evidence", "camera_front_test_evidence"),
+    Attachment("Back Camera Evidence", "camera_back_test_evidence"),
+    Attachment("Dark Camera Evidence", "camera_dark_test_evidence"),
+    Attachment("High Temp Camera Evidence", "high_temp_camera_test_evidence"),
+    Attachment("IMEI Photo", "imei_photo"),
+], pull=[
+    PullColumn("QE Confirm Name", "qe_confirm_name"),
+    PullColumn("QE Confirm Status", "qe_confirm_status"),
+])
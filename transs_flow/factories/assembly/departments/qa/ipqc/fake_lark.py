@@ -0,0 +1,314 @@
+"""
+In-process stand-in for the parts of the Lark open API the IPQC sync uses.
+
+Serves tenant_access_token, Bitable records (create, batch_create,
+batch_update, batch_get, list, search, update by id), table fields and media
+upload_all from memory, so the sync path can be exercised and measured
+without the real tenant. Latency, random server errors and a per-endpoint
+QPS ceiling (answered with 429 / code 99991400 like Lark) are configurable.
+Every write stamps the record's last_modified_time (returned by search with
+automatic_fields) and, when ``modified_field`` is set, that ModifiedTime
+column; ``server.store()`` stands in for an edit made in Lark itself.
+
+    server = FakeLarkServer(latency=0.05, qps=50).start()
+    settings.LARK_API_BASE_URL = server.base_url
+    ...
+    server.stop()
+
+``manage.py run_fake_lark`` serves it standalone; ``manage.py
+benchmark_bitable_sync`` uses it to measure sync throughput.
+"""
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .lark_client import endpoint_name
+
+RECORDS_PATH = re.compile(r"^bitable/v1/apps/(?P<app>[^/]+)/tables/(?P<table>[^/]+)/records(?:/(?P<action>[^/]+))?$")
+FIELDS_PATH = re.compile(r"^bitable/v1/apps/(?P<app>[^/]+)/tables/(?P<table>[^/]+)/fields$")
+
+THROTTLE_CODE = 99991400
+INVALID_TOKEN_CODE = 99991663
+
+
+class FakeLarkServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, per_record_latency=0.0,
+                 error_rate=0.0, qps=None, token_ttl=7200, modified_field=None):
+        super().__init__((host, port), FakeLarkHandler)
+        self.latency = latency                        # seconds added to every response
+        self.jitter = jitter                          # up to this many extra seconds, uniformly
+        self.per_record_latency = per_record_latency  # extra seconds per record in batch calls
+        self.error_rate = error_rate                  # share of calls answered with HTTP 500
+        self.qps = qps                                # per-endpoint requests/second before throttling
+        self.token_ttl = token_ttl
+        self.modified_field = modified_field          # ModifiedTime column kept up to date on writes
+
+        self.lock = threading.Lock()
+        self.tables = defaultdict(dict)               # table_id -> {record_id: fields}
+        self.modified = {}                            # (table_id, record_id) -> last_modified_time (ms)
+        self.tokens = {}                              # token -> expires_at
+        self.media = {}                               # file_token -> size
+        self.calls = defaultdict(int)                 # endpoint -> count
+        self.throttled = defaultdict(int)
+        self._windows = defaultdict(int)              # (endpoint, second) -> count
+        self._ids = itertools.count(1)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/open-apis"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-lark", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def reset(self):
+        with self.lock:
+            self.tables.clear()
+            self.modified.clear()
+            self.media.clear()
+            self.calls.clear()
+            self.throttled.clear()
+            self._windows.clear()
+
+    def new_record_id(self):
+        return f"rec{next(self._ids):010d}"
+
+    def store(self, table, record_id, fields, merge=False):
+        with self.lock:
+            stored = self.tables[table]
+            fields = {**stored.get(record_id, {}), **fields} if merge else dict(fields)
+            modified = int(time.time() * 1000)
+            if self.modified_field:
+                fields[self.modified_field] = modified
+            stored[record_id] = fields
+            self.modified[(table, record_id)] = modified
+            return {"record_id": record_id, "fields": dict(fields)}
+
+    def take_quota(self, endpoint):
+        """False when ``endpoint`` is over its QPS ceiling for the current second."""
+        with self.lock:
+            self.calls[endpoint] += 1
+            if not self.qps:
+                return True
+            window = (endpoint, int(time.time()))
+            self._windows[window] += 1
+            if self._windows[window] > self.qps:
+                self.throttled[endpoint] += 1
+                return False
+            return True
+
+
+class FakeLarkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeLark/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    # -- plumbing --------------------------------------------------------
+
+    def dispatch(self, method):
+        server = self.server
+        url = urlsplit(self.path)
+        path = url.path.split("/open-apis/", 1)[-1].strip("/")
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        endpoint = endpoint_name(f"http://fake/open-apis/{path}")
+        if not server.take_quota(endpoint):
+            return self.reply({"code": THROTTLE_CODE, "msg": "request trigger frequency limit"}, 429,
+                              headers={"x-ogw-ratelimit-reset": "1"})
+
+        if server.error_rate and random.random() < server.error_rate:
+            return self.reply({"code": -1, "msg": "fake internal error"}, 500)
+
+        if path == "auth/v3/tenant_access_token/internal" and method == "POST":
+            return self.reply(self.issue_token())
+
+        if not self.authorized():
+            return self.reply({"code": INVALID_TOKEN_CODE, "msg": "Invalid access token for authorization"}, 400)
+
+        if path == "drive/v1/medias/upload_all" and method == "POST":
+            return self.reply(self.upload_media(raw))
+
+        body = json.loads(raw or b"{}") if self.headers.get("Content-Type", "").startswith("application/json") else {}
+
+        match = FIELDS_PATH.match(path)
+        if match and method == "GET":
+            return self.reply(self.list_fields(match["table"]))
+
+        match = RECORDS_PATH.match(path)
+        if match:
+            table, action = match["table"], match["action"]
+            if action is None and method == "POST":
+                return self.reply(self.create(table, body))
+            if action is None and method == "GET":
+                return self.reply(self.list_records(table, self.query, None))
+            if action == "batch_create" and method == "POST":
+                return self.reply(self.batch_create(table, body), records=len(body.get("records", [])))
+            if action == "batch_update" and method == "POST":
+                return self.reply(self.batch_update(table, body), records=len(body.get("records", [])))
+            if action == "batch_get" and method == "POST":
+                return self.reply(self.batch_get(table, body))
+            if action == "search" and method == "POST":
+                return self.reply(self.list_records(table, self.query, body))
+            if action and method == "PUT":
+                return self.reply(self.update(table, action, body))
+
+        self.reply({"code": 404, "msg": f"{method} {path} is not faked"}, 404)
+
+    def reply(self, payload, status=200, headers=None, records=0):
+        server = self.server
+        delay = server.latency + random.uniform(0, server.jitter) + records * server.per_record_latency
+        if delay:
+            time.sleep(delay)
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def authorized(self):
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+        expires_at = self.server.tokens.get(token)
+        return expires_at is not None and expires_at > time.time()
+
+    # -- endpoints -------------------------------------------------------
+
+    def issue_token(self):
+        token = f"t-{uuid.uuid4().hex}"
+        with self.server.lock:
+            self.server.tokens[token] = time.time() + self.server.token_ttl
+        return {"code": 0, "msg": "ok", "tenant_access_token": token, "expire": self.server.token_ttl}
+
+    def upload_media(self, raw):
+        file_token = f"box{uuid.uuid4().hex[:20]}"
+        with self.server.lock:
+            self.server.media[file_token] = len(raw)
+        return {"code": 0, "msg": "success", "data": {"file_token": file_token}}
+
+    def list_fields(self, table):
+        with self.server.lock:
+            names = sorted({name for fields in self.server.tables[table].values() for name in fields})
+        items = [{"field_id": f"fld{i:06d}", "field_name": name, "type": 1} for i, name in enumerate(names)]
+        return {"code": 0, "msg": "success", "data": {"items": items, "total": len(items), "has_more": False}}
+
+    def create(self, table, body):
+        record = self.store(table, self.server.new_record_id(), body.get("fields") or {})
+        return {"code": 0, "msg": "success", "data": {"record": record}}
+
+    def batch_create(self, table, body):
+        records = [self.store(table, self.server.new_record_id(), r.get("fields") or {}) for r in body.get("records", [])]
+        return {"code": 0, "msg": "success", "data": {"records": records}}
+
+    def batch_update(self, table, body):
+        updates = body.get("records", [])
+        missing = [r.get("record_id") for r in updates if r.get("record_id") not in self.server.tables[table]]
+        if missing:
+            return {"code": 1254043, "msg": f"RecordIdNotFound: {missing[0]}"}
+        records = [self.store(table, r["record_id"], r.get("fields") or {}, merge=True) for r in updates]
+        return {"code": 0, "msg": "success", "data": {"records": records}}
+
+    def batch_get(self, table, body):
+        record_ids = body.get("record_ids") or []
+        if len(record_ids) > 100:
+            return {"code": 1254104, "msg": "RecordIdsTooMany"}
+        with self.server.lock:
+            stored = self.server.tables[table]
+            records = [{"record_id": rid, "fields": dict(stored[rid])} for rid in record_ids if rid in stored]
+            absent = [rid for rid in record_ids if rid not in stored]
+        return {"code": 0, "msg": "success", "data": {"records": records, "absent_record_ids": absent}}
+
+    def update(self, table, record_id, body):
+        if record_id not in self.server.tables[table]:
+            return {"code": 1254043, "msg": "RecordIdNotFound"}
+        return {"code": 0, "msg": "success", "data": {"record": self.store(table, record_id, body.get("fields") or {}, merge=True)}}
+
+    def store(self, table, record_id, fields, merge=False):
+        return self.server.store(table, record_id, fields, merge)
+
+    def list_records(self, table, query, search):
+        page_size = min(int(query.get("page_size", 20)), 500)
+        offset = int(query.get("page_token") or 0)
+        field_names = (search or {}).get("field_names")
+        if field_names is None and query.get("field_names"):
+            field_names = json.loads(query["field_names"])
+
+        with self.server.lock:
+            rows = list(self.server.tables[table].items())
+            modified = dict(self.server.modified)
+        search = search or {}
+        if search.get("filter"):
+            rows = [(rid, fields) for rid, fields in rows if matches(fields, search["filter"])]
+        for order in reversed(search.get("sort") or []):
+            name = order.get("field_name")
+            rows.sort(key=lambda row: (row[1].get(name) is None, row[1].get(name) or 0), reverse=bool(order.get("desc")))
+
+        page = rows[offset:offset + page_size]
+        has_more = offset + page_size < len(rows)
+        items = []
+        for rid, fields in page:
+            item = {"record_id": rid, "fields": {k: v for k, v in fields.items() if field_names is None or k in field_names}}
+            if search.get("automatic_fields"):
+                item["last_modified_time"] = modified.get((table, rid))
+            items.append(item)
+        data = {"items": items, "total": len(rows), "has_more": has_more}
+        if has_more:
+            data["page_token"] = str(offset + page_size)
+        return {"code": 0, "msg": "success", "data": data}
+
+
+def matches(fields, filter_):
+    """Evaluate the is / isNot / isGreater / isLess / isEmpty / isNotEmpty subset of a search filter."""
+    results = []
+    for condition in filter_.get("conditions", []):
+        actual = fields.get(condition.get("field_name"))
+        values = condition.get("value") or []
+        expected = values[-1] if values else None
+        operator = condition.get("operator")
+        if operator == "isEmpty":
+            results.append(actual in (None, "", []))
+        elif operator == "isNotEmpty":
+            results.append(actual not in (None, "", []))
+        elif operator in ("is", "isNot"):
+            results.append((str(actual) == str(expected)) == (operator == "is"))
+        elif operator in ("isGreater", "isLess"):
+            try:
+                difference = float(actual) - float(expected)
+            except (TypeError, ValueError):
+                results.append(False)
+            else:
+                results.append(difference > 0 if operator == "isGreater" else difference < 0)
+        else:
+            results.append(False)
+    if not results:
+        return True
+    return any(results) if filter_.get("conjunction") == "or" else all(results)
@@ -1,7 +1,7 @@
 from django import forms
 from django.db import models 
 from .models import IPQCWorkInfo, DynamicForm, DynamicFormField, IPQCAssemblyAudit, BTBFitmentChecksheet, AssDummyTest, IPQCDisassembleCheckList, NCIssueTracking, ESDComplianceChecklist, DustCountCheck, TestingFirstArticleInspection, OperatorQualificationCheck, FORM_CHOICES, FORM_APPROVAL, FAI_SITUATION_CHOICES, FORM_RESULT_CHOICES
-from django.db import connections
+from . import model_catalog
 from django.utils import timezone
 import mimetypes
 
@@ -39,14 +39,8 @@ class WorkInfoForm(forms.ModelForm):
 
 
 def get_model_choices():
-    """Fetch model names dynamically from defaultdb.model_description"""
-    try:
-        with connections['defaultdb'].cursor() as cursor:
-            cursor.execute("SELECT model_name FROM model_description ORDER BY model_name ASC;")
-            rows = cursor.fetchall()
-        return [(r[0], r[0]) for r in rows]  # (value, label)
-    except Exception:
-        return []
+    """Model names of defaultdb.model_description, from the in-memory model catalog"""
+    return [(name, name) for name in model_catalog.get_catalog().names]  # (value, label)
 
 LINE_CHOICES = [(f"L{i}", f"L{i}") for i in range(1, 16)]
 GROUP_CHOICES = [(f"A{i}", f"A{i}") for i in range(1, 16)]
@@ -0,0 +1,424 @@
+"""
+Shared access to the Lark open API.
+
+All calls go through one pooled keep-alive ``requests.Session`` per process,
+with bounded connect/read timeouts. Idempotent calls are retried with
+jittered exponential backoff on connection errors, timeouts, 429 and 5xx;
+non-idempotent ones only when the connection could not be established.
+Per-endpoint call counts and latencies are kept in ``latency_stats()``;
+per-table metrics shared by all processes in ``sync_metrics``.
+
+Every call first takes a token from an adaptive per-(app, endpoint) bucket
+kept in the same shared cache, so all processes together stay under Lark's
+QPS quota; throttled calls are backed off and retried (see RateLimiter).
+
+The tenant access token is cached in Django's cache (Redis in production, so
+every web and worker process shares one token) together with its ``expire``
+value. It is refreshed ``LARK_TOKEN_REFRESH_MARGIN`` seconds before it runs
+out, by one caller at a time: the others keep using the still-valid token,
+or wait briefly for the refresh when there is none.
+"""
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import sync_metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_BASE = "https://open.larkoffice.com/open-apis"
+
+# Lark error codes meaning the tenant token is missing, invalid or expired
+AUTH_ERROR_CODES = {99991661, 99991663, 99991664, 99991668}
+# Lark error codes meaning the app exceeded an API's frequency limit
+THROTTLE_ERROR_CODES = {99991400, 1254290}
+
+
+class TenantTokenManager:
+    lock_timeout = 10     # seconds a refresh may hold the cross-process lock
+    wait_timeout = 5      # seconds a caller waits for another process's refresh
+
+    def __init__(self, app_id, app_secret):
+        self.app_id = app_id
+        self.app_secret = app_secret
+        self.cache_key = f"lark:tenant_token:{app_id}"
+        self.lock_key = f"{self.cache_key}:lock"
+        self._local_lock = threading.Lock()
+
+    @property
+    def refresh_margin(self):
+        return getattr(settings, "LARK_TOKEN_REFRESH_MARGIN", 300)
+
+    def get_token(self):
+        cached = cache.get(self.cache_key)
+        now = time.time()
+        if cached and cached["expires_at"] - self.refresh_margin > now:
+            return cached["token"]
+
+        # Only one thread per process goes on to the cross-process lock.
+        with self._local_lock:
+            cached = cache.get(self.cache_key)
+            if cached and cached["expires_at"] - self.refresh_margin > time.time():
+                return cached["token"]
+
+            if cache.add(self.lock_key, "1", self.lock_timeout):
+                try:
+                    return self._refresh()
+                finally:
+                    cache.delete(self.lock_key)
+
+            # Another process is refreshing: a token that has not expired yet is still usable.
+            if cached and cached["expires_at"] > time.time():
+                return cached["token"]
+            return self._wait_for_refresh()
+
+    def invalidate(self, token=None):
+        """Drop the cached token, unless it has already been replaced by a newer one."""
+        cached = cache.get(self.cache_key)
+        if cached and (token is None or cached["token"] == token):
+            cache.delete(self.cache_key)
+
+    def _wait_for_refresh(self):
+        deadline = time.time() + self.wait_timeout
+        while time.time() < deadline:
+            time.sleep(0.1)
+            cached = cache.get(self.cache_key)
+            if cached and cached["expires_at"] > time.time():
+                return cached["token"]
+        # The refreshing process died or stalled; fetch our own.
+        return self._refresh()
+
+    def _refresh(self):
+        response = send(
+            "POST",
+            api_url("auth/v3/tenant_access_token/internal/"),
+            headers={"Content-Type": "application/json"},
+            json={"app_id": self.app_id, "app_secret": self.app_secret},
+            idempotent=True,
+        )
+        response.raise_for_status()
+        data = response.json()
+        token = data.get("tenant_access_token")
+        if data.get("code") != 0 or not token:
+            raise LarkAPIError(data.get("code"), data.get("msg", "Failed to get tenant access token"))
+
+        expire = int(data.get("expire", 7200))
+        cache.set(self.cache_key, {"token": token, "expires_at": time.time() + expire}, expire)
+        return token
+
+
+class LarkAPIError(Exception):
+    def __init__(self, code, msg):
+        super().__init__(f"{code}: {msg}")
+        self.code = code
+        self.msg = msg
+
+
+_token_manager = None
+
+
+def get_token_manager():
+    global _token_manager
+    app_id = getattr(settings, "LARK_APP_ID", None)
+    if _token_manager is None or _token_manager.app_id != app_id:
+        _token_manager = TenantTokenManager(app_id, getattr(settings, "LARK_APP_SECRET", None))
+    return _token_manager
+
+
+def api_url(path):
+    base = getattr(settings, "LARK_API_BASE_URL", DEFAULT_API_BASE).rstrip("/")
+    return f"{base}/{path.lstrip('/')}"
+
+
+# ---------------------------------------------------------------------------
+# Pooled session
+# ---------------------------------------------------------------------------
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """One keep-alive session per process (re-created after a fork)."""
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                pool_size = getattr(settings, "LARK_HTTP_POOL_SIZE", 10)
+                adapter = HTTPAdapter(
+                    pool_connections=pool_size,
+                    pool_maxsize=pool_size,
+                    # Failed connects never reached Lark, so they are safe to retry for any method.
+                    max_retries=Retry(total=None, connect=2, read=0, status=0, other=0, backoff_factor=0.2, backoff_jitter=0.2),
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session, _session_pid = session, os.getpid()
+    return _session
+
+
+def send(method, url, idempotent=None, **kwargs):
+    """
+    Send one HTTP request through the pooled session.
+
+    ``idempotent`` defaults to the HTTP method's semantics; pass True for
+    read-only POSTs such as records/search.
+    """
+    method = method.upper()
+    if idempotent is None:
+        idempotent = method in IDEMPOTENT_METHODS
+    kwargs.setdefault("timeout", getattr(settings, "LARK_HTTP_TIMEOUT", (3.05, 15)))
+    retries = getattr(settings, "LARK_HTTP_RETRIES", 3)
+    endpoint = endpoint_name(url)
+    limiter = get_rate_limiter()
+
+    for attempt in range(retries + 1):
+        limiter.acquire(endpoint)
+        started = time.monotonic()
+        try:
+            response = get_session().request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            record_latency(endpoint, time.monotonic() - started, error=True)
+            if not idempotent or attempt == retries:
+                raise
+            time.sleep(_retry_delay(attempt))
+            continue
+
+        # A throttled call was rejected before doing anything, so it is retried whatever the method.
+        throttled = is_throttled(response)
+        failed = throttled or (idempotent and response.status_code in RETRY_STATUSES)
+        record_latency(endpoint, time.monotonic() - started, error=failed or response.status_code >= 400)
+        if not failed or attempt == retries:
+            return response
+        if throttled:
+            # The limiter now runs slower (and honours the reset hint), so acquire() does the waiting.
+            limiter.throttled(endpoint, _retry_after(response))
+        else:
+            time.sleep(_retry_delay(attempt))
+
+
+def _retry_delay(attempt):
+    """Exponential backoff with full jitter"""
+    base = getattr(settings, "LARK_HTTP_BACKOFF", 0.5)
+    return random.uniform(0, base * (2 ** attempt))
+
+
+def is_throttled(response):
+    if response.status_code == 429:
+        return True
+    try:
+        return response.json().get("code") in THROTTLE_ERROR_CODES
+    except (ValueError, AttributeError):
+        return False
+
+
+def _retry_after(response):
+    """Seconds until the quota resets, from Lark's x-ogw-ratelimit-reset or Retry-After"""
+    for header in ("x-ogw-ratelimit-reset", "Retry-After"):
+        try:
+            return float(response.headers[header])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+
+class RateLimiter:
+    """
+    Adaptive token bucket per (app_id, endpoint), shared through the Django cache.
+
+    The bucket holds ``rate`` tokens per one-second window. A caller takes one
+    with an atomic ``cache.incr`` on the window's counter and, when the window
+    is used up, sleeps into the next one. The rate itself lives in the cache
+    too: a throttle response halves it (at most once per second, however many
+    callers saw the throttle), and after ``recovery`` quiet seconds it grows by
+    ``increase`` per window back up to the endpoint's ceiling.
+    """
+    floor = 1             # never go below this many requests/second
+    increase = 1          # requests/second added per window while recovering
+    recovery = 5          # quiet seconds after a throttle before the rate grows again
+    max_wait = 30         # seconds acquire() waits before letting a call through anyway
+
+    def __init__(self, app_id):
+        self.app_id = app_id
+        self.prefix = f"lark:ratelimit:{app_id}"
+
+    def ceiling(self, endpoint):
+        limits = getattr(settings, "LARK_RATE_LIMITS", {})
+        return limits.get(endpoint, getattr(settings, "LARK_RATE_LIMIT", 10))
+
+    def rate(self, endpoint):
+        return cache.get(f"{self.prefix}:{endpoint}:rate") or self.ceiling(endpoint)
+
+    def acquire(self, endpoint):
+        deadline = time.time() + self.max_wait
+        while True:
+            now = time.time()
+            paused_until = cache.get(f"{self.prefix}:{endpoint}:paused")
+            if paused_until and paused_until > now:
+                wait = paused_until - now
+            else:
+                window = int(now)
+                key = f"{self.prefix}:{endpoint}:{window}"
+                cache.add(key, 0, 5)
+                try:
+                    taken = cache.incr(key)
+                except ValueError:
+                    # No shared counter (e.g. a dummy cache): do not limit.
+                    return
+                rate = self.rate(endpoint)
+                if taken <= rate:
+                    if taken == 1:
+                        self._recover(endpoint, rate, now)
+                    return
+                wait = window + 1 - now
+
+            if now + wait > deadline:
+                logger.warning("Lark rate limiter waited %ss for %s, sending anyway", self.max_wait, endpoint)
+                return
+            time.sleep(wait + random.uniform(0, 0.05))
+
+    def throttled(self, endpoint, retry_after=None):
+        now = time.time()
+        if retry_after:
+            cache.set(f"{self.prefix}:{endpoint}:paused", now + retry_after, int(retry_after) + 1)
+        cache.set(f"{self.prefix}:{endpoint}:calm_at", now + self.recovery, 3600)
+        # Callers throttled in the same second count as one signal.
+        if cache.add(f"{self.prefix}:{endpoint}:cut", 1, 1):
+            rate = max(self.floor, self.rate(endpoint) / 2)
+            cache.set(f"{self.prefix}:{endpoint}:rate", rate, 3600)
+            logger.info("Lark throttled %s, rate lowered to %.1f/s", endpoint, rate)
+
+    def _recover(self, endpoint, rate, now):
+        ceiling = self.ceiling(endpoint)
+        if rate >= ceiling or (cache.get(f"{self.prefix}:{endpoint}:calm_at") or 0) > now:
+            return
+        cache.set(f"{self.prefix}:{endpoint}:rate", min(ceiling, rate + self.increase), 3600)
+
+
+_rate_limiter = None
+
+
+def get_rate_limiter():
+    global _rate_limiter
+    app_id = getattr(settings, "LARK_APP_ID", None)
+    if _rate_limiter is None or _rate_limiter.app_id != app_id:
+        _rate_limiter = RateLimiter(app_id)
+    return _rate_limiter
+
+
+# ---------------------------------------------------------------------------
+# Latency counters
+# ---------------------------------------------------------------------------
+
+# An id follows these path segments; records/batch_create, records/search etc. are actions, not ids.
+_ID_SEGMENT = re.compile(r"/(apps|tables|records|fields|views)/(?!batch_|search\b)[^/?]+")
+
+_latency = {}
+_latency_lock = threading.Lock()
+
+
+def endpoint_name(url):
+    """URL path with app/table/record ids replaced, e.g. bitable/v1/apps/{id}/tables/{id}/records"""
+    path = url.split("://", 1)[-1].split("?", 1)[0]
+    path = path.split("/open-apis/", 1)[-1] if "/open-apis/" in path else path.split("/", 1)[-1]
+    return _ID_SEGMENT.sub(lambda m: f"/{m.group(1)}/{{id}}", "/" + path.strip("/")).lstrip("/")
+
+
+def record_latency(endpoint, seconds, error=False):
+    ms = seconds * 1000
+    with _latency_lock:
+        stats = _latency.setdefault(endpoint, {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["count"] += 1
+        stats["errors"] += int(error)
+        stats["total_ms"] += ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+
+
+def latency_stats():
+    """Snapshot of this process's counters: {endpoint: {count, errors, avg_ms, max_ms}}"""
+    with _latency_lock:
+        return {
+            endpoint: {
+                "count": stats["count"],
+                "errors": stats["errors"],
+                "avg_ms": round(stats["total_ms"] / stats["count"], 1) if stats["count"] else 0.0,
+                "max_ms": round(stats["max_ms"], 1),
+            }
+            for endpoint, stats in _latency.items()
+        }
+
+
+def reset_latency_stats():
+    with _latency_lock:
+        _latency.clear()
+
+
+# ---------------------------------------------------------------------------
+# Authenticated calls
+# ---------------------------------------------------------------------------
+
+def request(method, url, idempotent=None, **kwargs):
+    """
+    Call a Lark open API endpoint with the tenant token attached.
+
+    If Lark rejects the token, it is invalidated and the call retried once
+    with a fresh one. Every call is reported to ``sync_metrics``. Returns
+    the ``requests.Response``.
+    """
+    manager = get_token_manager()
+    # Multipart uploads (``files=``) get their Content-Type, with the boundary, from requests.
+    headers = {} if "files" in kwargs else {"Content-Type": "application/json"}
+    headers.update(kwargs.pop("headers", {}))
+    table_id = sync_metrics.table_from_url(url)
+    started = time.monotonic()
+
+    try:
+        token = manager.get_token()
+        response = send(method, url, idempotent, headers={**headers, "Authorization": f"Bearer {token}"}, **kwargs)
+        code = response_code(response)
+
+        if code in AUTH_ERROR_CODES:
+            logger.info("Lark rejected the tenant token, refreshing and retrying %s %s", method, url)
+            manager.invalidate(token)
+            token = manager.get_token()
+            response = send(method, url, idempotent, headers={**headers, "Authorization": f"Bearer {token}"}, **kwargs)
+            code = response_code(response)
+    except Exception as e:
+        sync_metrics.observe(table_id, time.monotonic() - started, error=f"{type(e).__name__}: {e}")
+        raise
+
+    sync_metrics.observe(
+        table_id,
+        time.monotonic() - started,
+        status=response.status_code,
+        code=code,
+        payload_bytes=len(getattr(response.request, "body", None) or b""),
+        throttled=response.status_code == 429 or code in THROTTLE_ERROR_CODES,
+    )
+    return response
+
+
+def response_code(response):
+    """Lark's ``code`` from a JSON response body (None if there is none)"""
+    try:
+        return response.json().get("code")
+    except (ValueError, AttributeError):
+        return None
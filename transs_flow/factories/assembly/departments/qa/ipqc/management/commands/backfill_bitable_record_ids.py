@@ -0,0 +1,80 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from factories.assembly.departments.qa.ipqc import services
+from factories.assembly.departments.qa.ipqc.bitable_mapping import cell_value, get_mapping
+
+
+# Bitable columns identifying a local row. FAI records carry a unique public
+# token; for the other tables a combination of work-info columns is used and
+# rows whose key is not unique on both sides are left alone.
+MATCH_COLUMNS = {
+    "ipqc.ipqcworkinfo": ("Date", "Shift", "Emp_ID", "Line", "Model", "Color"),
+    "ipqc.btbfitmentchecksheet": ("Date", "Shift", "Employee ID", "Line", "Model", "Created At", "Grand Total"),
+    "ipqc.assdummytest": ("Date", "Shift", "Emp ID", "Line", "Model", "Test Item", "Created At"),
+    "ipqc.ipqcdisassemblechecklist": ("Date", "Shift", "Employee ID", "Line", "IMEI 1", "IMEI 2", "Created At"),
+    "ipqc.ipqcassemblyaudit": ("Date", "Shift", "Employee ID", "Line", "Model", "Created At"),
+    "ipqc.ncissuetracking": ("Date", "Shift", "Employee ID", "Line", "Issue", "Created At"),
+    "ipqc.esdcompliancechecklist": ("Date", "Shift", "Employee ID", "Line", "Model", "Created At"),
+    "ipqc.dustcountcheck": ("Date", "Shift", "Employee ID", "Line", "Model", "Created At"),
+    "ipqc.testingfirstarticleinspection": ("Public Token",),
+}
+
+AMBIGUOUS = object()
+
+
+class Command(BaseCommand):
+    help = "Store Bitable record_ids on synced rows created before record_ids were persisted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", choices=sorted(MATCH_COLUMNS), help="Only backfill this model label")
+        parser.add_argument("--page-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        labels = [options["model"]] if options["model"] else sorted(MATCH_COLUMNS)
+        for label in labels:
+            self.backfill(label, options["page_size"], options["dry_run"])
+
+    def backfill(self, label, page_size, dry_run):
+        mapping = get_mapping(label)
+        model = mapping.model
+        table_id = mapping.table_id
+        if not table_id:
+            raise CommandError(f"{model.bitable_table_setting} is not set")
+
+        columns = MATCH_COLUMNS[label]
+
+        pending = model.objects.filter(bitable_record_id="")
+        if not pending.exists():
+            self.stdout.write(f"{label}: nothing to backfill")
+            return
+
+        # Index the remote table by match key, one page at a time.
+        index = {}
+        for record in services.iter_bitable_records(table_id, page_size=page_size, field_names=json.dumps(list(columns), ensure_ascii=False)):
+            fields = record.get("fields", {})
+            key = tuple(cell_value(fields.get(column)) for column in columns)
+            index[key] = AMBIGUOUS if key in index else record["record_id"]
+
+        seen = {}
+        for row, fields in mapping.serialize_queryset(pending):
+            key = tuple(cell_value(fields.get(column)) for column in columns)
+            seen[key] = AMBIGUOUS if key in seen else row["pk"]
+
+        matched, skipped = [], 0
+        for key, pk in seen.items():
+            record_id = index.get(key)
+            if pk is AMBIGUOUS or record_id is AMBIGUOUS:
+                skipped += 1
+            elif record_id:
+                matched.append(model(pk=pk, bitable_record_id=record_id))
+
+        if not dry_run:
+            model.objects.bulk_update(matched, ["bitable_record_id"], batch_size=1000)
+        self.stdout.write(
+            f"{label}: {len(matched)} matched, {skipped} ambiguous, {len(seen) - len(matched) - skipped} not found"
+            + (" (dry run)" if dry_run else "")
+        )
+
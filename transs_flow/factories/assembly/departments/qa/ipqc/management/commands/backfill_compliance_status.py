@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from factories.assembly.departments.qa.ipqc.models import ComplianceStatusModel, ESDComplianceChecklist, IPQCDisassembleCheckList
+
+MODELS = {
+    "esd": ESDComplianceChecklist,
+    "disassemble": IPQCDisassembleCheckList,
+}
+
+
+class Command(BaseCommand):
+    help = "Compute the stored pass/fail/NA counts and overall status of ESD and disassemble checklists."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", choices=sorted(MODELS), help="Only backfill this checklist")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        names = [options["model"]] if options["model"] else sorted(MODELS)
+        for name in names:
+            self.backfill(name, MODELS[name], options["batch_size"])
+
+    def backfill(self, name, model, batch_size):
+        fields = ("pk",) + tuple(model.COMPLIANCE_FIELDS) + model.COUNT_FIELDS
+        checked = changed = 0
+        last_pk = 0
+        while True:
+            # Keyset batches by pk; bulk_update sends no post_save, so nothing is queued for Bitable.
+            batch = list(model.objects.filter(pk__gt=last_pk).order_by("pk").only(*fields)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            dirty = [record for record in batch if record.refresh_compliance()]
+            model.objects.bulk_update(dirty, ComplianceStatusModel.COUNT_FIELDS)
+            checked += len(batch)
+            changed += len(dirty)
+        self.stdout.write(f"{name}: {checked} records checked, {changed} updated")
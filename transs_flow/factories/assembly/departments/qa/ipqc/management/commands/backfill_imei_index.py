@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+
+from factories.assembly.departments.qa.ipqc.models import IMEI_FIELDS, IMEIRecord
+
+MODELS = {model._meta.model_name: model for model in IMEI_FIELDS}
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the IMEI traceability index from the disassemble and FAI checklists, e.g. "
+        "after bulk imports or queryset updates that bypassed the save signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", choices=sorted(MODELS), help="Only rebuild the index of this model")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        names = [options["model"]] if options["model"] else sorted(MODELS)
+        for name in names:
+            self.rebuild(MODELS[name], options["batch_size"])
+
+    def rebuild(self, model, batch_size):
+        records = indexed = 0
+        with transaction.atomic(using=router.db_for_write(IMEIRecord)):
+            IMEIRecord.objects.filter(model_label=model._meta.label_lower).delete()
+            last_pk = 0
+            while True:
+                # Keyset batches by pk
+                batch = list(
+                    model.objects.filter(pk__gt=last_pk).order_by("pk").only("pk", "date", *IMEI_FIELDS[model])[:batch_size]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                rows = [row for record in batch for row in IMEIRecord.objects.rows_for(record)]
+                IMEIRecord.objects.bulk_create(rows, batch_size=1000)
+                records += len(batch)
+                indexed += len(rows)
+        self.stdout.write(f"{model._meta.model_name}: {records} records, {indexed} IMEIs indexed")
@@ -0,0 +1,167 @@
+import contextlib
+import io
+import time
+from datetime import date, time as dt_time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from factories.assembly.departments.qa.ipqc import lark_client, outbox, services
+from factories.assembly.departments.qa.ipqc.bitable_mapping import REGISTRY
+from factories.assembly.departments.qa.ipqc.fake_lark import FakeLarkServer
+from factories.assembly.departments.qa.ipqc.models import BitableOutbox
+
+STRATEGIES = ("direct", "outbox")
+BENCHMARK_TABLE = "tblBenchmark"
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def seed_value(field, i):
+    """A plausible value for a required model field."""
+    if field.choices:
+        return field.choices[i % len(field.choices)][0]
+    kind = field.get_internal_type()
+    if kind in ("CharField", "TextField", "SlugField", "EmailField"):
+        return f"BENCH{i}"[: field.max_length or None]
+    if kind == "DateField":
+        return date.today()
+    if kind == "DateTimeField":
+        return timezone.now()
+    if kind == "TimeField":
+        return dt_time(8, 0)
+    if kind == "BooleanField":
+        return bool(i % 2)
+    if kind == "DecimalField":
+        return Decimal(i % 100)
+    if kind == "FloatField":
+        return float(i % 100)
+    if "Integer" in kind:
+        return i % 100
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed N checklist records and measure Bitable sync throughput and p50/p99 latency "
+        "per sync strategy against the local fake Lark server. Seeded rows are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--records", type=int, default=200)
+        parser.add_argument("--model", choices=sorted(REGISTRY), default="ipqc.esdcompliancechecklist")
+        parser.add_argument("--strategy", action="append", choices=STRATEGIES,
+                            help="direct: one records create per row, as the views used to do inline; "
+                                 "outbox: the batching outbox worker. Repeatable, default both.")
+        parser.add_argument("--batch-size", type=int, default=outbox.BATCH_CREATE_LIMIT, help="Outbox rows claimed per pass")
+        parser.add_argument("--base-url", help="Use an already running fake (manage.py run_fake_lark) instead of starting one")
+        parser.add_argument("--latency", type=float, default=30.0, help="Fake server milliseconds per response")
+        parser.add_argument("--jitter", type=float, default=10.0)
+        parser.add_argument("--per-record-latency", type=float, default=0.2, help="Fake server milliseconds per record in batch calls")
+        parser.add_argument("--error-rate", type=float, default=0.0)
+        parser.add_argument("--qps", type=int, help="Fake server per-endpoint QPS ceiling")
+
+    def handle(self, *args, **options):
+        if options["records"] < 1:
+            raise CommandError("--records must be at least 1")
+        mapping = REGISTRY[options["model"]]
+
+        server = None
+        base_url = options["base_url"]
+        if not base_url:
+            server = FakeLarkServer(
+                latency=options["latency"] / 1000,
+                jitter=options["jitter"] / 1000,
+                per_record_latency=options["per_record_latency"] / 1000,
+                error_rate=options["error_rate"],
+                qps=options["qps"],
+            ).start()
+            base_url = server.base_url
+
+        overrides = {
+            "LARK_API_BASE_URL": base_url,
+            "LARK_APP_ID": "cli_benchmark",
+            "LARK_APP_SECRET": "benchmark",
+            "LARK_BITABLE_APP_TOKEN_QA": "appBenchmark",
+            mapping.model.bitable_table_setting: BENCHMARK_TABLE,
+        }
+        try:
+            with override_settings(**overrides):
+                for strategy in options["strategy"] or STRATEGIES:
+                    self.run(strategy, mapping, server, options)
+        finally:
+            if server:
+                server.stop()
+
+    def run(self, strategy, mapping, server, options):
+        instances = self.seed(mapping.model, options["records"])
+        outbox_ids = []
+        if server:
+            server.reset()
+        lark_client.reset_latency_stats()
+        try:
+            started = time.monotonic()
+            if strategy == "direct":
+                latencies, failed = self.run_direct(instances)
+            else:
+                latencies, failed, outbox_ids = self.run_outbox(instances, options["batch_size"])
+            elapsed = time.monotonic() - started
+        finally:
+            BitableOutbox.objects.filter(pk__in=outbox_ids).delete()
+            mapping.model.objects.filter(pk__in=[instance.pk for instance in instances]).delete()
+
+        latencies.sort()
+        synced = len(instances) - failed
+        line = (
+            f"{strategy:<7} {len(instances)} records: {synced} synced, {failed} failed in {elapsed:.2f}s "
+            f"= {synced / elapsed:.1f} rec/s, p50 {percentile(latencies, 50) * 1000:.0f}ms, "
+            f"p99 {percentile(latencies, 99) * 1000:.0f}ms"
+        )
+        if server:
+            line += f", {sum(server.calls.values())} Lark calls, {sum(server.throttled.values())} throttled"
+        self.stdout.write(line)
+
+    def seed(self, model, count):
+        required = [
+            field for field in model._meta.concrete_fields
+            if not field.primary_key and not field.null and not field.has_default()
+            and not field.is_relation and not getattr(field, "auto_now", False)
+            and not getattr(field, "auto_now_add", False) and field.name != "bitable_record_id"
+        ]
+        # bulk_create skips post_save, so nothing is queued behind the benchmark's back.
+        return model.objects.bulk_create(
+            [model(**{field.name: seed_value(field, i) for field in required}) for i in range(count)],
+            batch_size=500,
+        )
+
+    def run_direct(self, instances):
+        latencies, failed = [], 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            for instance in instances:
+                started = time.monotonic()
+                success, _ = services.sync_to_bitable(instance)
+                latencies.append(time.monotonic() - started)
+                failed += not success
+        return latencies, failed
+
+    def run_outbox(self, instances, batch_size):
+        entries = BitableOutbox.objects.bulk_create([BitableOutbox.objects.build(instance) for instance in instances])
+        ids = [entry.pk for entry in entries]
+        pending = BitableOutbox.objects.filter(pk__in=ids, status=BitableOutbox.STATUS_PENDING)
+        while pending.exists():
+            if not outbox.process_outbox(batch_size):
+                # Only retries waiting out their backoff are left; run them now rather than sleeping.
+                pending.update(next_attempt_at=timezone.now())
+
+        rows = BitableOutbox.objects.filter(pk__in=ids).values_list("status", "created_at", "sent_at")
+        latencies = [(sent_at - created_at).total_seconds() for status, created_at, sent_at in rows if sent_at]
+        failed = sum(1 for status, _, _ in rows if status == BitableOutbox.STATUS_FAILED)
+        return latencies, failed, ids
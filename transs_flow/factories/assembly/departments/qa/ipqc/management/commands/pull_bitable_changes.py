@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from factories.assembly.departments.qa.ipqc import services
+from factories.assembly.departments.qa.ipqc.bitable_mapping import REGISTRY
+from factories.assembly.departments.qa.ipqc.models import BitablePullCursor
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+PULLED = sorted(label for label, mapping in REGISTRY.items() if mapping.pull)
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy columns edited in Lark (QE confirmations, work info status) back into the local IPQC "
+        "tables. Only records modified since the table's stored cursor are read; run it from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", choices=PULLED, help="Only pull this model label")
+        parser.add_argument("--page-size", type=int, default=500)
+        parser.add_argument("--full", action="store_true", help="Ignore the stored cursor and read the whole table")
+
+    def handle(self, *args, **options):
+        labels = [options["model"]] if options["model"] else PULLED
+        for label in labels:
+            self.pull(REGISTRY[label], options)
+
+    def pull(self, mapping, options):
+        table_id = mapping.table_id
+        if not table_id:
+            self.stderr.write(f"{mapping.label}: {mapping.model.bitable_table_setting} is not set, skipped")
+            return
+
+        cursor, _ = BitablePullCursor.objects.get_or_create(table_id=table_id, defaults={"model_label": mapping.label})
+        since = 0 if options["full"] else cursor.last_modified_ms
+        modified_field = settings.LARK_PULL_MODIFIED_FIELD
+
+        # ExactDate filters are day-granular: ask for the day before the cursor
+        # onwards and drop what is older than the cursor using last_modified_time.
+        # Records at exactly the cursor are read again; applying them is idempotent.
+        conditions = []
+        if since:
+            conditions.append(
+                {"field_name": modified_field, "operator": "isGreater", "value": ["ExactDate", str(since - DAY_MS)]}
+            )
+        records = services.search_bitable_records(
+            table_id, conditions,
+            field_names=[column.name for column in mapping.pull],
+            page_size=options["page_size"],
+            sort=[{"field_name": modified_field, "desc": False}],
+            automatic_fields=True,
+        )
+
+        read = updated = unknown = 0
+        page = []
+        for record in records:
+            modified = int(record.get("last_modified_time") or 0)
+            if modified < since:
+                continue
+            page.append((record.get("record_id"), record.get("fields") or {}, modified))
+            if len(page) >= options["page_size"]:
+                changed, missing = self.apply(mapping, cursor, page)
+                read, updated, unknown = read + len(page), updated + changed, unknown + missing
+                page = []
+        if page:
+            changed, missing = self.apply(mapping, cursor, page)
+            read, updated, unknown = read + len(page), updated + changed, unknown + missing
+
+        self.stdout.write(
+            f"{mapping.label}: {read} modified in Bitable, {updated} updated locally, "
+            f"{unknown} not linked to a local row"
+        )
+
+    def apply(self, mapping, cursor, page):
+        """
+        Write one page of Bitable records onto the local rows linked to them
+        and move the cursor past it. Returns (rows changed, records with no local row).
+        """
+        model = mapping.model
+        fields = [column.field for column in mapping.pull]
+        model_fields = {name: model._meta.get_field(name) for name in fields}
+
+        incoming = {}
+        for record_id, cells, _ in page:
+            values = {}
+            for column in mapping.pull:
+                field = model_fields[column.field]
+                value = column.parser(cells.get(column.name))
+                if value == "" and field.null:
+                    value = None
+                elif field.max_length and value:
+                    value = value[:field.max_length]
+                values[column.field] = value
+            incoming[record_id] = values
+
+        rows = list(model.objects.filter(bitable_record_id__in=incoming).only("pk", "bitable_record_id", *fields))
+        changed = []
+        for row in rows:
+            values = incoming[row.bitable_record_id]
+            if any(getattr(row, name) != value for name, value in values.items()):
+                for name, value in values.items():
+                    setattr(row, name, value)
+                changed.append(row)
+        # bulk_update sends no post_save, so pulled values are not queued back to Bitable.
+        model.objects.bulk_update(changed, fields, batch_size=500)
+
+        cursor.model_label = mapping.label
+        cursor.last_modified_ms = max(cursor.last_modified_ms, max(modified for _, _, modified in page))
+        cursor.save(update_fields=["model_label", "last_modified_ms", "updated_at"])
+        return len(changed), len(incoming) - len({row.bitable_record_id for row in rows})
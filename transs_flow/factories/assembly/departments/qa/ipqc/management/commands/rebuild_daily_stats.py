@@ -0,0 +1,51 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+from django.db.models import Count
+
+from factories.assembly.departments.qa.ipqc.models import DAILY_STATS_FORMS, DailyFormStats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the DailyFormStats rollup from the checklist tables, e.g. after bulk "
+        "imports or queryset updates that bypassed the save signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--form", choices=sorted(DAILY_STATS_FORMS.values()), help="Only rebuild this form type")
+        parser.add_argument("--since", type=date.fromisoformat, help="Only rebuild days from this date (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        for model, form_type in DAILY_STATS_FORMS.items():
+            if options["form"] and form_type != options["form"]:
+                continue
+            self.rebuild(model, form_type, options["since"])
+
+    def rebuild(self, model, form_type, since):
+        source = model.objects.order_by()
+        existing = DailyFormStats.objects.filter(form_type=form_type)
+        if since:
+            source = source.filter(date__gte=since)
+            existing = existing.filter(date__gte=since)
+
+        rows = source.values(*DailyFormStats.key_fields_of(model)).annotate(records=Count("id"))
+        buckets = {}
+        for row in rows.iterator(chunk_size=2000):
+            # NULL and "" fall into the same bucket, as in the signals.
+            key = DailyFormStats.key_for(row)
+            buckets[tuple(key.values())] = buckets.get(tuple(key.values()), 0) + row["records"]
+
+        with transaction.atomic(using=router.db_for_write(DailyFormStats)):
+            deleted, _ = existing.delete()
+            DailyFormStats.objects.bulk_create(
+                [
+                    DailyFormStats(form_type=form_type, count=count, **dict(zip(DailyFormStats.KEY_FIELDS, key)))
+                    for key, count in buckets.items()
+                ],
+                batch_size=1000,
+            )
+        self.stdout.write(
+            f"{form_type}: {sum(buckets.values())} records in {len(buckets)} rollup rows (replaced {deleted})"
+        )
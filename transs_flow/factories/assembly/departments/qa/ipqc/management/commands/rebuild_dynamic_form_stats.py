@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+
+from factories.assembly.departments.qa.ipqc.models import (
+    DynamicForm, DynamicFormFieldStats, DynamicFormStats, DynamicFormSubmission, numeric_values,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the dynamic form dashboard summaries (submission count, latest submission, "
+        "numeric field mean/min/max) from the stored submissions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--form", type=int, help="Only rebuild this DynamicForm id")
+
+    def handle(self, *args, **options):
+        forms = DynamicForm.objects.order_by("id")
+        if options["form"]:
+            forms = forms.filter(id=options["form"])
+        for form_id in forms.values_list("id", flat=True):
+            self.rebuild(form_id)
+
+    def rebuild(self, form_id):
+        count, latest = 0, None
+        fields = {}
+        submissions = (
+            DynamicFormSubmission.objects.filter(form_id=form_id).order_by()
+            .values_list("data", "created_at").iterator(chunk_size=2000)
+        )
+        for data, created_at in submissions:
+            count += 1
+            if created_at and (latest is None or created_at > latest):
+                latest = created_at
+            for name, value in numeric_values(data).items():
+                stats = fields.setdefault(name[:200], [0, 0.0, value, value])
+                stats[0] += 1
+                stats[1] += value
+                stats[2] = min(stats[2], value)
+                stats[3] = max(stats[3], value)
+
+        with transaction.atomic(using=router.db_for_write(DynamicFormStats)):
+            DynamicFormStats.objects.update_or_create(
+                form_id=form_id, defaults={"submission_count": count, "last_submission_at": latest}
+            )
+            DynamicFormFieldStats.objects.filter(form_id=form_id).delete()
+            DynamicFormFieldStats.objects.bulk_create([
+                DynamicFormFieldStats(form_id=form_id, field_name=name, count=n, total=total,
+                                      min_value=low, max_value=high)
+                for name, (n, total, low, high) in fields.items()
+            ])
+        self.stdout.write(f"form {form_id}: {count} submissions, {len(fields)} numeric fields")
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+
+from factories.assembly.departments.qa.ipqc.models import SEARCH_FIELDS, SearchTerm, trigrams
+
+MODELS = {model._meta.model_name: model for model in SEARCH_FIELDS}
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the trigram search index of the checklist list pages, e.g. after bulk "
+        "imports or queryset updates that bypassed the save signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", choices=sorted(MODELS), help="Only rebuild the index of this model")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        names = [options["model"]] if options["model"] else sorted(MODELS)
+        for name in names:
+            self.rebuild(MODELS[name], options["batch_size"])
+
+    def rebuild(self, model, batch_size):
+        label = model._meta.label_lower
+        fields = SEARCH_FIELDS[model]
+        records = terms = 0
+        with transaction.atomic(using=router.db_for_write(SearchTerm)):
+            SearchTerm.objects.filter(model_label=label).delete()
+            last_pk = 0
+            while True:
+                # Keyset batches by pk
+                batch = list(model.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", *fields)[:batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1][0]
+                rows = []
+                for pk, *values in batch:
+                    row_terms = set()
+                    for value in values:
+                        row_terms |= trigrams(str(value or "")[:255])
+                    rows += [SearchTerm(model_label=label, object_id=pk, term=term) for term in row_terms]
+                SearchTerm.objects.bulk_create(rows, batch_size=2000, ignore_conflicts=True)
+                records += len(batch)
+                terms += len(rows)
+        self.stdout.write(f"{model._meta.model_name}: {records} records, {terms} terms")
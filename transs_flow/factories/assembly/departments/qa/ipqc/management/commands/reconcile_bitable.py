@@ -0,0 +1,141 @@
+from datetime import date, timedelta
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from factories.assembly.departments.qa.ipqc import services
+from factories.assembly.departments.qa.ipqc.bitable_mapping import REGISTRY, date_to_ms, fields_digest
+from factories.assembly.departments.qa.ipqc.models import BitableOutbox
+
+DAY_MS = 24 * 60 * 60 * 1000
+BATCH_GET_LIMIT = 100  # record_ids per records/batch_get call
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare synced IPQC records with their Lark Bitable tables over a date range "
+        "and report, or with --repair re-queue, missing and divergent rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", type=date.fromisoformat, help="First date (YYYY-MM-DD), default 7 days before --until")
+        parser.add_argument("--until", type=date.fromisoformat, help="Last date (YYYY-MM-DD), default today")
+        parser.add_argument("--model", choices=sorted(REGISTRY), help="Only reconcile this model label")
+        parser.add_argument("--repair", action="store_true", help="Queue creates/updates for the differences found")
+        parser.add_argument("--page-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        until = options["until"] or date.today()
+        since = options["since"] or until - timedelta(days=7)
+        if since > until:
+            raise CommandError("--since is after --until")
+
+        labels = [options["model"]] if options["model"] else sorted(REGISTRY)
+        for label in labels:
+            self.reconcile(REGISTRY[label], since, until, options)
+
+    def reconcile(self, mapping, since, until, options):
+        table_id = mapping.table_id
+        if not table_id:
+            self.stderr.write(f"{mapping.label}: {mapping.model.bitable_table_setting} is not set, skipped")
+            return
+
+        # Rows with a pending outbox entry are in flight, not missing.
+        queued = BitableOutbox.objects.filter(
+            model_label=mapping.label, status=BitableOutbox.STATUS_PENDING, object_id__isnull=False
+        ).values("object_id")
+        queryset = mapping.model.objects.filter(date__range=(since, until)).exclude(pk__in=queued).order_by()
+        self.verbose = options["verbosity"] > 1
+        self.queued_counts = [0, 0]
+        counts = dict.fromkeys(("in sync", "divergent", "deleted", "never synced", "only in Bitable"), 0)
+
+        # Local rows never synced, in pk order
+        last_pk = 0
+        while True:
+            pks = list(
+                queryset.filter(bitable_record_id="", pk__gt=last_pk).order_by("pk")
+                .values_list("pk", flat=True)[:BATCH_GET_LIMIT]
+            )
+            if not pks:
+                break
+            last_pk = pks[-1]
+            counts["never synced"] += len(pks)
+            self.report("never synced", pks)
+            if options["repair"]:
+                self.repair(mapping, [], pks, [])
+
+        # Local rows with a record_id, in record_id order, each chunk looked up in Bitable by id
+        for chunk in self.synced_chunks(mapping, queryset):
+            remote, absent = services.batch_get_records(table_id, list(chunk))
+            divergent = [
+                pk for record_id, (pk, digest) in chunk.items()
+                if record_id in remote and fields_digest(remote[record_id], mapping.column_names) != digest
+            ]
+            deleted = [chunk[record_id][0] for record_id in absent]
+            counts["in sync"] += len(remote) - len(divergent)
+            counts["divergent"] += len(divergent)
+            counts["deleted"] += len(deleted)
+            self.report("divergent", divergent)
+            self.report("deleted", deleted)
+            if options["repair"] and (divergent or deleted):
+                self.repair(mapping, divergent, deleted, deleted)
+
+        # Bitable records of the date range, a page at a time, looked up locally by record_id
+        conditions = [
+            {"field_name": "Date", "operator": "isGreater", "value": ["ExactDate", str(date_to_ms(since) - DAY_MS)]},
+            {"field_name": "Date", "operator": "isLess", "value": ["ExactDate", str(date_to_ms(until) + DAY_MS)]},
+        ]
+        records = services.search_bitable_records(
+            table_id, conditions, field_names=mapping.column_names[:1], page_size=options["page_size"]
+        )
+        while True:
+            page = [record.get("record_id") for record in islice(records, options["page_size"])]
+            if not page:
+                break
+            known = set(mapping.model.objects.filter(bitable_record_id__in=page).values_list("bitable_record_id", flat=True))
+            counts["only in Bitable"] += sum(1 for record_id in page if record_id not in known)
+
+        self.stdout.write(
+            f"{mapping.label} {since}..{until}: {counts['in sync']} in sync, {counts['divergent']} divergent, "
+            f"{counts['deleted']} deleted from Bitable, {counts['never synced']} never synced, "
+            f"{counts['only in Bitable']} only in Bitable"
+        )
+        if options["repair"]:
+            updates, creates = self.queued_counts
+            self.stdout.write(f"  queued {updates} update(s) and {creates} create(s)")
+
+    def synced_chunks(self, mapping, queryset):
+        """Yield {record_id: (pk, digest)} for BATCH_GET_LIMIT rows at a time, by (record_id, pk)."""
+        queryset = queryset.exclude(bitable_record_id="").order_by("bitable_record_id", "pk")
+        last = None
+        while True:
+            page = queryset
+            if last is not None:
+                page = page.filter(Q(bitable_record_id__gt=last[0]) | Q(bitable_record_id=last[0], pk__gt=last[1]))
+            chunk = {}
+            for row, fields in mapping.serialize_queryset(page[:BATCH_GET_LIMIT], extra=("bitable_record_id",)):
+                chunk[row["bitable_record_id"]] = (row["pk"], fields_digest(fields, mapping.column_names))
+                last = (row["bitable_record_id"], row["pk"])
+            if not chunk:
+                return
+            yield chunk
+
+    def report(self, name, pks):
+        if self.verbose and pks:
+            self.stdout.write(f"  {name}: {', '.join(map(str, sorted(pks)))}")
+
+    def repair(self, mapping, update_pks, create_pks, stale_record_pks):
+        model = mapping.model
+        if stale_record_pks:
+            # Their Bitable records are gone; forget the ids so the creates store new ones.
+            model.objects.filter(pk__in=stale_record_pks).update(bitable_record_id="")
+
+        entries = [
+            BitableOutbox(model_label=mapping.label, object_id=pk, table_id=mapping.table_id, action=action)
+            for action, pks in ((BitableOutbox.ACTION_UPDATE, update_pks), (BitableOutbox.ACTION_CREATE, create_pks))
+            for pk in pks
+        ]
+        BitableOutbox.objects.bulk_create(entries, batch_size=1000)
+        self.queued_counts[0] += len(update_pks)
+        self.queued_counts[1] += len(create_pks)
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from factories.assembly.departments.qa.ipqc import sync_metrics, webhooks
+from factories.assembly.departments.qa.ipqc.outbox import BATCH_CREATE_LIMIT, process_outbox
+
+
+class Command(BaseCommand):
+    help = "Drain the Lark Bitable outbox, retrying failed syncs with backoff, and apply queued webhook status changes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_CREATE_LIMIT, help="Rows claimed per pass")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Idle wait between passes (seconds)")
+        parser.add_argument("--once", action="store_true", help="Process a single batch and exit")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        idle_sleep = options["sleep"]
+
+        self.stdout.write("Bitable outbox worker started")
+        try:
+            while True:
+                processed = process_outbox(batch_size) + webhooks.apply_pending_events()
+                if options["once"]:
+                    self.stdout.write(f"Processed {processed} outbox row(s) and webhook event(s)")
+                    return
+                if not processed:
+                    sync_metrics.flush()
+                    time.sleep(idle_sleep)
+        except KeyboardInterrupt:
+            self.stdout.write("Bitable outbox worker stopped")
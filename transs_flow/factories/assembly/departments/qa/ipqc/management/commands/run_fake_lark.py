@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from factories.assembly.departments.qa.ipqc.fake_lark import FakeLarkServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a local stand-in for the Lark open API (token, Bitable records, fields, media). "
+        "Point LARK_API_BASE_URL at the printed URL to use it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency", type=float, default=0.0, help="Milliseconds added to every response")
+        parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra milliseconds")
+        parser.add_argument("--per-record-latency", type=float, default=0.0, help="Extra milliseconds per record in batch calls")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered with HTTP 500 (0-1)")
+        parser.add_argument("--qps", type=int, help="Per-endpoint requests/second before answering 429")
+        parser.add_argument("--token-ttl", type=int, default=7200, help="Lifetime of issued tenant tokens (seconds)")
+        parser.add_argument("--modified-field", help="ModifiedTime column to stamp on every write, e.g. 'Last Modified Time'")
+
+    def handle(self, *args, **options):
+        server = FakeLarkServer(
+            host=options["host"],
+            port=options["port"],
+            latency=options["latency"] / 1000,
+            jitter=options["jitter"] / 1000,
+            per_record_latency=options["per_record_latency"] / 1000,
+            error_rate=options["error_rate"],
+            qps=options["qps"],
+            token_ttl=options["token_ttl"],
+            modified_field=options["modified_field"],
+        )
+        self.stdout.write(f"Fake Lark open API on {server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            calls = ", ".join(f"{endpoint}={count}" for endpoint, count in sorted(server.calls.items()))
+            self.stdout.write(f"Fake Lark stopped. Calls: {calls or 'none'}")
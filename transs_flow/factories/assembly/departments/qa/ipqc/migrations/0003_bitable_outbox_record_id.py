@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0002_bitable_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bitableoutbox',
+            name='record_id',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
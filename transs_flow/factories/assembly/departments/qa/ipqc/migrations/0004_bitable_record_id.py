@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0003_bitable_outbox_record_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assdummytest',
+            name='bitable_record_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='btbfitmentchecksheet',
+            name='bitable_record_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='dustcountcheck',
+            name='bitable_record_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='esdcompliancechecklist',
+            name='bitable_record_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='ipqcassemblyaudit',
+            name='bitable_record_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='ipqcdisassemblechecklist',
+            name='bitable_record_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='ipqcworkinfo',
+            name='bitable_record_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='ncissuetracking',
+            name='bitable_record_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='testingfirstarticleinspection',
+            name='bitable_record_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0004_bitable_record_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bitableoutbox',
+            name='action',
+            field=models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('attach', 'Attach files')], default='create', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='BitableMedia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64)),
+                ('parent_node', models.CharField(max_length=64)),
+                ('file_token', models.CharField(max_length=64)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('sha256', 'parent_node'), name='ipqc_bitablemedia_unique_hash')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0005_bitable_media'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BitableWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=128, unique=True)),
+                ('emp_id', models.CharField(max_length=20)),
+                ('model', models.CharField(max_length=100)),
+                ('date', models.DateField()),
+                ('status', models.CharField(max_length=50)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='ipqcworkinfo',
+            name='status',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='ipqcworkinfo',
+            index=models.Index(fields=['emp_id', 'model', 'date'], name='ipqc_ipqcwo_emp_id_700ef5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bitablewebhookevent',
+            index=models.Index(fields=['processed_at', 'id'], name='ipqc_bitabl_process_2460f8_idx'),
+        ),
+    ]
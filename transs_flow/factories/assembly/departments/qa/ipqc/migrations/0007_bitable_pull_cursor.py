@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0006_webhook_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BitablePullCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table_id', models.CharField(max_length=100, unique=True)),
+                ('model_label', models.CharField(max_length=100)),
+                ('last_modified_ms', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
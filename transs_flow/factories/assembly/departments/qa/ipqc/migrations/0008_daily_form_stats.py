@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0007_bitable_pull_cursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyFormStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('shift', models.CharField(blank=True, default='', max_length=20)),
+                ('emp_id', models.CharField(blank=True, default='', max_length=20)),
+                ('line', models.CharField(blank=True, default='', max_length=100)),
+                ('model', models.CharField(blank=True, default='', max_length=100)),
+                ('form_type', models.CharField(choices=[('esd', 'ESD Compliance'), ('disassemble', 'IPQC Disassemble'), ('fai', 'Testing FAI'), ('operator_qualification', 'Operator Qualification')], max_length=30)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['form_type', 'date'], name='ipqc_dailyf_form_ty_9e780e_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'shift', 'emp_id', 'line', 'model', 'form_type'), name='ipqc_dailyformstats_unique_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0008_daily_form_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='esdcompliancechecklist',
+            index=models.Index(fields=['emp_id', 'date'], name='ipqc_esdcom_emp_id_fe0b3a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='esdcompliancechecklist',
+            index=models.Index(fields=['date', 'created_at'], name='ipqc_esdcom_date_cd18e4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ipqcassemblyaudit',
+            index=models.Index(fields=['emp_id', 'date'], name='ipqc_ipqcas_emp_id_0005cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ipqcassemblyaudit',
+            index=models.Index(fields=['emp_id', 'created_at'], name='ipqc_ipqcas_emp_id_66cc0a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ipqcdisassemblechecklist',
+            index=models.Index(fields=['emp_id', 'date'], name='ipqc_ipqcdi_emp_id_32d145_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ipqcdisassemblechecklist',
+            index=models.Index(fields=['created_at'], name='ipqc_ipqcdi_created_9cb609_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ipqcworkinfo',
+            index=models.Index(fields=['emp_id', 'date'], name='ipqc_ipqcwo_emp_id_0edb42_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ipqcworkinfo',
+            index=models.Index(fields=['emp_id', 'created_at'], name='ipqc_ipqcwo_emp_id_b856e6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='operatorqualificationcheck',
+            index=models.Index(fields=['created_at'], name='ipqc_operat_created_b54a77_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='operatorqualificationcheck',
+            index=models.Index(fields=['emp_id', 'date'], name='ipqc_operat_emp_id_9cd3a1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testingfirstarticleinspection',
+            index=models.Index(fields=['date', 'created_at'], name='ipqc_testin_date_f4be5b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testingfirstarticleinspection',
+            index=models.Index(fields=['inspector_name', 'date', 'created_at'], name='ipqc_testin_inspect_f75088_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testingfirstarticleinspection',
+            index=models.Index(fields=['emp_id', 'date'], name='ipqc_testin_emp_id_0c889a_idx'),
+        ),
+    ]
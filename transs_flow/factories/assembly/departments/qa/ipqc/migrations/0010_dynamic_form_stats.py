@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0009_checklist_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DynamicFormStats',
+            fields=[
+                ('form', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='ipqc.dynamicform')),
+                ('submission_count', models.PositiveIntegerField(default=0)),
+                ('last_submission_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DynamicFormFieldStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field_name', models.CharField(max_length=200)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.FloatField(default=0)),
+                ('min_value', models.FloatField(blank=True, null=True)),
+                ('max_value', models.FloatField(blank=True, null=True)),
+                ('form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='field_stats', to='ipqc.dynamicform')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('form', 'field_name'), name='ipqc_dynamicformfieldstats_unique_field')],
+            },
+        ),
+    ]
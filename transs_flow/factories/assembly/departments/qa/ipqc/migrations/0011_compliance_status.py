@@ -0,0 +1,61 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0010_dynamic_form_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='esdcompliancechecklist',
+            name='fail_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='esdcompliancechecklist',
+            name='na_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='esdcompliancechecklist',
+            name='overall_status',
+            field=models.CharField(choices=[('PASS', 'Pass'), ('FAIL', 'Fail'), ('MIXED', 'Mixed'), ('N/A', 'N/A')], default='N/A', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='esdcompliancechecklist',
+            name='pass_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ipqcdisassemblechecklist',
+            name='fail_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ipqcdisassemblechecklist',
+            name='na_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ipqcdisassemblechecklist',
+            name='overall_status',
+            field=models.CharField(choices=[('PASS', 'Pass'), ('FAIL', 'Fail'), ('MIXED', 'Mixed'), ('N/A', 'N/A')], default='N/A', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='ipqcdisassemblechecklist',
+            name='pass_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='esdcompliancechecklist',
+            index=models.Index(fields=['overall_status', 'date'], name='ipqc_esdcom_overall_27bb92_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ipqcdisassemblechecklist',
+            index=models.Index(fields=['overall_status', 'date'], name='ipqc_ipqcdi_overall_30e185_idx'),
+        ),
+    ]
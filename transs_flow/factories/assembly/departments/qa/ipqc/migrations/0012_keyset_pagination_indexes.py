@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0011_compliance_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assdummytest',
+            index=models.Index(fields=['created_at'], name='ipqc_assdum_created_020ecf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='btbfitmentchecksheet',
+            index=models.Index(fields=['created_by', 'created_at'], name='ipqc_btbfit_created_0d562d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='btbfitmentchecksheet',
+            index=models.Index(fields=['created_at'], name='ipqc_btbfit_created_22917b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dustcountcheck',
+            index=models.Index(fields=['created_at'], name='ipqc_dustco_created_d89e4c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='esdcompliancechecklist',
+            index=models.Index(fields=['created_at'], name='ipqc_esdcom_created_1f8138_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ipqcassemblyaudit',
+            index=models.Index(fields=['created_at'], name='ipqc_ipqcas_created_bcab2b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ncissuetracking',
+            index=models.Index(fields=['created_at'], name='ipqc_ncissu_created_825ecd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testingfirstarticleinspection',
+            index=models.Index(fields=['created_at'], name='ipqc_testin_created_deaf8e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testingfirstarticleinspection',
+            index=models.Index(fields=['inspector_name', 'created_at'], name='ipqc_testin_inspect_542415_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0012_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_id', models.BigIntegerField()),
+                ('term', models.CharField(max_length=3)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='dustcountcheck',
+            index=models.Index(fields=['emp_id', 'created_at'], name='ipqc_dustco_emp_id_872c4a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ncissuetracking',
+            index=models.Index(fields=['emp_id', 'created_at'], name='ipqc_ncissu_emp_id_3fb67b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testingfirstarticleinspection',
+            index=models.Index(fields=['imei_number'], name='ipqc_testin_imei_nu_bcfab4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='searchterm',
+            index=models.Index(fields=['model_label', 'object_id'], name='ipqc_search_model_l_7b8170_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('model_label', 'term', 'object_id'), name='ipqc_searchterm_unique_term'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0013_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IMEIRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('imei', models.CharField(max_length=20)),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_id', models.BigIntegerField()),
+                ('field', models.CharField(max_length=30)),
+                ('date', models.DateField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['imei', 'date'], name='ipqc_imeire_imei_cdbb85_idx')],
+                'constraints': [models.UniqueConstraint(fields=('model_label', 'object_id', 'field'), name='ipqc_imeirecord_unique_field')],
+            },
+        ),
+    ]
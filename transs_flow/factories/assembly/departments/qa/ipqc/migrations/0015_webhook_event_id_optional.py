@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0014_imei_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bitablewebhookevent',
+            name='event_id',
+            field=models.CharField(blank=True, max_length=128, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:23
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def regroup_fai_stats(apps, schema_editor):
+    """The FAI rollup rows are now keyed by inspector too: recount them."""
+    DailyFormStats = apps.get_model('ipqc', 'DailyFormStats')
+    TestingFirstArticleInspection = apps.get_model('ipqc', 'TestingFirstArticleInspection')
+    db = schema_editor.connection.alias
+    key_fields = ('date', 'shift', 'emp_id', 'inspector_name', 'line', 'model')
+
+    buckets = {}
+    rows = TestingFirstArticleInspection.objects.using(db).order_by().values(*key_fields).annotate(records=Count('id'))
+    for row in rows.iterator(chunk_size=2000):
+        key = tuple(row[name] if name == 'date' else (row[name] or '') for name in key_fields)
+        buckets[key] = buckets.get(key, 0) + row['records']
+
+    DailyFormStats.objects.using(db).filter(form_type='fai').delete()
+    DailyFormStats.objects.using(db).bulk_create(
+        [DailyFormStats(form_type='fai', count=count, **dict(zip(key_fields, key))) for key, count in buckets.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipqc', '0015_webhook_event_id_optional'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='dailyformstats',
+            name='ipqc_dailyformstats_unique_key',
+        ),
+        migrations.AddField(
+            model_name='dailyformstats',
+            name='inspector_name',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyformstats',
+            constraint=models.UniqueConstraint(fields=('date', 'shift', 'emp_id', 'inspector_name', 'line', 'model', 'form_type'), name='ipqc_dailyformstats_unique_key'),
+        ),
+        migrations.RunPython(regroup_fai_stats, migrations.RunPython.noop),
+    ]
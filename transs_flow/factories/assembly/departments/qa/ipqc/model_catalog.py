@@ -0,0 +1,88 @@
+"""
+Process-local catalog of product model names (``defaultdb.model_description``).
+
+The work info form's model choices and the model autocomplete used to query
+the remote defaultdb on every form and every keystroke. The names change a
+few times a month, so each process now loads them once, keeps them sorted
+in memory and reloads them every CATALOG_TTL seconds. A reload that finds
+the same names keeps the same ``version``, which the autocomplete sends as
+its ETag, so browsers can revalidate cached suggestions with a 304.
+
+If defaultdb cannot be reached, the last catalog loaded keeps being served
+and the load is retried after RETRY_AFTER seconds.
+"""
+import bisect
+import hashlib
+import logging
+import threading
+import time
+
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TTL = 300   # seconds before the names are reloaded
+RETRY_AFTER = 30    # seconds before a failed load is retried
+
+_catalog = None
+_expires_at = 0.0
+_lock = threading.Lock()
+
+
+class ModelCatalog:
+    """Model names sorted case-insensitively, with a prefix index for autocomplete."""
+
+    def __init__(self, names):
+        self.names = tuple(sorted(set(names), key=lambda name: (name.lower(), name)))
+        self._keys = [name.lower() for name in self.names]
+        self.version = hashlib.sha1("\n".join(self.names).encode()).hexdigest()[:16]
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, text, limit=20):
+        """
+        Up to ``limit`` names containing ``text`` (case-insensitive): names
+        starting with it first, from the sorted index, then the other matches.
+        """
+        text = text.strip().lower()
+        if not text:
+            return list(self.names[:limit])
+        start = bisect.bisect_left(self._keys, text)
+        end = bisect.bisect_left(self._keys, text + "\U0010ffff", lo=start)
+        matches = list(self.names[start:min(end, start + limit)])
+        if len(matches) < limit:
+            # A few thousand short names: scanning them is cheaper than keeping an n-gram index.
+            for index, key in enumerate(self._keys):
+                if text in key and not start <= index < end:
+                    matches.append(self.names[index])
+                    if len(matches) == limit:
+                        break
+        return matches
+
+
+def load_names():
+    with connections['defaultdb'].cursor() as cursor:
+        cursor.execute("SELECT model_name FROM model_description")
+        return [row[0] for row in cursor.fetchall() if row[0]]
+
+
+def get_catalog(refresh=False):
+    """The current catalog, reloaded first when it is older than CATALOG_TTL (or ``refresh``)."""
+    global _catalog, _expires_at
+    if not refresh and _catalog is not None and time.monotonic() < _expires_at:
+        return _catalog
+    with _lock:
+        if refresh or _catalog is None or time.monotonic() >= _expires_at:
+            try:
+                catalog = ModelCatalog(load_names())
+            except DatabaseError as e:
+                logger.warning("Could not load the model catalog: %s", e)
+                _catalog = _catalog or ModelCatalog([])
+                _expires_at = time.monotonic() + RETRY_AFTER
+            else:
+                # Keep the old object when nothing changed, so its version (ETag) stays the same.
+                if _catalog is None or catalog.version != _catalog.version:
+                    _catalog = catalog
+                _expires_at = time.monotonic() + CATALOG_TTL
+    return _catalog
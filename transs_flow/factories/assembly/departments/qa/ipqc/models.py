@@ -1,14 +1,135 @@
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
+from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Greatest, Least
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from django.conf import settings
+import copy
 import os
 import uuid
+from datetime import timedelta
 
 
 
 User = get_user_model()
 
+
+class BitableSyncedModel(models.Model):
+    """
+    Base for models mirrored to a Lark Bitable table.
+
+    Saves run inside a transaction so the outbox row written by the post_save
+    receiver commits (or rolls back) together with the record itself.
+
+    Field values are snapshotted when a row is loaded and after every save,
+    so the receiver can tell which fields an edit changed and queue a Bitable
+    update of just those columns.
+    """
+    bitable_table_setting = None  # name of the LARK_TABLE_* setting
+
+    bitable_record_id = models.CharField(max_length=64, blank=True, db_index=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_field_values()
+        return instance
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+        self.snapshot_field_values()
+
+    def snapshot_field_values(self):
+        snapshot = {}
+        for field in self._meta.concrete_fields:
+            if field.attname in self.__dict__:  # deferred fields are left out
+                value = self.__dict__[field.attname]
+                if isinstance(value, FieldFile):
+                    value = value.name
+                elif isinstance(value, (dict, list)):
+                    value = copy.deepcopy(value)
+                snapshot[field.attname] = value
+        self._loaded_values = snapshot
+
+    def changed_fields(self):
+        """
+        Names of the fields changed since the row was loaded or last saved;
+        None when that is unknown (the instance was not loaded from the DB).
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return None
+        return {
+            field.name
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+            and (field.attname not in loaded or loaded[field.attname] != self.__dict__[field.attname])
+        }
+
+
+class ComplianceStatusModel(models.Model):
+    """
+    Base for checklists whose answers add up to an overall result.
+
+    The pass/fail/NA counts over ``compliance_fields`` and the overall status
+    are stored on every save, so lists and dashboards can filter on them in
+    SQL. ``manage.py backfill_compliance_status`` fills them in for old rows.
+    """
+    STATUS_PASS = "PASS"
+    STATUS_FAIL = "FAIL"
+    STATUS_MIXED = "MIXED"
+    STATUS_NA = "N/A"
+    OVERALL_STATUS_CHOICES = [
+        (STATUS_PASS, "Pass"),
+        (STATUS_FAIL, "Fail"),
+        (STATUS_MIXED, "Mixed"),
+        (STATUS_NA, "N/A"),
+    ]
+    COMPLIANCE_FIELDS = ()        # answer fields to count
+    PASS_VALUE = "OK"             # answer values meaning pass / fail / not applicable
+    FAIL_VALUE = "NOT_OK"
+    NA_VALUE = "NA"
+    COUNT_FIELDS = ("pass_count", "fail_count", "na_count", "overall_status")
+
+    pass_count = models.PositiveSmallIntegerField(default=0, editable=False)
+    fail_count = models.PositiveSmallIntegerField(default=0, editable=False)
+    na_count = models.PositiveSmallIntegerField(default=0, editable=False)
+    overall_status = models.CharField(max_length=10, choices=OVERALL_STATUS_CHOICES, default=STATUS_NA, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def refresh_compliance(self):
+        """Recount the answers and set overall_status; returns True when anything changed"""
+        before = tuple(getattr(self, name) for name in self.COUNT_FIELDS)
+        values = [getattr(self, name) for name in self.COMPLIANCE_FIELDS]
+        self.pass_count = values.count(self.PASS_VALUE)
+        self.fail_count = values.count(self.FAIL_VALUE)
+        self.na_count = values.count(self.NA_VALUE)
+        if self.fail_count:
+            self.overall_status = self.STATUS_FAIL
+        elif self.pass_count and self.na_count:
+            self.overall_status = self.STATUS_MIXED
+        elif self.pass_count:
+            self.overall_status = self.STATUS_PASS
+        else:
+            self.overall_status = self.STATUS_NA
+        return before != tuple(getattr(self, name) for name in self.COUNT_FIELDS)
+
+    def save(self, *args, **kwargs):
+        self.refresh_compliance()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | set(self.COUNT_FIELDS)
+        super().save(*args, **kwargs)
+
+
 # class IPQCWorkInfo(models.Model):
     
 #     SHIFT_CHOICES = [
@@ -35,7 +156,8 @@ User = get_user_model()
 #             self.created_at = timezone.now()
 #         super().save(*args, **kwargs)
 
-class IPQCWorkInfo(models.Model):
+class IPQCWorkInfo(BitableSyncedModel):
+    bitable_table_setting = "LARK_TABLE_IPQC_WORK_INFO"
     
     SHIFT_CHOICES = [
         ('Day', 'Day'),
@@ -57,8 +179,16 @@ class IPQCWorkInfo(models.Model):
     group = models.CharField(max_length=50)
     model = models.CharField(max_length=100)
     color = models.CharField(max_length=50)
+    status = models.CharField(max_length=50, blank=True, default="")  # set from Lark by the Bitable webhook
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["emp_id", "model", "date"]),
+            models.Index(fields=["emp_id", "date"]),         # dashboard counters
+            models.Index(fields=["emp_id", "created_at"]),   # filled-in check, latest work info
+        ]
+
     def __str__(self):
         return f"{self.date} - {self.emp_id} - {self.model})"
         
@@ -104,6 +234,113 @@ class DynamicFormSubmission(models.Model):
     data = models.JSONField()  # store submitted values
     created_at = models.DateTimeField(auto_now_add=True)
 
+
+def numeric_values(data):
+    """field -> value for the numeric answers of a submission (checkboxes are not numbers)"""
+    return {
+        field: float(value)
+        for field, value in (data or {}).items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+
+class DynamicFormStatsManager(models.Manager):
+    def record(self, submission, sign=1):
+        """Add (``sign=1``) or remove (``sign=-1``) one submission from its form's summaries."""
+        form_id = submission.form_id
+        updated = self.filter(form_id=form_id).update(submission_count=models.F("submission_count") + sign)
+        if not updated and sign > 0:
+            try:
+                with transaction.atomic(using=self.db):
+                    self.create(form_id=form_id, submission_count=1, last_submission_at=submission.created_at)
+            except IntegrityError:
+                self.filter(form_id=form_id).update(submission_count=models.F("submission_count") + 1)
+        if sign > 0:
+            self.filter(form_id=form_id).filter(
+                models.Q(last_submission_at__isnull=True) | models.Q(last_submission_at__lt=submission.created_at)
+            ).update(last_submission_at=submission.created_at)
+
+        for field, value in numeric_values(submission.data).items():
+            DynamicFormFieldStats.objects.record(form_id, field, value, sign)
+
+
+class DynamicFormStats(models.Model):
+    """
+    Running totals of a dynamic form's submissions, kept by the signals below
+    so the form dashboard does not read the submissions.
+    ``manage.py rebuild_dynamic_form_stats`` recomputes them.
+    """
+    form = models.OneToOneField(DynamicForm, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    submission_count = models.PositiveIntegerField(default=0)
+    last_submission_at = models.DateTimeField(null=True, blank=True)
+
+    objects = DynamicFormStatsManager()
+
+    def __str__(self):
+        return f"{self.form_id}: {self.submission_count} submissions"
+
+
+class DynamicFormFieldStatsManager(models.Manager):
+    def record(self, form_id, field_name, value, sign=1):
+        key = {"form_id": form_id, "field_name": field_name[:200]}
+        if sign < 0:
+            self.filter(**key).update(count=models.F("count") - 1, total=models.F("total") - value)
+            # The removed value may have been the min or max: take the range again from what is left.
+            if self.filter(**key).filter(models.Q(min_value=value) | models.Q(max_value=value)).exists():
+                self.refresh_range(form_id, key["field_name"])
+            return
+        updated = self.filter(**key).update(
+            count=models.F("count") + 1,
+            total=models.F("total") + value,
+            min_value=Least("min_value", models.Value(value)),
+            max_value=Greatest("max_value", models.Value(value)),
+        )
+        if updated:
+            return
+        try:
+            with transaction.atomic(using=self.db):
+                self.create(count=1, total=value, min_value=value, max_value=value, **key)
+        except IntegrityError:
+            self.record(form_id, field_name, value, sign)
+
+    def refresh_range(self, form_id, field_name):
+        """Recompute min_value/max_value of one field from the form's stored submissions."""
+        low = high = None
+        submissions = (
+            DynamicFormSubmission.objects.filter(form_id=form_id).order_by()
+            .values_list("data", flat=True).iterator(chunk_size=2000)
+        )
+        for data in submissions:
+            for name, value in numeric_values(data).items():
+                if name[:200] == field_name:
+                    low = value if low is None else min(low, value)
+                    high = value if high is None else max(high, value)
+        self.filter(form_id=form_id, field_name=field_name).update(min_value=low, max_value=high)
+
+
+class DynamicFormFieldStats(models.Model):
+    """Count, sum, min and max of one numeric field of a dynamic form"""
+    form = models.ForeignKey(DynamicForm, on_delete=models.CASCADE, related_name="field_stats")
+    field_name = models.CharField(max_length=200)
+    count = models.PositiveIntegerField(default=0)
+    total = models.FloatField(default=0)
+    min_value = models.FloatField(null=True, blank=True)
+    max_value = models.FloatField(null=True, blank=True)
+
+    objects = DynamicFormFieldStatsManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["form", "field_name"], name="ipqc_dynamicformfieldstats_unique_field"),
+        ]
+
+    def __str__(self):
+        return f"{self.form_id} {self.field_name}: n={self.count}"
+
+    @property
+    def mean(self):
+        return round(self.total / self.count, 2) if self.count else None
+
 # Define the choices for the audit fields
 AUDIT_CHOICES = [
     ('OK', 'OK'),
@@ -111,7 +348,8 @@ AUDIT_CHOICES = [
     ('NA', 'NA'),
 ]
  
-class  IPQCAssemblyAudit(models. Model):
+class IPQCAssemblyAudit(BitableSyncedModel):
+    bitable_table_setting = "LARK_TABLE_ASSEMBLY_AUDIT"
     # Basic Info
     date = models. DateField(default=timezone.now, verbose_name="Date")
     shift = models. CharField(max_length=50, verbose_name="Shift", blank=True, null=True)
@@ -197,6 +435,13 @@ class  IPQCAssemblyAudit(models. Model):
     ipqc_sign = models. CharField(max_length=100, blank=True, null=True, verbose_name="IPQC Sign")
     pqe_tl_sign = models. CharField(max_length=100, blank=True, null=True, verbose_name="PQE/TL Sign")
     
+    class Meta:
+        indexes = [
+            models.Index(fields=["emp_id", "date"]),         # dashboard counters
+            models.Index(fields=["emp_id", "created_at"]),   # recent audits, audit list
+            models.Index(fields=["created_at"]),             # audit list (admin), keyset pages
+        ]
+    
     def __str__(self):
         return f"{self.model} - {self.date} - {self.emp_id}"
     
@@ -204,7 +449,8 @@ class  IPQCAssemblyAudit(models. Model):
     
     
     
-class  BTBFitmentChecksheet(models. Model):
+class BTBFitmentChecksheet(BitableSyncedModel):
+    bitable_table_setting = "LARK_TABLE_BTB_FITMENT_CHECKSHEET"
     # --- Header Information ---
     date = models.DateField(verbose_name="Date")
     shift = models.CharField(max_length=20, verbose_name="Shift")
@@ -331,6 +577,12 @@ class  BTBFitmentChecksheet(models. Model):
 
     grand_total = models. IntegerField(default=0, verbose_name="Grand Total", editable=False)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_by", "created_at"]),   # inspector's own checksheets, keyset pages
+            models.Index(fields=["created_at"]),                 # list page (admin), keyset pages
+        ]
+    
     def __str__(self):
         return f"{self.model} - {self.date}"
 
@@ -374,7 +626,8 @@ class  BTBFitmentChecksheet(models. Model):
         super().save(*args, **kwargs)
         
         
-class AssDummyTest(models.Model):
+class AssDummyTest(BitableSyncedModel):
+    bitable_table_setting = "LARK_TABLE_BUMMY_CHECKSHEET"
     date = models.DateField()
     shift = models.CharField(max_length=50)
     emp_id = models.CharField(max_length=50)
@@ -407,11 +660,17 @@ class AssDummyTest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"]),             # list page, keyset pages
+        ]
+
     def __str__(self):
         return f"{self.date} - {self.line} - {self.group} - {self.test_item}"
     
     
-class IPQCDisassembleCheckList(models.Model):
+class IPQCDisassembleCheckList(ComplianceStatusModel, BitableSyncedModel):
+    bitable_table_setting = "LARK_TABLE_DESSEMBLE_CHECKLIST"
     
     FORM_CHOICES = [
         ('OK', 'OK'),
@@ -512,10 +771,32 @@ class IPQCDisassembleCheckList(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    COMPLIANCE_FIELDS = (
+        'color_match', 'cam_lens_assembly', 'cam_lens_cleanliness', 'key_feel', 'key_alignment',
+        'screw_missing', 'screw_loose', 'screw_spec', 'front_housing_damage', 'back_housing_damage',
+        'housing_snap_fit', 'proof_label_position', 'tp_sop', 'mic_solder', 'led_solder', 'lcd_stick',
+        'speaker_solder', 'motor_solder', 'key_solder', 'sim_subboard_solder', 'subboard_solder',
+        'camera_solder', 'receiver_solder', 'coaxial_line', 'antenna_shrapnel', 'antenna_fpc',
+        'conductive_fabric', 'insulation_paste', 'ins_paste_cover', 'lcd_fpc_defect', 'tp_fpc_defect',
+        'key_fpc_solder', 'keypad_defect', 'mainboard_component_ok', 'solder_splash', 'foam_stick',
+        'cam_glue', 'led_position', 'jig_fixture_test', 'glue_location',
+    )
+    PASS_VALUE = 'OK'
+    FAIL_VALUE = 'Not OK'
+    NA_VALUE = 'NA'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["emp_id", "date"]),         # dashboard counters
+            models.Index(fields=["created_at"]),             # list page, keyset pages
+            models.Index(fields=["overall_status", "date"]),
+        ]
+
     def __str__(self):
         return f"{self.date} - {self.model} - {self.name}"
 
-class NCIssueTracking(models.Model):
+class NCIssueTracking(BitableSyncedModel):
+    bitable_table_setting = "LARK_TABLE_NC_ISSUE_TRACKING"
     # --- Work Info (existing fields) ---
     date = models.DateField(verbose_name="Date")
     shift = models.CharField(max_length=10, verbose_name="Shift")
@@ -546,6 +827,12 @@ class NCIssueTracking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"]),             # list page, keyset pages
+            models.Index(fields=["emp_id", "created_at"]),   # employee ID search
+        ]
+
     def __str__(self):
         return f"{self.date} - {self.model} - {self.issue[:20]}"
 
@@ -562,7 +849,8 @@ SHIFT_CHOICES = [
     ('Night', 'Night'),
 ]
 
-class ESDComplianceChecklist(models.Model):
+class ESDComplianceChecklist(ComplianceStatusModel, BitableSyncedModel):
+    bitable_table_setting = "LARK_TABLE_ESD_COMPLIANCE"
     date = models.DateField(verbose_name="Date")
     shift = models.CharField(max_length=10, choices=SHIFT_CHOICES, verbose_name="Shift")
     emp_id = models.CharField(max_length=20, verbose_name="Employee ID")
@@ -643,12 +931,35 @@ class ESDComplianceChecklist(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    COMPLIANCE_FIELDS = (
+        'epa_clothes', 'forbid_wear_out', 'no_accessories', 'clothes_clean',
+        'collar_cover', 'all_buttons_closed', 'clothes_length', 'watch_expose',
+        'hair_cap', 'slipper_check', 'wristband_check', 'pre_line_check',
+        'wrist_touch_skin', 'no_touch_pcba', 'alert_plug_out',
+        'trolley_grounding', 'device_grounded', 'grounding_points_tight',
+        'ion_fan_distance', 'ion_fan_direction', 'gloves_condition',
+        'mat_grounded', 'audit_label_valid', 'esds_box', 'table_no_source',
+        'tools_audit', 'temp_humidity', 'tray_voltage',
+    )
+    PASS_VALUE = 'YES'
+    FAIL_VALUE = 'NO'
+    NA_VALUE = 'NA'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["emp_id", "date"]),         # dashboard counters
+            models.Index(fields=["date", "created_at"]),     # date range filters
+            models.Index(fields=["created_at"]),             # list page, keyset pages
+            models.Index(fields=["overall_status", "date"]),
+        ]
+
     def __str__(self):
         return f"{self.date} - {self.line} - {self.name}"
 
 
 
-class DustCountCheck(models.Model):
+class DustCountCheck(BitableSyncedModel):
+    bitable_table_setting = "LARK_TABLE_DUST_MEASUREMENT"
     date = models.DateField(verbose_name="Date")
     shift = models.CharField(max_length=10, verbose_name="Shift")
     emp_id = models.CharField(max_length=20, verbose_name="Employee ID")
@@ -672,6 +983,12 @@ class DustCountCheck(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"]),             # list page, keyset pages
+            models.Index(fields=["emp_id", "created_at"]),   # employee ID search
+        ]
+    
     def __str__(self):
         return f"{self.date} - Checked: {self.checked_by} - Verified: {self.verified_by}"
     
@@ -713,7 +1030,8 @@ def fai_evidence_upload_path(instance, filename):
         f"{instance.id}_{instance.model_color}_{timezone.now().strftime('%Y%m%d')}_{filename}"
     )
 
-class  TestingFirstArticleInspection(models. Model):
+class TestingFirstArticleInspection(BitableSyncedModel):
+    bitable_table_setting = "LARK_TABLE_TESTING_FAI"
     """
     Comprehensive First Article Inspection (FAI) model with all inspection criteria
     and evidence management for visual, functional, and reliability checks.
@@ -724,6 +1042,14 @@ class  TestingFirstArticleInspection(models. Model):
         verbose_name = "First Article Inspection"
         verbose_name_plural = "First Article Inspections"
         ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=["date", "created_at"]),                     # default ordering
+            models.Index(fields=["inspector_name", "date", "created_at"]),   # inspector's own records, counters
+            models.Index(fields=["created_at"]),                             # list page, keyset pages
+            models.Index(fields=["inspector_name", "created_at"]),           # inspector's own list, keyset pages
+            models.Index(fields=["imei_number"]),                            # IMEI search
+            models.Index(fields=["emp_id", "date"]),
+        ]
  
     # --- Core Information ---
     date = models. DateField(verbose_name="Date")
@@ -919,10 +1245,20 @@ class OperatorQualificationCheck(models.Model):
         verbose_name = "Operator Qualification Procedure"
         verbose_name_plural = "Operator Qualification Procedures"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at"]),             # list page, default ordering, keyset pages
+            models.Index(fields=["emp_id", "date"]),
+        ]
 
     def __str__(self):
         return f"{self.date} - {self.emp_id} - {self.model}"
 
+    def save(self, *args, **kwargs):
+        # Not Bitable-synced, but its daily stats bump (post_save) must commit with the row.
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
 
 
 
@@ -931,55 +1267,623 @@ class OperatorQualificationCheck(models.Model):
 
 
 
-from django.db.models.signals import post_save
+class BitableOutboxManager(models.Manager):
+    def build(self, instance=None, action="create", table_id=None, payload=None):
+        """Unsaved outbox row for a synced model instance, or for a raw ``payload`` of Bitable fields."""
+        if instance is not None:
+            if table_id is None:
+                table_id = getattr(settings, instance.bitable_table_setting or "", "") or ""
+            return self.model(
+                model_label=instance._meta.label_lower,
+                object_id=instance.pk,
+                action=action,
+                table_id=table_id,
+                payload=payload,
+            )
+        return self.model(action=action, table_id=table_id or "", payload=payload)
+
+    def enqueue(self, instance=None, action="create", table_id=None, payload=None):
+        """
+        Queue a Lark Bitable write. Pass a saved model instance, or a raw
+        ``payload`` of Bitable fields with the target ``table_id``.
+        """
+        entry = self.build(instance, action, table_id, payload)
+        entry.save(using=self.db)
+        return entry
+
+    def enqueue_coalesced(self, instance, action="update", columns=None):
+        """
+        Queue an update (of ``columns`` only, or of every mapped column when
+        None) or attach for a saved record. The row waits
+        LARK_UPDATE_COALESCE_SECONDS before it is sent, and later edits made
+        in the meantime are merged into it instead of adding rows.
+        """
+        with transaction.atomic(using=self.db):
+            # attempts=0: not picked up by a worker yet. Rows being claimed right now are skipped.
+            pending = (
+                self.select_for_update(skip_locked=True)
+                .filter(model_label=instance._meta.label_lower, object_id=instance.pk, action=action,
+                        status=self.model.STATUS_PENDING, attempts=0)
+                .order_by("id")
+                .first()
+            )
+            if pending is not None:
+                queued = (pending.payload or {}).get("columns")
+                if queued is not None:
+                    merged = None if columns is None else sorted(set(queued) | set(columns))
+                    pending.payload = None if merged is None else {"columns": merged}
+                    pending.save(using=self.db, update_fields=["payload"])
+                return pending
+
+            entry = self.build(instance, action, payload=None if columns is None else {"columns": sorted(columns)})
+            entry.next_attempt_at = timezone.now() + timedelta(seconds=getattr(settings, "LARK_UPDATE_COALESCE_SECONDS", 5))
+            entry.save(using=self.db)
+            return entry
+
+
+class BitableOutbox(models.Model):
+    """Pending Lark Bitable writes, drained by ``manage.py run_bitable_worker``."""
+    STATUS_PENDING = "PENDING"
+    STATUS_SENT = "SENT"
+    STATUS_FAILED = "FAILED"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    ACTION_CREATE = "create"
+    ACTION_UPDATE = "update"
+    ACTION_ATTACH = "attach"
+
+    ACTION_CHOICES = [
+        (ACTION_CREATE, "Create"),
+        (ACTION_UPDATE, "Update"),
+        (ACTION_ATTACH, "Attach files"),
+    ]
+
+    model_label = models.CharField(max_length=100, blank=True)  # e.g. "ipqc.dustcountcheck"
+    object_id = models.PositiveBigIntegerField(null=True, blank=True)
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES, default=ACTION_CREATE)
+    table_id = models.CharField(max_length=100, blank=True)
+    payload = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)  # raw fields for dynamic forms
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, null=True)
+    record_id = models.CharField(max_length=64, blank=True)  # Bitable record_id once sent
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = BitableOutboxManager()
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        target = f"{self.model_label}#{self.object_id}" if self.model_label else self.table_id
+        return f"{self.action} {target} ({self.status})"
+
+
+class BitableMedia(models.Model):
+    """
+    A file uploaded to Lark through the media API, by content hash, so the
+    same photo is never uploaded to a Bitable app twice.
+    """
+    sha256 = models.CharField(max_length=64)
+    parent_node = models.CharField(max_length=64)  # Bitable app token the file was uploaded to
+    file_token = models.CharField(max_length=64)
+    size = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["sha256", "parent_node"], name="ipqc_bitablemedia_unique_hash"),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} -> {self.file_token}"
+
+
+class BitablePullCursor(models.Model):
+    """How far ``manage.py pull_bitable_changes`` has read a Bitable table, by last-modified time."""
+    table_id = models.CharField(max_length=100, unique=True)
+    model_label = models.CharField(max_length=100)
+    last_modified_ms = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.model_label} ({self.table_id}) @ {self.last_modified_ms}"
+
+
+class BitableWebhookEvent(models.Model):
+    """
+    A work-info status change pushed by the Lark Bitable webhook. The unique
+    event_id drops redeliveries; rows not processed yet are the queue the
+    worker applies in bulk (see webhooks.apply_pending_events). Events
+    without a Lark event id have a NULL event_id and are all kept.
+    """
+    event_id = models.CharField(max_length=128, unique=True, null=True, blank=True)
+    emp_id = models.CharField(max_length=20)
+    model = models.CharField(max_length=100)
+    date = models.DateField()
+    status = models.CharField(max_length=50)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["processed_at", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id}: {self.emp_id} {self.model} {self.date} -> {self.status}"
+
+
+class DailyFormStatsManager(models.Manager):
+    def bump(self, form_type, key, delta):
+        """Add ``delta`` to the count of one (date, shift, emp_id, line, model) bucket of ``form_type``."""
+        key = {"form_type": form_type, **key}
+        if self.filter(**key).update(count=models.F("count") + delta) or delta < 0:
+            return
+        try:
+            with transaction.atomic(using=self.db):
+                self.create(count=delta, **key)
+        except IntegrityError:
+            # Created by a concurrent save in the meantime
+            self.filter(**key).update(count=models.F("count") + delta)
+
+    def summary(self, form_type, today=None, week_start=None, **filters):
+        """{'today', 'week', 'total'} record counts of ``form_type``, summed from the rollup rows."""
+        today = today or timezone.localdate()
+        if week_start is None:
+            week_start = today - timedelta(days=today.weekday())
+        totals = self.filter(form_type=form_type, **filters).aggregate(
+            today=models.Sum("count", filter=models.Q(date=today)),
+            week=models.Sum("count", filter=models.Q(date__gte=week_start, date__lte=today)),
+            total=models.Sum("count"),
+        )
+        return {name: value or 0 for name, value in totals.items()}
+
+
+class DailyFormStats(models.Model):
+    """
+    Record counts per day, shift, inspector, line and model for the checklist
+    forms, kept up to date by the save/delete signals below so list page
+    stats read a few rollup rows instead of counting the form tables.
+    ``manage.py rebuild_daily_stats`` recomputes them from scratch.
+    """
+    FORM_ESD = "esd"
+    FORM_DISASSEMBLE = "disassemble"
+    FORM_FAI = "fai"
+    FORM_OPERATOR_QUALIFICATION = "operator_qualification"
+    FORM_CHOICES = [
+        (FORM_ESD, "ESD Compliance"),
+        (FORM_DISASSEMBLE, "IPQC Disassemble"),
+        (FORM_FAI, "Testing FAI"),
+        (FORM_OPERATOR_QUALIFICATION, "Operator Qualification"),
+    ]
+    KEY_FIELDS = ("date", "shift", "emp_id", "inspector_name", "line", "model")
+
+    date = models.DateField()
+    shift = models.CharField(max_length=20, blank=True, default="")
+    emp_id = models.CharField(max_length=20, blank=True, default="")
+    # FAI lists are scoped by inspector, not emp_id; empty for the other forms
+    inspector_name = models.CharField(max_length=100, blank=True, default="")
+    line = models.CharField(max_length=100, blank=True, default="")
+    model = models.CharField(max_length=100, blank=True, default="")
+    form_type = models.CharField(max_length=30, choices=FORM_CHOICES)
+    count = models.IntegerField(default=0)
+
+    objects = DailyFormStatsManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "shift", "emp_id", "inspector_name", "line", "model", "form_type"],
+                name="ipqc_dailyformstats_unique_key",
+            ),
+        ]
+        indexes = [models.Index(fields=["form_type", "date"])]
+
+    def __str__(self):
+        return f"{self.form_type} {self.date} {self.shift} {self.emp_id} {self.line} {self.model}: {self.count}"
+
+    @classmethod
+    def key_fields_of(cls, model):
+        """The KEY_FIELDS ``model`` has; the others are empty in its rollup rows"""
+        names = {field.name for field in model._meta.concrete_fields}
+        return [name for name in cls.KEY_FIELDS if name in names]
+
+    @classmethod
+    def key_for(cls, values):
+        """Rollup key of a form row, from an instance or a ``values()`` dict"""
+        get = values.get if isinstance(values, dict) else lambda name: getattr(values, name, None)
+        return {name: get(name) if name == "date" else (get(name) or "") for name in cls.KEY_FIELDS}
+
+
+
+def trigrams(value):
+    """Lowercased 3-character substrings of ``value``, the terms of the search index"""
+    value = (value or "").lower()
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+class SearchTermManager(models.Manager):
+    def index(self, instance):
+        """Bring the stored terms of one row in line with its current search field values."""
+        label = instance._meta.label_lower
+        terms = set()
+        for name in SEARCH_FIELDS[type(instance)]:
+            terms |= trigrams(str(getattr(instance, name) or "")[:255])
+        stored = set(self.filter(model_label=label, object_id=instance.pk).values_list("term", flat=True))
+        if stored - terms:
+            self.filter(model_label=label, object_id=instance.pk, term__in=stored - terms).delete()
+        if terms - stored:
+            # Accent- and case-insensitive collations can see two of our terms as one.
+            self.bulk_create(
+                [self.model(model_label=label, object_id=instance.pk, term=term) for term in terms - stored],
+                ignore_conflicts=True,
+            )
+
+    def matching_ids(self, model, text):
+        """ids of ``model`` rows having every trigram of ``text`` (a superset of the rows containing it)"""
+        terms = trigrams(text)
+        return (
+            self.filter(model_label=model._meta.label_lower, term__in=terms)
+            .values("object_id")
+            .annotate(matched=models.Count("term"))
+            .filter(matched=len(terms))
+            .values("object_id")
+        )
+
+    def search(self, queryset, text):
+        """
+        Rows of ``queryset`` where one of the model's SEARCH_FIELDS contains
+        ``text`` (case-insensitive), without a leading-wildcard LIKE scan:
+
+        - digits only, on a model searching IMEIs: IMEIs starting with it;
+        - an ID-like value (has a digit, no spaces), on a model searching
+          emp_id: employee IDs starting with it;
+        - otherwise, rows holding every trigram of the text in the search
+          index, checked against the real columns.
+
+        The prefix fast paths are only taken when they find something. Text
+        shorter than three characters has no trigrams and falls back to the
+        plain icontains filter.
+        """
+        text = text.strip()
+        fields = SEARCH_FIELDS[queryset.model]
+        if not text:
+            return queryset
+
+        if text.isdigit() and "imei_number" in fields:
+            prefix = queryset.filter(imei_number__startswith=text)
+            if prefix.exists():
+                return prefix
+        if "emp_id" in fields and not any(ch.isspace() for ch in text) and any(ch.isdigit() for ch in text):
+            prefix = queryset.filter(emp_id__istartswith=text)
+            if prefix.exists():
+                return prefix
+
+        contains = models.Q()
+        for name in fields:
+            contains |= models.Q(**{f"{name}__icontains": text})
+        if len(text) < 3:
+            return queryset.filter(contains)
+        return queryset.filter(pk__in=self.matching_ids(queryset.model, text)).filter(contains)
+
+
+class SearchTerm(models.Model):
+    """
+    Trigram index of the checklist list search boxes: one row per distinct
+    lowercased 3-character substring of a record's SEARCH_FIELDS values,
+    kept up to date by the save/delete signals below. ``manage.py
+    rebuild_search_index`` recomputes it from scratch.
+    """
+    model_label = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    term = models.CharField(max_length=3)
+
+    objects = SearchTermManager()
+
+    class Meta:
+        constraints = [
+            # Also the lookup index: (model, term) -> object ids, read from the index alone.
+            models.UniqueConstraint(fields=["model_label", "term", "object_id"], name="ipqc_searchterm_unique_term"),
+        ]
+        indexes = [models.Index(fields=["model_label", "object_id"])]   # reindex and delete of one row
+
+    def __str__(self):
+        return f"{self.model_label} {self.object_id}: {self.term}"
+
+
+def normalize_imei(value):
+    """The digits of an IMEI as typed or scanned ("3569 8705-1234567" -> "356987051234567"), None if there are none"""
+    digits = "".join(ch for ch in str(value or "") if ch.isdigit())
+    return digits[:20] or None
+
+
+class IMEIRecordManager(models.Manager):
+    LOOKUP_CHUNK = 1000
+
+    def rows_for(self, instance):
+        """Unsaved index rows of one checklist record, one per IMEI field holding an IMEI"""
+        rows = []
+        for field in IMEI_FIELDS[type(instance)]:
+            imei = normalize_imei(getattr(instance, field))
+            if imei:
+                rows.append(self.model(
+                    imei=imei, model_label=instance._meta.label_lower, object_id=instance.pk,
+                    field=field, date=instance.date,
+                ))
+        return rows
+
+    def index(self, instance):
+        with transaction.atomic(using=self.db):
+            self.filter(model_label=instance._meta.label_lower, object_id=instance.pk).delete()
+            self.bulk_create(self.rows_for(instance))
+
+    def history(self, imeis):
+        """
+        {imei: [inspection, ...]} for the normalised ``imeis``, oldest first.
+        Each inspection is the index row plus the record's HISTORY_FIELDS
+        values, fetched with one query per checklist model per chunk.
+        """
+        history = {}
+        for start in range(0, len(imeis), self.LOOKUP_CHUNK):
+            chunk = imeis[start:start + self.LOOKUP_CHUNK]
+            rows = list(self.filter(imei__in=chunk).order_by("imei", "date", "object_id"))
+            records = {}
+            for model, fields in IMEI_HISTORY_FIELDS.items():
+                ids = [row.object_id for row in rows if row.model_label == model._meta.label_lower]
+                if ids:
+                    records[model._meta.label_lower] = model.objects.only(*fields).in_bulk(ids)
+            for row in rows:
+                record = records.get(row.model_label, {}).get(row.object_id)
+                if record is None:
+                    continue   # deleted since it was indexed
+                model = type(record)
+                history.setdefault(row.imei, []).append({
+                    "model_label": row.model_label,
+                    "id": row.object_id,
+                    "imei_field": row.field,
+                    **{name: getattr(record, name) for name in IMEI_HISTORY_FIELDS[model]},
+                })
+        return history
+
+
+class IMEIRecord(models.Model):
+    """
+    Where each IMEI was inspected: one row per IMEI field of a disassemble
+    or FAI checklist record, with the IMEI reduced to its digits, kept up to
+    date by the save/delete signals below. ``manage.py backfill_imei_index``
+    recomputes it from scratch.
+    """
+    imei = models.CharField(max_length=20)
+    model_label = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    field = models.CharField(max_length=30)
+    date = models.DateField(null=True, blank=True)
+
+    objects = IMEIRecordManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["model_label", "object_id", "field"], name="ipqc_imeirecord_unique_field"),
+        ]
+        indexes = [models.Index(fields=["imei", "date"])]
+
+    def __str__(self):
+        return f"{self.imei}: {self.model_label} {self.object_id} ({self.field})"
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from .services import sync_btb_fitment_to_bitable, sync_dummy_test_to_bitable, sync_dessembly_checklist_to_bitable, sync_ipqc_assembly_audit_to_bitable, sync_nc_issue_tracking_to_bitable, sync_esd_compliance_to_bitable, sync_dust_measurement_to_bitable, sync_testing_fai_to_bitable, update_testing_fai_in_bitable
 
+
+# Lark syncs are queued in the outbox and sent by the worker, so a checklist
+# submit never waits on open.larkoffice.com.
+@receiver(post_save, sender=IPQCWorkInfo)
 @receiver(post_save, sender=BTBFitmentChecksheet)
-def sync_to_bitable_after_save(sender, instance, created, **kwargs):
-    if created:
-        sync_btb_fitment_to_bitable(instance)
-           
 @receiver(post_save, sender=AssDummyTest)
-def sync_to_bitable_after_save(sender, instance, created, **kwargs):
-    if created:
-        sync_dummy_test_to_bitable(instance)
-        
 @receiver(post_save, sender=IPQCDisassembleCheckList)
-def sync_to_bitable_after_save(sender, instance, created, **kwargs):
-    if created:
-        sync_dessembly_checklist_to_bitable(instance)
-
 @receiver(post_save, sender=IPQCAssemblyAudit)
-def sync_to_bitable_after_save(sender, instance, created, **kwargs):
-    if created:
-        sync_ipqc_assembly_audit_to_bitable(instance)
-
 @receiver(post_save, sender=NCIssueTracking)
-def sync_to_bitable_after_save(sender, instance, created, **kwargs):
+@receiver(post_save, sender=ESDComplianceChecklist)
+@receiver(post_save, sender=DustCountCheck)
+@receiver(post_save, sender=TestingFirstArticleInspection)
+def enqueue_bitable_sync(sender, instance, created, raw=False, **kwargs):
+    """Create the Bitable record for new rows; for edits, update only the columns that changed"""
+    from .bitable_mapping import get_mapping
+
+    mapping = get_mapping(instance)
+    if raw or mapping is None:
+        return
+
+    has_files = any(getattr(instance, attachment.field) for attachment in mapping.attachments)
     if created:
-        sync_nc_issue_tracking_to_bitable(instance)
+        BitableOutbox.objects.enqueue(instance)
+        if has_files:
+            BitableOutbox.objects.enqueue(instance, action=BitableOutbox.ACTION_ATTACH)
+        return
+
+    changed = instance.changed_fields()
+    if changed is None:
+        # Not loaded from the DB, so the diff is unknown: resend everything.
+        BitableOutbox.objects.enqueue_coalesced(instance)
+        if has_files:
+            BitableOutbox.objects.enqueue_coalesced(instance, action=BitableOutbox.ACTION_ATTACH)
+        return
+
+    columns = mapping.columns_for_fields(changed)
+    if columns:
+        BitableOutbox.objects.enqueue_coalesced(instance, columns=columns)
+    if any(attachment.field in changed for attachment in mapping.attachments):
+        BitableOutbox.objects.enqueue_coalesced(instance, action=BitableOutbox.ACTION_ATTACH)
 
+
+def home_counts_cache_key(emp_id, day=None):
+    """Cache key of the IPQC home dashboard counters of one employee for ``day`` (default today)"""
+    return f"ipqc:home_counts:{emp_id}:{(day or timezone.localdate()).isoformat()}"
+
+
+@receiver(post_save, sender=IPQCWorkInfo)
+@receiver(post_save, sender=IPQCAssemblyAudit)
 @receiver(post_save, sender=ESDComplianceChecklist)
-def sync_to_bitable_after_save(sender, instance, created, **kwargs):
-    if created:
-        sync_esd_compliance_to_bitable(instance)
+@receiver(post_save, sender=IPQCDisassembleCheckList)
+@receiver(post_save, sender=TestingFirstArticleInspection)
+@receiver(post_delete, sender=IPQCWorkInfo)
+@receiver(post_delete, sender=IPQCAssemblyAudit)
+@receiver(post_delete, sender=ESDComplianceChecklist)
+@receiver(post_delete, sender=IPQCDisassembleCheckList)
+@receiver(post_delete, sender=TestingFirstArticleInspection)
+def invalidate_home_counts(sender, instance, raw=False, **kwargs):
+    """Drop the cached home counters of the employee whose record changed"""
+    if raw or not instance.emp_id:
+        return
+    key = home_counts_cache_key(instance.emp_id)
+    transaction.on_commit(lambda: cache.delete(key), using=router.db_for_write(sender))
+
+
+DAILY_STATS_FORMS = {
+    ESDComplianceChecklist: DailyFormStats.FORM_ESD,
+    IPQCDisassembleCheckList: DailyFormStats.FORM_DISASSEMBLE,
+    TestingFirstArticleInspection: DailyFormStats.FORM_FAI,
+    OperatorQualificationCheck: DailyFormStats.FORM_OPERATOR_QUALIFICATION,
+}
+
+
+@receiver(pre_save, sender=ESDComplianceChecklist)
+@receiver(pre_save, sender=IPQCDisassembleCheckList)
+@receiver(pre_save, sender=TestingFirstArticleInspection)
+@receiver(pre_save, sender=OperatorQualificationCheck)
+def remember_daily_stats_key(sender, instance, raw=False, **kwargs):
+    """Note which rollup bucket an edited row counted in before this save"""
+    instance._daily_stats_key = None
+    if raw or instance.pk is None:
+        return
+    key_fields = DailyFormStats.key_fields_of(sender)
+    loaded = getattr(instance, "_loaded_values", None)
+    if loaded is not None and all(name in loaded for name in key_fields):
+        instance._daily_stats_key = DailyFormStats.key_for(loaded)
+    else:
+        row = sender.objects.filter(pk=instance.pk).values(*key_fields).first()
+        instance._daily_stats_key = DailyFormStats.key_for(row) if row else None
 
+
+@receiver(post_save, sender=ESDComplianceChecklist)
+@receiver(post_save, sender=IPQCDisassembleCheckList)
+@receiver(post_save, sender=TestingFirstArticleInspection)
+@receiver(post_save, sender=OperatorQualificationCheck)
+def update_daily_stats(sender, instance, created, raw=False, **kwargs):
+    """Move the row's count into its (possibly new) rollup bucket"""
+    if raw:
+        return
+    form_type = DAILY_STATS_FORMS[sender]
+    old_key = None if created else getattr(instance, "_daily_stats_key", None)
+    new_key = DailyFormStats.key_for(instance)
+    if old_key == new_key:
+        return
+    with transaction.atomic(using=router.db_for_write(DailyFormStats)):
+        if old_key is not None:
+            DailyFormStats.objects.bump(form_type, old_key, -1)
+        DailyFormStats.objects.bump(form_type, new_key, 1)
+
+
+@receiver(post_delete, sender=ESDComplianceChecklist)
+@receiver(post_delete, sender=IPQCDisassembleCheckList)
+@receiver(post_delete, sender=TestingFirstArticleInspection)
+@receiver(post_delete, sender=OperatorQualificationCheck)
+def remove_from_daily_stats(sender, instance, **kwargs):
+    DailyFormStats.objects.bump(DAILY_STATS_FORMS[sender], DailyFormStats.key_for(instance), -1)
+
+
+@receiver(post_save, sender=DynamicFormSubmission)
+def add_to_dynamic_form_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        DynamicFormStats.objects.record(instance)
+
+
+@receiver(post_delete, sender=DynamicFormSubmission)
+def remove_from_dynamic_form_stats(sender, instance, **kwargs):
+    DynamicFormStats.objects.record(instance, sign=-1)
+
+
+# Columns each list page's ``q`` box searches, resolved through SearchTerm.
+SEARCH_FIELDS = {
+    IPQCWorkInfo: ("line", "model", "color", "section"),
+    IPQCDisassembleCheckList: ("name", "emp_id", "model", "color"),
+    NCIssueTracking: ("name", "emp_id", "model", "color"),
+    ESDComplianceChecklist: ("name", "emp_id", "line", "model"),
+    DustCountCheck: ("name", "emp_id", "line"),
+    TestingFirstArticleInspection: ("inspector_name", "model", "color", "imei_number"),
+    OperatorQualificationCheck: ("emp_id", "name", "model", "color", "line"),
+}
+
+
+@receiver(post_save, sender=IPQCWorkInfo)
+@receiver(post_save, sender=IPQCDisassembleCheckList)
+@receiver(post_save, sender=NCIssueTracking)
+@receiver(post_save, sender=ESDComplianceChecklist)
 @receiver(post_save, sender=DustCountCheck)
-def sync_to_bitable_after_save(sender, instance, created, **kwargs):
-    if created:
-        sync_dust_measurement_to_bitable(instance)
-        
 @receiver(post_save, sender=TestingFirstArticleInspection)
-def sync_to_bitable_after_save(sender, instance, created, **kwargs):
-    """Sync to Lark Bitable after save"""
-    if created:
-        # Create new record in Bitable when a new FAI record is created
-        sync_testing_fai_to_bitable(instance)
-    else:
-        # Update existing record when QE updates public fields
-        update_testing_fai_in_bitable(instance)
-        
-        
-        
-        
+@receiver(post_save, sender=OperatorQualificationCheck)
+def update_search_index(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    changed = None if created else getattr(instance, "changed_fields", lambda: None)()
+    if changed is not None and not changed & set(SEARCH_FIELDS[sender]):
+        return
+    SearchTerm.objects.index(instance)
+
+
+@receiver(post_delete, sender=IPQCWorkInfo)
+@receiver(post_delete, sender=IPQCDisassembleCheckList)
+@receiver(post_delete, sender=NCIssueTracking)
+@receiver(post_delete, sender=ESDComplianceChecklist)
+@receiver(post_delete, sender=DustCountCheck)
+@receiver(post_delete, sender=TestingFirstArticleInspection)
+@receiver(post_delete, sender=OperatorQualificationCheck)
+def remove_from_search_index(sender, instance, **kwargs):
+    SearchTerm.objects.filter(model_label=sender._meta.label_lower, object_id=instance.pk).delete()
+
+
+# IMEI columns of the checklists, indexed in IMEIRecord, and the columns an
+# IMEI history lookup returns for each record.
+IMEI_FIELDS = {
+    IPQCDisassembleCheckList: ("imei1", "imei2"),
+    TestingFirstArticleInspection: ("imei_number",),
+}
+IMEI_HISTORY_FIELDS = {
+    IPQCDisassembleCheckList: (
+        "date", "shift", "emp_id", "name", "line", "model", "color", "created_at",
+        "overall_status", "pass_count", "fail_count",
+    ),
+    TestingFirstArticleInspection: (
+        "date", "shift", "emp_id", "name", "line", "model", "color", "created_at",
+        "first_article_type", "visual_functional_result", "reliability_result", "qe_confirm_status",
+    ),
+}
+
+
+@receiver(post_save, sender=IPQCDisassembleCheckList)
+@receiver(post_save, sender=TestingFirstArticleInspection)
+def update_imei_index(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    changed = None if created else instance.changed_fields()
+    if changed is not None and not changed & {"date", *IMEI_FIELDS[sender]}:
+        return
+    IMEIRecord.objects.index(instance)
+
+
+@receiver(post_delete, sender=IPQCDisassembleCheckList)
+@receiver(post_delete, sender=TestingFirstArticleInspection)
+def remove_from_imei_index(sender, instance, **kwargs):
+    IMEIRecord.objects.filter(model_label=sender._meta.label_lower, object_id=instance.pk).delete()
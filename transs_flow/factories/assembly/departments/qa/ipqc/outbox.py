@@ -0,0 +1,371 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import random
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .bitable_mapping import get_mapping
+from .models import BitableMedia, BitableOutbox
+from . import services
+
+logger = logging.getLogger(__name__)
+
+
+# Bitable column / model field that identify a record whose record_id was never
+# stored locally (rows synced before record_ids were kept, not yet backfilled)
+LOOKUP_COLUMNS = {
+    "ipqc.testingfirstarticleinspection": ("Public Token", "public_token"),
+}
+
+MAX_ATTEMPTS = getattr(settings, "LARK_OUTBOX_MAX_ATTEMPTS", 8)
+BACKOFF_BASE_SECONDS = getattr(settings, "LARK_OUTBOX_BACKOFF_BASE", 30)
+BACKOFF_MAX_SECONDS = getattr(settings, "LARK_OUTBOX_BACKOFF_MAX", 3600)
+# A claimed row becomes due again after the lease, so a crashed worker loses nothing.
+LEASE_SECONDS = getattr(settings, "LARK_OUTBOX_LEASE", 300)
+# records/batch_create and batch_update accept at most this many records per call
+BATCH_CREATE_LIMIT = getattr(settings, "LARK_BATCH_CREATE_LIMIT", 500)
+# Parallel media uploads per worker, and the largest file upload_all accepts
+MEDIA_UPLOAD_WORKERS = getattr(settings, "LARK_MEDIA_UPLOAD_WORKERS", 4)
+MEDIA_UPLOAD_MAX_BYTES = 20 * 1024 * 1024
+
+
+def backoff_delay(attempts):
+    """Exponential backoff with full jitter, capped at BACKOFF_MAX_SECONDS"""
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** max(attempts - 1, 0)))
+    return timedelta(seconds=random.uniform(ceiling / 2, ceiling))
+
+
+def claim_batch(limit):
+    """Lease up to ``limit`` due rows; SKIP LOCKED lets several workers run side by side."""
+    now = timezone.now()
+    with transaction.atomic(using=BitableOutbox.objects.db):
+        entries = list(
+            BitableOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=BitableOutbox.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:limit]
+        )
+        if entries:
+            BitableOutbox.objects.filter(pk__in=[e.pk for e in entries]).update(
+                attempts=F("attempts") + 1,
+                next_attempt_at=now + timedelta(seconds=LEASE_SECONDS),
+            )
+    for entry in entries:
+        entry.attempts += 1
+    return entries
+
+
+def load_instances(entries):
+    """Fetch the records behind ``entries`` with one query per model."""
+    ids_by_label = defaultdict(set)
+    for entry in entries:
+        if entry.model_label:
+            ids_by_label[entry.model_label].add(entry.object_id)
+
+    instances = {}
+    for label, ids in ids_by_label.items():
+        model = apps.get_model(label)
+        for pk, instance in model.objects.in_bulk(ids).items():
+            instances[(label, pk)] = instance
+    return instances
+
+
+def mark_sent(entry, record_id=None):
+    BitableOutbox.objects.filter(pk=entry.pk).update(
+        status=BitableOutbox.STATUS_SENT, sent_at=timezone.now(), last_error=None, record_id=record_id or ""
+    )
+
+
+def mark_created(pairs, instances):
+    """Record the record_ids of a successful batch on the outbox rows and on the synced records."""
+    now = timezone.now()
+    record_ids_by_label = defaultdict(dict)
+    for entry, record_id in pairs:
+        entry.status = BitableOutbox.STATUS_SENT
+        entry.sent_at = now
+        entry.last_error = None
+        entry.record_id = record_id or ""
+        if entry.model_label and record_id:
+            record_ids_by_label[entry.model_label][entry.object_id] = record_id
+            instance = instances.get((entry.model_label, entry.object_id))
+            if instance is not None:
+                instance.bitable_record_id = record_id
+    BitableOutbox.objects.bulk_update([entry for entry, _ in pairs], ["status", "sent_at", "last_error", "record_id"])
+
+    for label, record_ids in record_ids_by_label.items():
+        model = apps.get_model(label)
+        model.objects.bulk_update(
+            [model(pk=pk, bitable_record_id=record_id) for pk, record_id in record_ids.items()],
+            ["bitable_record_id"],
+        )
+
+
+def mark_failed(entry, message, retryable=True):
+    logger.warning("Bitable sync failed for outbox #%s (attempt %s): %s", entry.pk, entry.attempts, message)
+    if retryable and entry.attempts < MAX_ATTEMPTS:
+        BitableOutbox.objects.filter(pk=entry.pk).update(
+            next_attempt_at=timezone.now() + backoff_delay(entry.attempts),
+            last_error=str(message),
+        )
+    else:
+        BitableOutbox.objects.filter(pk=entry.pk).update(
+            status=BitableOutbox.STATUS_FAILED, last_error=str(message)
+        )
+
+
+def send_create_chunk(table_id, chunk, instances):
+    """
+    batch_create one chunk of (entry, fields) pairs.
+
+    Lark rejects a whole batch when any row is bad, so a chunk that fails for
+    a non-transient reason is split in half until the offending rows are
+    isolated; the good rows go through and only the bad ones are retried.
+    """
+    success, result, transient = services.batch_create_records(table_id, [fields for _, fields in chunk])
+    if success:
+        mark_created([(entry, record_id) for (entry, _), record_id in zip(chunk, result)], instances)
+        return
+
+    if transient or len(chunk) == 1:
+        for entry, _ in chunk:
+            mark_failed(entry, result)
+        return
+
+    middle = len(chunk) // 2
+    send_create_chunk(table_id, chunk[:middle], instances)
+    send_create_chunk(table_id, chunk[middle:], instances)
+
+
+def send_update_chunk(table_id, chunk):
+    """batch_update one chunk of (entry, record_id, fields), bisecting bad rows like creates."""
+    success, result, transient = services.batch_update_records(
+        table_id, [(record_id, fields) for _, record_id, fields in chunk]
+    )
+    if success:
+        now = timezone.now()
+        for entry, record_id, _ in chunk:
+            entry.status, entry.sent_at, entry.last_error, entry.record_id = BitableOutbox.STATUS_SENT, now, None, record_id
+        BitableOutbox.objects.bulk_update([entry for entry, _, _ in chunk], ["status", "sent_at", "last_error", "record_id"])
+        return
+
+    if transient or len(chunk) == 1:
+        for entry, _, _ in chunk:
+            mark_failed(entry, result)
+        return
+
+    middle = len(chunk) // 2
+    send_update_chunk(table_id, chunk[:middle])
+    send_update_chunk(table_id, chunk[middle:])
+
+
+def resolve_record_id(entry, instance, mapping):
+    """Stored record_id, or one looked up by a unique column (and then stored)."""
+    if instance.bitable_record_id:
+        return instance.bitable_record_id
+    lookup = LOOKUP_COLUMNS.get(entry.model_label)
+    if lookup is None:
+        return None
+    column, field = lookup
+    record_id = services.find_bitable_record_id(entry.table_id, column, str(getattr(instance, field)))
+    if record_id:
+        type(instance).objects.filter(pk=instance.pk).update(bitable_record_id=record_id)
+        instance.bitable_record_id = record_id
+    return record_id
+
+
+def hash_file(storage, name):
+    """(sha256 hex, size) of a stored file, or None if it cannot be read"""
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with storage.open(name, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                digest.update(chunk)
+                size += len(chunk)
+    except (OSError, ValueError) as e:
+        logger.warning("Cannot read %s for Bitable upload: %s", name, e)
+        return None
+    return digest.hexdigest(), size
+
+
+def upload_file(storage, name, parent_node):
+    with storage.open(name, "rb") as fh:
+        content = fh.read()
+    mime_type = mimetypes.guess_type(name)[0] or ""
+    parent_type = "bitable_image" if mime_type.startswith("image/") else "bitable_file"
+    return services.upload_media(os.path.basename(name), content, parent_node, parent_type)
+
+
+def send_attachments(items):
+    """
+    Upload the evidence files of ``items`` [(entry, instance, mapping)] and
+    fill their Bitable attachment columns.
+
+    Files are hashed and uploaded on a bounded thread pool. A hash already in
+    BitableMedia (or met earlier in this batch) reuses its file_token instead
+    of being uploaded again. Each record's columns then go out in a single
+    update, batched with the other records of its table.
+    """
+    parent_node = settings.LARK_BITABLE_APP_TOKEN_QA
+    files = {}  # stored name -> storage
+    plan = []   # (entry, record_id, [(column, stored name or None)])
+    for entry, instance, mapping in items:
+        try:
+            record_id = resolve_record_id(entry, instance, mapping)
+        except Exception as e:
+            mark_failed(entry, f"{type(e).__name__}: {e}")
+            continue
+        if not record_id:
+            mark_failed(entry, "Bitable record_id not known yet")
+            continue
+        cells = []
+        for attachment in mapping.attachments:
+            fieldfile = getattr(instance, attachment.field)
+            cells.append((attachment.name, fieldfile.name if fieldfile else None))
+            if fieldfile:
+                files[fieldfile.name] = fieldfile.storage
+        plan.append((entry, record_id, cells))
+
+    with ThreadPoolExecutor(max_workers=MEDIA_UPLOAD_WORKERS) as pool:
+        digests = dict(zip(files, pool.map(lambda name: hash_file(files[name], name), files)))
+        for name, digest in digests.items():
+            if digest and digest[1] > MEDIA_UPLOAD_MAX_BYTES:
+                logger.warning("%s is %s bytes, over the media upload limit; not attached", name, digest[1])
+                digests[name] = None
+
+        hashes = {digest[0] for digest in digests.values() if digest}
+        tokens = dict(
+            BitableMedia.objects.filter(parent_node=parent_node, sha256__in=hashes).values_list("sha256", "file_token")
+        )
+        to_upload = {}  # sha256 -> first stored name with that content
+        for name, digest in digests.items():
+            if digest and digest[0] not in tokens:
+                to_upload.setdefault(digest[0], name)
+        futures = {
+            sha256: pool.submit(upload_file, files[name], name, parent_node) for sha256, name in to_upload.items()
+        }
+
+        errors, uploaded = {}, []
+        for sha256, future in futures.items():
+            try:
+                success, result = future.result()
+            except Exception as e:
+                success, result = False, f"{type(e).__name__}: {e}"
+            if success:
+                tokens[sha256] = result
+                uploaded.append(BitableMedia(
+                    sha256=sha256, parent_node=parent_node, file_token=result, size=digests[to_upload[sha256]][1]
+                ))
+            else:
+                errors[sha256] = result
+    BitableMedia.objects.bulk_create(uploaded, ignore_conflicts=True)
+
+    pending = defaultdict(list)  # table_id -> [(entry, record_id, fields)]
+    for entry, record_id, cells in plan:
+        fields, error = {}, None
+        for column, name in cells:
+            digest = digests.get(name) if name else None
+            if digest and digest[0] in errors:
+                error = f"Uploading {name} failed: {errors[digest[0]]}"
+                break
+            fields[column] = [{"file_token": tokens[digest[0]]}] if digest else []
+        if error:
+            mark_failed(entry, error)
+        else:
+            pending[entry.table_id].append((entry, record_id, fields))
+
+    for table_id, chunk_items in pending.items():
+        for start in range(0, len(chunk_items), BATCH_CREATE_LIMIT):
+            send_update_chunk(table_id, chunk_items[start:start + BATCH_CREATE_LIMIT])
+
+
+def process_outbox(limit=BATCH_CREATE_LIMIT):
+    """Drain one batch of due rows. Returns the number of rows attempted."""
+    entries = claim_batch(limit)
+    instances = load_instances(entries)
+
+    creates = defaultdict(list)  # table_id -> [(entry, fields)]
+    updates = []
+    attachments = []
+    for entry in entries:
+        if not entry.model_label:
+            # Dynamic form submission: the payload already holds the Bitable fields.
+            creates[entry.table_id].append((entry, services.normalize_bitable_fields(entry.payload or {})))
+            continue
+
+        instance = instances.get((entry.model_label, entry.object_id))
+        if instance is None:
+            mark_failed(entry, "Record no longer exists", retryable=False)
+            continue
+
+        mapping = get_mapping(entry.model_label)
+        if mapping is None:
+            mark_failed(entry, f"No Bitable mapping for {entry.model_label}", retryable=False)
+            continue
+
+        if entry.action == BitableOutbox.ACTION_UPDATE:
+            updates.append((entry, instance, mapping))
+            continue
+        if entry.action == BitableOutbox.ACTION_ATTACH:
+            attachments.append((entry, instance, mapping))
+            continue
+
+        try:
+            creates[entry.table_id].append((entry, mapping.serialize(instance)))
+        except Exception as e:
+            mark_failed(entry, f"{type(e).__name__}: {e}", retryable=False)
+
+    for table_id, items in creates.items():
+        if not table_id:
+            for entry, _ in items:
+                mark_failed(entry, "Table ID missing", retryable=False)
+            continue
+        for start in range(0, len(items), BATCH_CREATE_LIMIT):
+            send_create_chunk(table_id, items[start:start + BATCH_CREATE_LIMIT], instances)
+
+    # After the creates, so an update queued right behind its create finds the record_id.
+    pending_updates = defaultdict(dict)  # table_id -> {record_id: (entry, instance, mapping, columns)}
+    for entry, instance, mapping in updates:
+        try:
+            record_id = resolve_record_id(entry, instance, mapping)
+        except Exception as e:
+            mark_failed(entry, f"{type(e).__name__}: {e}")
+            continue
+        if not record_id:
+            # Most likely its create has not been sent yet.
+            mark_failed(entry, "Bitable record_id not known yet")
+            continue
+        # Only the changed columns, or all of them when the row does not say.
+        columns = (entry.payload or {}).get("columns")
+        by_record = pending_updates[entry.table_id]
+        if record_id in by_record:
+            # Several updates of one record in this batch: one update of the union of their columns.
+            previous, _, _, previous_columns = by_record[record_id]
+            mark_sent(previous, record_id)
+            columns = None if columns is None or previous_columns is None else set(columns) | set(previous_columns)
+        by_record[record_id] = (entry, instance, mapping, columns)
+
+    for table_id, by_record in pending_updates.items():
+        items = []
+        for record_id, (entry, instance, mapping, columns) in by_record.items():
+            try:
+                fields = mapping.serialize(instance) if columns is None else mapping.serialize_columns(instance, columns)
+            except Exception as e:
+                mark_failed(entry, f"{type(e).__name__}: {e}")
+                continue
+            items.append((entry, record_id, fields))
+        for start in range(0, len(items), BATCH_CREATE_LIMIT):
+            send_update_chunk(table_id, items[start:start + BATCH_CREATE_LIMIT])
+
+    if attachments:
+        send_attachments(attachments)
+
+    return len(entries)
@@ -0,0 +1,207 @@
+"""
+Keyset (cursor) pagination for the checklist list views.
+
+OFFSET pagination reads and throws away every row before the page, so deep
+pages get slower as the tables grow, and Django's Paginator adds an exact
+COUNT(*) on every request. Here pages are keyed on (created_at, id), newest
+first: ``?cursor=`` holds the key of the row next to the page, so each page
+is an index range read of ``paginate_by + 1`` rows whatever its depth.
+
+The total shown next to the pager comes from ``approximate_count()`` unless
+a view sets ``approximate_count = False``: table statistics for unfiltered
+lists on MySQL, otherwise a COUNT capped at APPROXIMATE_COUNT_CAP rows.
+
+Every list view using the mixin also answers ``?format=json`` with the same
+page, for the PWA and other scripts.
+"""
+import base64
+import binascii
+
+from django.db import connections
+from django.db.models import FileField, Q
+from django.http import Http404, JsonResponse
+from django.utils.dateparse import parse_datetime
+
+APPROXIMATE_COUNT_CAP = 1000
+CURSOR_PARAMS = ("cursor", "direction", "page")
+
+
+def encode_cursor(obj):
+    raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(value):
+    """(created_at, id) from a ``?cursor=`` value; Http404 when it is not one of ours."""
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode()
+        created_at, pk = raw.rsplit("|", 1)
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        created_at = None
+    if created_at is None:
+        raise Http404("Invalid page cursor")
+    return created_at, pk
+
+
+def approximate_count(queryset, cap=APPROXIMATE_COUNT_CAP):
+    """
+    (count, is_approximate) without an exact COUNT(*) over the whole table.
+
+    Unfiltered querysets on MySQL read the row estimate InnoDB keeps in
+    information_schema. Anything else counts at most ``cap + 1`` rows, so a
+    filter matching half the table costs no more than one matching ``cap``.
+    """
+    connection = connections[queryset.db]
+    if not queryset.query.where and connection.vendor == "mysql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] is not None:
+            return row[0], True
+
+    count = queryset.order_by()[:cap + 1].count()
+    if count > cap:
+        return cap, True
+    return count, False
+
+
+class CursorPaginator:
+    """Stands in for Django's Paginator in templates: ``count`` and how to show it."""
+
+    def __init__(self, count, count_is_approximate, per_page):
+        self.count = count
+        self.count_is_approximate = count_is_approximate
+        self.per_page = per_page
+
+    @property
+    def display_count(self):
+        if not self.count_is_approximate:
+            return str(self.count)
+        if self.count >= APPROXIMATE_COUNT_CAP:
+            return f"{self.count}+"
+        return f"~{self.count}"
+
+
+class CursorPage:
+    """
+    One page of rows plus the querystrings of its neighbours and of the
+    newest (first) and oldest (last) pages; None where there is no such page.
+    """
+
+    def __init__(self, object_list, paginator, next_querystring=None, previous_querystring=None,
+                 first_querystring=None, last_querystring=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_querystring = next_querystring
+        self.previous_querystring = previous_querystring
+        self.first_querystring = first_querystring
+        self.last_querystring = last_querystring
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_querystring is not None
+
+    def has_previous(self):
+        return self.previous_querystring is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginationMixin:
+    """
+    For ListViews: replaces ``paginate_by`` OFFSET paging with (created_at, id)
+    keyset paging, newest first. The view's own ``get_queryset()`` filters
+    still apply; its ordering is replaced by the key.
+    """
+    approximate_count = True
+    json_fields = None   # default: every concrete, non-file field
+
+    def pagination_params(self):
+        params = self.request.GET.copy()
+        for name in CURSOR_PARAMS:
+            params.pop(name, None)
+        return params
+
+    def page_querystring(self, obj=None, direction="next"):
+        """Querystring of the page after (or, with direction "prev", before) ``obj``; no ``obj``: the first or last page."""
+        params = self.pagination_params()
+        if obj is not None:
+            params["cursor"] = encode_cursor(obj)
+        if direction == "prev":
+            params["direction"] = "prev"
+        return params.urlencode()
+
+    def paginate_queryset(self, queryset, page_size):
+        cursor = self.request.GET.get("cursor")
+        backwards = self.request.GET.get("direction") == "prev"
+        page_queryset = queryset
+
+        if cursor:
+            created_at, pk = decode_cursor(cursor)
+            if backwards:
+                page_queryset = page_queryset.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+                )
+            else:
+                page_queryset = page_queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+                )
+        ordering = ("created_at", "pk") if backwards else ("-created_at", "-pk")
+        rows = list(page_queryset.order_by(*ordering)[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+
+        if backwards:
+            has_next, has_previous = bool(cursor), has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+
+        if self.approximate_count:
+            count, is_approximate = approximate_count(queryset)
+        else:
+            count, is_approximate = queryset.order_by().count(), False
+
+        # Without a cursor, direction "prev" walks back from the oldest row: the last page.
+        page = CursorPage(
+            rows,
+            CursorPaginator(count, is_approximate, page_size),
+            next_querystring=self.page_querystring(rows[-1], "next") if rows and has_next else None,
+            previous_querystring=self.page_querystring(rows[0], "prev") if rows and has_previous else None,
+            first_querystring=self.page_querystring() if has_previous else None,
+            last_querystring=self.page_querystring(direction="prev") if has_next else None,
+        )
+        return page.paginator, page, rows, page.has_other_pages()
+
+    def get_json_fields(self):
+        if self.json_fields is not None:
+            return self.json_fields
+        return [
+            field.attname for field in self.model._meta.concrete_fields
+            if not isinstance(field, FileField)
+        ]
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.GET.get("format") != "json":
+            return super().render_to_response(context, **response_kwargs)
+        page = context["page_obj"]
+        fields = self.get_json_fields()
+        return JsonResponse({
+            "results": [{name: getattr(obj, name) for name in fields} for obj in page],
+            "count": page.paginator.count,
+            "count_is_approximate": page.paginator.count_is_approximate,
+            "next": f"?{page.next_querystring}" if page.has_next() else None,
+            "previous": f"?{page.previous_querystring}" if page.has_previous() else None,
+        })
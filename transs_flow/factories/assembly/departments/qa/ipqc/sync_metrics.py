@@ -0,0 +1,224 @@
+"""
+Lark sync metrics: per-table call counts, failure counters and latency histograms.
+
+``lark_client.request`` reports every call here with its duration, HTTP
+status, Lark ``code``, table ID and request size. Each process adds them up
+in memory and every FLUSH_INTERVAL seconds moves the totals into per-minute
+counters in the Django cache (Redis), so web and worker processes add up to
+one view. ``sync_status()`` reads back the last minutes together with the
+outbox backlog, for the admin status page and its JSON endpoint.
+"""
+import atexit
+import bisect
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .models import BitableOutbox
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; one more bucket catches the rest.
+BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+COUNTERS = ("calls", "errors", "throttled", "http_4xx", "http_5xx", "lark_errors", "exceptions", "ms", "bytes")
+BUCKET_NAMES = tuple(f"le_{bound}" for bound in BUCKETS_MS) + ("le_inf",)
+
+FLUSH_INTERVAL = 5            # seconds between flushes to the shared cache
+RETENTION = 2 * 60 * 60       # seconds a per-minute counter is kept
+NO_TABLE = "-"                # token, media and other calls not aimed at a table
+
+_TABLE_IN_URL = re.compile(r"/tables/([^/?]+)")
+
+_pending = defaultdict(int)   # (minute, table, name) -> amount not flushed yet
+_last_errors = {}             # table -> latest failure, not flushed yet
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def table_from_url(url):
+    match = _TABLE_IN_URL.search(url)
+    return match.group(1) if match else NO_TABLE
+
+
+def observe(table_id, seconds, status=None, code=None, payload_bytes=0, error=None, throttled=False):
+    """Record one Lark call. ``error`` is set when no response was received."""
+    global _last_flush
+    minute = int(time.time() // 60)
+    table = table_id or NO_TABLE
+    ms = seconds * 1000
+    counts = {
+        "calls": 1,
+        "ms": int(round(ms)),
+        "bytes": payload_bytes,
+        BUCKET_NAMES[bisect.bisect_left(BUCKETS_MS, ms)]: 1,
+    }
+
+    failure = None
+    if error is not None:
+        counts["exceptions"] = 1
+        failure = error
+    elif throttled:
+        counts["throttled"] = 1
+        failure = f"HTTP {status}, code {code}: throttled"
+    elif status is not None and status >= 400:
+        counts["http_5xx" if status >= 500 else "http_4xx"] = 1
+        failure = f"HTTP {status}, code {code}"
+    elif code not in (None, 0):
+        counts["lark_errors"] = 1
+        failure = f"code {code}"
+    if failure:
+        counts["errors"] = 1
+        if code not in (None, 0):
+            counts[f"code_{code}"] = 1
+
+    with _lock:
+        for name, amount in counts.items():
+            _pending[(minute, table, name)] += amount
+        if failure:
+            _last_errors[table] = {"at": time.time(), "error": failure}
+        due = time.monotonic() - _last_flush >= FLUSH_INTERVAL
+        if due:
+            _last_flush = time.monotonic()
+    if due:
+        flush()
+
+
+def flush():
+    """Add this process's counters to the shared per-minute counters."""
+    with _lock:
+        pending = dict(_pending)
+        last_errors = dict(_last_errors)
+        _pending.clear()
+        _last_errors.clear()
+    if not pending and not last_errors:
+        return
+
+    try:
+        names_by_table = defaultdict(set)
+        for (minute, table, name), amount in pending.items():
+            key = f"lark:metrics:{minute}:{table}:{name}"
+            if not cache.add(key, amount, RETENTION):
+                try:
+                    cache.incr(key, amount)
+                except ValueError:
+                    # Expired between add() and incr()
+                    cache.set(key, amount, RETENTION)
+            names = names_by_table[table]
+            if name.startswith("code_"):
+                names.add(name)
+
+        # Index of tables and error codes seen, so readers know which keys to fetch.
+        index = cache.get("lark:metrics:index") or {}
+        for table, names in names_by_table.items():
+            index[table] = sorted(set(index.get(table, ())) | names)
+        cache.set("lark:metrics:index", index, RETENTION)
+
+        for table, last_error in last_errors.items():
+            cache.set(f"lark:metrics:last_error:{table}", last_error, RETENTION)
+    except Exception as e:
+        # Metrics must never break a sync.
+        logger.warning("Could not flush Lark sync metrics: %s", e)
+
+
+atexit.register(flush)
+
+
+def percentile_ms(buckets, total, pct):
+    """Upper bound of the histogram bucket holding the ``pct`` percentile (None past the last bound)"""
+    if not total:
+        return None
+    target = total * pct / 100
+    seen = 0
+    for bound, count in zip(BUCKETS_MS + (None,), buckets):
+        seen += count
+        if seen >= target:
+            return bound
+    return None
+
+
+def table_names():
+    """table_id -> LARK_TABLE_* setting name"""
+    return {
+        getattr(settings, name): name
+        for name in dir(settings)
+        if name.startswith("LARK_TABLE_") and getattr(settings, name)
+    }
+
+
+def table_stats(minutes=15):
+    """Totals over the last ``minutes`` per table: calls, error rate, average and p95 latency, ..."""
+    index = cache.get("lark:metrics:index") or {}
+    tables = set(index) | set(table_names())
+    now_minute = int(time.time() // 60)
+    names_by_table = {table: COUNTERS + BUCKET_NAMES + tuple(index.get(table, ())) for table in tables}
+
+    keys = [
+        f"lark:metrics:{minute}:{table}:{name}"
+        for minute in range(now_minute - minutes + 1, now_minute + 1)
+        for table, names in names_by_table.items()
+        for name in names
+    ]
+    values = cache.get_many(keys)
+    totals = defaultdict(lambda: defaultdict(int))
+    for key, value in values.items():
+        _, _, _, table, name = key.split(":", 4)
+        totals[table][name] += value
+
+    stats = {}
+    for table in tables:
+        total = totals.get(table, {})
+        calls = total.get("calls", 0)
+        buckets = [total.get(name, 0) for name in BUCKET_NAMES]
+        stats[table] = {
+            "calls": calls,
+            "errors": total.get("errors", 0),
+            "error_rate": round(total.get("errors", 0) / calls, 4) if calls else 0.0,
+            "avg_ms": round(total.get("ms", 0) / calls, 1) if calls else None,
+            "p50_ms": percentile_ms(buckets, calls, 50),
+            "p95_ms": percentile_ms(buckets, calls, 95),
+            "bytes": total.get("bytes", 0),
+            "failures": {name: total.get(name, 0) for name in COUNTERS[2:7] if total.get(name)},
+            "codes": {name[5:]: total[name] for name in index.get(table, ()) if total.get(name)},
+            "histogram": dict(zip(BUCKET_NAMES, buckets)),
+            "last_error": cache.get(f"lark:metrics:last_error:{table}"),
+        }
+    return stats
+
+
+def sync_status(minutes=15):
+    """Per LARK_TABLE_* setting: outbox backlog plus the Lark call metrics of the last ``minutes``."""
+    flush()
+    names = table_names()
+    stats = table_stats(minutes)
+    backlog = {
+        row["table_id"]: row
+        for row in BitableOutbox.objects.filter(
+            status__in=[BitableOutbox.STATUS_PENDING, BitableOutbox.STATUS_FAILED]
+        ).values("table_id").order_by().annotate(
+            pending=Count("id", filter=Q(status=BitableOutbox.STATUS_PENDING)),
+            failed=Count("id", filter=Q(status=BitableOutbox.STATUS_FAILED)),
+            oldest_pending=Min("created_at", filter=Q(status=BitableOutbox.STATUS_PENDING)),
+        )
+    }
+
+    now = timezone.now()
+    tables = []
+    for table_id in sorted(set(stats) | set(backlog), key=lambda t: (t == NO_TABLE, names.get(t, t))):
+        queue = backlog.get(table_id, {})
+        oldest = queue.get("oldest_pending")
+        tables.append({
+            "table_id": table_id,
+            "setting": names.get(table_id, "" if table_id == NO_TABLE else "(dynamic form)"),
+            "pending": queue.get("pending", 0),
+            "failed": queue.get("failed", 0),
+            "oldest_pending_seconds": int((now - oldest).total_seconds()) if oldest else None,
+            **stats.get(table_id, {}),
+        })
+    return {"window_minutes": minutes, "generated_at": now.isoformat(), "tables": tables}
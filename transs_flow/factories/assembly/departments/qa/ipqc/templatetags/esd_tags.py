@@ -1,40 +1,19 @@
 from django import template
 from django.utils import timezone
 from datetime import timedelta
-from ..models import ESDComplianceChecklist
+from ..models import DailyFormStats, ESDComplianceChecklist
 
 register = template.Library()
 
 @register.filter
 def esd_compliance_status(record):
     """
-    Calculate ESD compliance status based on audit fields
+    ESD compliance badge for a record, from its stored pass/fail/NA counts
     Returns dict with pass_count, fail_count, na_count, and status
     """
-    # List of all audit choice fields
-    audit_fields = [
-        'epa_clothes', 'forbid_wear_out', 'no_accessories', 'clothes_clean',
-        'collar_cover', 'all_buttons_closed', 'clothes_length', 'watch_expose',
-        'hair_cap', 'slipper_check', 'wristband_check', 'pre_line_check',
-        'wrist_touch_skin', 'no_touch_pcba', 'alert_plug_out',
-        'trolley_grounding', 'device_grounded', 'grounding_points_tight',
-        'ion_fan_distance', 'ion_fan_direction', 'gloves_condition',
-        'mat_grounded', 'audit_label_valid', 'esds_box', 'table_no_source',
-        'tools_audit', 'temp_humidity', 'tray_voltage'
-    ]
-    
-    pass_count = 0
-    fail_count = 0
-    na_count = 0
-    
-    for field_name in audit_fields:
-        field_value = getattr(record, field_name, 'NA')
-        if field_value == 'PASS':
-            pass_count += 1
-        elif field_value == 'FAIL':
-            fail_count += 1
-        elif field_value == 'NA':
-            na_count += 1
+    pass_count = record.pass_count
+    fail_count = record.fail_count
+    na_count = record.na_count
     
     # Determine overall status
     if fail_count > 0:
@@ -62,17 +41,13 @@ def esd_compliance_status(record):
 @register.simple_tag
 def esd_stats_dashboard():
     """
-    Get ESD stats for dashboard
+    Get ESD stats for dashboard, from the daily rollup and the stored status
     """
-    today = timezone.now().date()
-    week_start = today - timedelta(days=today.weekday())
-    
-    today_count = ESDComplianceChecklist.objects.filter(date=today).count()
-    week_count = ESDComplianceChecklist.objects.filter(date__gte=week_start).count()
-    total_count = ESDComplianceChecklist.objects.all().count()
-    
-    return {
-        'today': today_count,
-        'week': week_count,
-        'total': total_count
-    }
\ No newline at end of file
+    stats = DailyFormStats.objects.summary(DailyFormStats.FORM_ESD)
+    today = timezone.localdate()
+    stats['non_compliant_week'] = ESDComplianceChecklist.objects.filter(
+        overall_status=ESDComplianceChecklist.STATUS_FAIL,
+        date__gte=today - timedelta(days=today.weekday()),
+        date__lte=today,
+    ).count()
+    return stats
\ No newline at end of file
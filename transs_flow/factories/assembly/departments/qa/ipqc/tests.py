@@ -1,3 +1,1510 @@
-from django.test import TestCase
+import csv
+import json
+import re
+import tempfile
+import uuid
+import zipfile
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO, TextIOWrapper
+from pathlib import Path
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connections
+from django.db import models
+from django.db.models import Q
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Employee
+
+from .models import (
+    BitableMedia, BitableOutbox, BitablePullCursor, DailyFormStats, DynamicForm, DynamicFormFieldStats, DynamicFormStats, DynamicFormSubmission, ESDComplianceChecklist, IMEIRecord, IPQCAssemblyAudit, IPQCDisassembleCheckList, IPQCWorkInfo, OperatorQualificationCheck,
+    SearchTerm, TestingFirstArticleInspection, home_counts_cache_key,
+)
+from . import lark_client, model_catalog, outbox, services, sync_metrics, webhooks
+from .bitable_mapping import REGISTRY, fields_digest
+from .exports import export_columns, export_rows
+from .fake_lark import FakeLarkServer
+from .management.commands import pull_bitable_changes, reconcile_bitable
+from .forms import get_model_choices
+from .pagination import approximate_count
+from .templatetags.esd_tags import esd_compliance_status
+from .views import home_counts
+
+
+class HomeViewQueryCountTests(TestCase):
+    databases = "__all__"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Employee.objects.create_user(employee_id="E1001", full_name="Test Inspector", password="x", role="IPQC")
+        cls.today = timezone.localdate()
+        cls.work_info = IPQCWorkInfo.objects.create(
+            date=cls.today, shift="A", emp_id="E1001", name="Test Inspector",
+            section="Assembly", line="L1", group="G1", model="X1", color="Black",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_home_counters_cost_one_query_per_model(self):
+        # session + work info check + one counter aggregate per model (was 15 COUNT queries)
+        with self.assertNumQueries(7, using="default"):
+            response = self.client.get(reverse("ipqc_home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["work_info_today"], 1)
+        self.assertEqual(response.context["work_info_month"], 1)
+        self.assertEqual(response.context["esd_week"], 0)
+
+    def test_home_counters_are_cached(self):
+        self.client.get(reverse("ipqc_home"))
+        # session + work info check only
+        with self.assertNumQueries(2, using="default"):
+            response = self.client.get(reverse("ipqc_home"))
+        self.assertEqual(response.context["work_info_today"], 1)
+
+    def test_save_invalidates_employee_counters(self):
+        home_counts("E1001", {}, self.today)
+        other_key = home_counts_cache_key("E2002", self.today)
+        cache.set(other_key, {"esd_today": 0})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ESDComplianceChecklist.objects.create(
+                date=self.today, shift="A", emp_id="E1001", name="Test Inspector",
+                line="L1", group="G1", model="X1", color="Black",
+            )
+
+        self.assertIsNone(cache.get(home_counts_cache_key("E1001", self.today)))
+        self.assertIsNotNone(cache.get(other_key))
+        self.assertEqual(home_counts("E1001", {}, self.today)["esd_today"], 1)
+
+
+class QueryPlanTests(TestCase):
+    """
+    EXPLAIN the queries behind the dashboards and list pages and fail when
+    one of them no longer has an index to use and falls back to a full scan.
+    """
+    databases = "__all__"
+
+    # SQLite: "SCAN table" without "USING [COVERING] INDEX" reads every row.
+    SQLITE_FULL_SCAN = re.compile(r"^SCAN (?!.*\bUSING (COVERING )?INDEX\b)")
+
+    def query_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        connection = connections[queryset.db]
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+                return [row[-1] for row in cursor.fetchall()]
+            cursor.execute("EXPLAIN " + sql, params)
+            columns = [column[0].lower() for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def assertNoFullScan(self, queryset):
+        plan = self.query_plan(queryset)
+        if connections[queryset.db].vendor == "sqlite":
+            full_scans = [step for step in plan if self.SQLITE_FULL_SCAN.search(step)]
+        else:
+            # MySQL: no usable index at all, whatever the optimizer picks on a near-empty table.
+            full_scans = [step for step in plan if step.get("type") == "ALL" and not step.get("possible_keys")]
+        self.assertFalse(full_scans, f"Full table scan in {queryset.query}:\n{plan}")
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.week_start = self.today - timedelta(days=7)
+
+    def test_work_info_queries(self):
+        now = timezone.now()
+        work_info = IPQCWorkInfo.objects
+        self.assertNoFullScan(work_info.filter(emp_id="E1", created_at__gte=now - timedelta(days=1), created_at__lt=now))
+        self.assertNoFullScan(work_info.filter(emp_id="E1", date__range=[self.week_start, self.today]))
+        self.assertNoFullScan(work_info.filter(emp_id="E1").order_by("-created_at")[:1])
+        self.assertNoFullScan(work_info.filter(emp_id="E1", model="X1", date=self.today))
+
+    def test_assembly_audit_queries(self):
+        self.assertNoFullScan(IPQCAssemblyAudit.objects.filter(emp_id="E1", date__range=[self.week_start, self.today]))
+        self.assertNoFullScan(IPQCAssemblyAudit.objects.filter(emp_id="E1").order_by("-created_at")[:5])
+
+    def test_esd_queries(self):
+        self.assertNoFullScan(ESDComplianceChecklist.objects.filter(emp_id="E1", date__range=[self.week_start, self.today]))
+        self.assertNoFullScan(ESDComplianceChecklist.objects.order_by("-date", "-created_at")[:10])
+
+    def test_disassemble_queries(self):
+        self.assertNoFullScan(IPQCDisassembleCheckList.objects.filter(emp_id="E1", date__range=[self.week_start, self.today]))
+        self.assertNoFullScan(IPQCDisassembleCheckList.objects.order_by("-created_at")[:20])
+
+    def test_fai_queries(self):
+        fai = TestingFirstArticleInspection.objects
+        self.assertNoFullScan(fai.all()[:10])
+        self.assertNoFullScan(fai.filter(inspector_name="Test Inspector")[:10])
+        self.assertNoFullScan(fai.filter(inspector_name="Test Inspector", date__range=[self.week_start, self.today]))
+
+    def test_keyset_page_queries(self):
+        now = timezone.now()
+        after = Q(created_at__lt=now) | Q(created_at=now, pk__lt=100)
+        for model in (ESDComplianceChecklist, IPQCDisassembleCheckList, OperatorQualificationCheck, TestingFirstArticleInspection):
+            self.assertNoFullScan(model.objects.filter(after).order_by("-created_at", "-pk")[:11])
+        self.assertNoFullScan(IPQCAssemblyAudit.objects.filter(after, emp_id="E1").order_by("-created_at", "-pk")[:11])
+
+    def test_search_index_queries(self):
+        self.assertNoFullScan(SearchTerm.objects.matching_ids(ESDComplianceChecklist, "ravi kumar"))
+        self.assertNoFullScan(SearchTerm.objects.filter(model_label="ipqc.esdcompliancechecklist", object_id=1))
+
+    def test_operator_qualification_queries(self):
+        self.assertNoFullScan(OperatorQualificationCheck.objects.all()[:10])
+        self.assertNoFullScan(OperatorQualificationCheck.objects.filter(emp_id="E1", date__gte=self.week_start))
+
+
+class KeysetPaginationTests(TestCase):
+    databases = "__all__"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Employee.objects.create_user(employee_id="E1001", full_name="Test Inspector", password="x", role="IPQC")
+        today = timezone.localdate()
+        ESDComplianceChecklist.objects.bulk_create([
+            ESDComplianceChecklist(
+                date=today, shift="A", emp_id="E1001", name="Test Inspector",
+                line=f"L{i}", group="G1", model="X1", color="Black",
+            )
+            for i in range(25)
+        ])
+        # Two rows per timestamp, so the id tie-break decides their order.
+        start = timezone.now()
+        for i, record in enumerate(ESDComplianceChecklist.objects.order_by("id")):
+            ESDComplianceChecklist.objects.filter(pk=record.pk).update(created_at=start + timedelta(seconds=i // 2))
+        cls.expected = list(ESDComplianceChecklist.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        # bulk_create skips the save signals, so the search index is built by hand.
+        call_command("rebuild_search_index", model="esdcompliancechecklist", stdout=StringIO())
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse("esd_compliance_checklist_list")
+
+    def get_page(self, querystring="?format=json"):
+        response = self.client.get(self.url + querystring)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_walks_every_row_once_newest_first(self):
+        seen, page = [], self.get_page()
+        while True:
+            seen += [row["id"] for row in page["results"]]
+            if not page["next"]:
+                break
+            page = self.get_page(page["next"])
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(page["count"], 25)
+        self.assertFalse(page["count_is_approximate"])
+
+    def test_previous_returns_the_page_before(self):
+        first = self.get_page()
+        second = self.get_page(first["next"])
+        back = self.get_page(second["previous"])
+        self.assertEqual([row["id"] for row in back["results"]], self.expected[:10])
+        self.assertIsNone(back["previous"])
+
+    def test_html_page_keeps_filters_in_links(self):
+        response = self.client.get(self.url, {"q": "Test"})
+        page = response.context["page_obj"]
+        self.assertEqual(len(page), 10)
+        self.assertIn("q=Test", page.next_querystring)
+        self.assertIn("cursor=", page.next_querystring)
+        self.assertEqual(response.context["paginator"].display_count, "25")
+
+    def test_invalid_cursor_is_not_found(self):
+        self.assertEqual(self.client.get(self.url, {"cursor": "not-a-cursor"}).status_code, 404)
+
+    def test_count_is_capped(self):
+        self.assertEqual(approximate_count(ESDComplianceChecklist.objects.all(), cap=10), (10, True))
+        self.assertEqual(approximate_count(ESDComplianceChecklist.objects.filter(line="L1"), cap=10), (1, False))
+
+
+class SearchIndexTests(TestCase):
+    databases = "__all__"
+
+    def create_esd(self, **fields):
+        values = dict(
+            date=timezone.localdate(), shift="A", emp_id="E1001", name="Test Inspector",
+            line="L1", group="G1", model="X1", color="Black",
+        )
+        values.update(fields)
+        return ESDComplianceChecklist.objects.create(**values)
+
+    def search(self, text):
+        return set(SearchTerm.objects.search(ESDComplianceChecklist.objects.all(), text).values_list("pk", flat=True))
+
+    def test_substring_search_through_index(self):
+        ravi = self.create_esd(name="Ravi Kumar", emp_id="E2001")
+        self.create_esd(name="Anita Rao", emp_id="E2002")
+        self.assertEqual(self.search("kuma"), {ravi.pk})
+        self.assertEqual(self.search("VI KU"), {ravi.pk})
+
+    def test_terms_spread_over_columns_do_not_match(self):
+        # "abcd" in name and "bcde" in model hold all trigrams of "abcde" but neither contains it.
+        self.create_esd(name="abcd", model="bcde")
+        self.assertEqual(self.search("abcde"), set())
+
+    def test_employee_id_prefix_fast_path(self):
+        mine = self.create_esd(emp_id="E3001")
+        self.create_esd(emp_id="E4001", name="XE300 Line")
+        self.assertEqual(self.search("e300"), {mine.pk})
+
+    def test_short_text_falls_back_to_icontains(self):
+        record = self.create_esd(line="Z9")
+        self.assertEqual(self.search("z9"), {record.pk})
+
+    def test_edit_and_delete_update_index(self):
+        record = self.create_esd(name="Old Name")
+        record.name = "New Name"
+        record.save()
+        self.assertEqual(self.search("old n"), set())
+        self.assertEqual(self.search("new n"), {record.pk})
+
+        pk = record.pk
+        record.delete()
+        self.assertFalse(SearchTerm.objects.filter(model_label="ipqc.esdcompliancechecklist", object_id=pk).exists())
+
+    def test_list_view_q_uses_index(self):
+        user = Employee.objects.create_user(employee_id="E1001", full_name="Test Inspector", password="x", role="IPQC")
+        ravi = self.create_esd(name="Ravi Kumar", emp_id="E2001")
+        self.create_esd(name="Anita Rao", emp_id="E2002")
+        self.client.force_login(user)
+        response = self.client.get(reverse("esd_compliance_checklist_list"), {"q": "ravi", "format": "json"})
+        self.assertEqual([row["id"] for row in response.json()["results"]], [ravi.pk])
+
+
+class IMEIHistoryTests(TestCase):
+    databases = "__all__"
+
+    IMEI = "356987051234567"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Employee.objects.create_user(employee_id="E1001", full_name="Test Inspector", password="x", role="QA")
+        today = timezone.localdate()
+        common = dict(date=today, shift="A", emp_id="E1001", name="Test Inspector", section="Assembly",
+                      line="L1", group="G1", model="X1", color="Black")
+        cls.disassemble = IPQCDisassembleCheckList.objects.create(imei1="3569 8705-1234567", imei2="", **common)
+        cls.fai = TestingFirstArticleInspection.objects.create(imei_number=cls.IMEI, **common)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse("imei_history")
+
+    def test_one_imei_returns_every_inspection(self):
+        response = self.client.get(self.url, {"imei": self.IMEI})
+        self.assertEqual(response.status_code, 200)
+        inspections = response.json()["results"][self.IMEI]
+        self.assertEqual(
+            sorted((row["form"], row["id"], row["imei_field"]) for row in inspections),
+            [("disassemble", self.disassemble.pk, "imei1"), ("fai", self.fai.pk, "imei_number")],
+        )
+
+    def test_batch_lookup_in_constant_queries(self):
+        imeis = [self.IMEI] + [f"35000000{i:07d}" for i in range(1999)] + ["n/a"]
+        # session + index rows of two 1000-IMEI chunks + disassemble and FAI records of the chunk with hits
+        with self.assertNumQueries(1 + 2 + 2, using="default"):
+            response = self.client.post(self.url, {"imeis": imeis}, content_type="application/json")
+        body = response.json()
+        self.assertEqual(list(body["results"]), [self.IMEI])
+        self.assertEqual(len(body["not_found"]), 1999)
+        self.assertEqual(body["invalid"], ["n/a"])
+
+    def test_edit_and_delete_update_index(self):
+        self.disassemble.imei1 = "111111111111111"
+        self.disassemble.save()
+        self.assertEqual(
+            list(IMEIRecord.objects.filter(object_id=self.disassemble.pk, model_label="ipqc.ipqcdisassemblechecklist")
+                 .values_list("imei", flat=True)),
+            ["111111111111111"],
+        )
+        self.fai.delete()
+        self.assertEqual(self.client.get(self.url, {"imei": self.IMEI}).json()["not_found"], [self.IMEI])
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.post(self.url, "[]", content_type="application/json").status_code, 400)
+
+
+class ModelCatalogTests(TestCase):
+    databases = "__all__"
+
+    @classmethod
+    def setUpTestData(cls):
+        with connections["defaultdb"].cursor() as cursor:
+            cursor.execute("CREATE TABLE IF NOT EXISTS model_description (model_name varchar(100))")
+            cursor.executemany(
+                "INSERT INTO model_description (model_name) VALUES (%s)",
+                [("X6525",), ("KG5",), ("X6526 Pro",), ("CK9",), ("BX6525",)],
+            )
+
+    def setUp(self):
+        model_catalog.get_catalog(refresh=True)
+
+    def test_prefix_matches_first(self):
+        catalog = model_catalog.get_catalog()
+        self.assertEqual(catalog.search("x65"), ["X6525", "X6526 Pro", "BX6525"])
+        self.assertEqual(catalog.search("6525", limit=1), ["BX6525"])
+        self.assertEqual(catalog.search(""), ["BX6525", "CK9", "KG5", "X6525", "X6526 Pro"])
+
+    def test_served_from_memory(self):
+        with self.assertNumQueries(0, using="defaultdb"):
+            response = self.client.get(reverse("ajax_get_models"), {"q": "k"})
+            choices = get_model_choices()
+        self.assertEqual([row["id"] for row in response.json()], ["KG5", "CK9"])
+        self.assertEqual(len(choices), 5)
+
+    def test_etag_revalidation(self):
+        response = self.client.get(reverse("ajax_get_models"), {"q": "x"})
+        etag = response["ETag"]
+        self.assertEqual(
+            self.client.get(reverse("ajax_get_models"), {"q": "x"}, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        # Same names after a reload: same version, so cached responses stay valid.
+        model_catalog.get_catalog(refresh=True)
+        self.assertEqual(self.client.get(reverse("ajax_get_models"), {"q": "x"})["ETag"], etag)
+
+        with connections["defaultdb"].cursor() as cursor:
+            cursor.execute("INSERT INTO model_description (model_name) VALUES ('X7')")
+        model_catalog.get_catalog(refresh=True)
+        response = self.client.get(reverse("ajax_get_models"), {"q": "x"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("X7", [row["id"] for row in response.json()])
+
+
+class ExportTests(TestCase):
+    databases = "__all__"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Employee.objects.create_user(employee_id="E1001", full_name="Test Inspector", password="x", role="QA")
+        cls.today = timezone.localdate()
+        common = dict(shift="A", emp_id="E1001", name="Test Inspector", section="Assembly", group="G1", color="Black")
+        cls.records = [
+            TestingFirstArticleInspection.objects.create(date=cls.today, line="L1", model="X1", imei_number="111", **common),
+            TestingFirstArticleInspection.objects.create(date=cls.today, line="L2", model="X1", imei_number="222", **common),
+            TestingFirstArticleInspection.objects.create(
+                date=cls.today - timedelta(days=100), line="L1", model="X2", imei_number="333 <&>", **common
+            ),
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def export(self, form="fai", **params):
+        response = self.client.get(reverse("export_checklist", args=[form]), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content)
+
+    def csv_rows(self, **params):
+        response, content = self.export(**params)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        return list(csv.reader(TextIOWrapper(BytesIO(content), encoding="utf-8", newline="")))
+
+    def test_csv_has_columns_and_every_record(self):
+        header, *rows = self.csv_rows()
+        self.assertEqual(header[0], "ID")
+        self.assertEqual(header[-1], "Created At")
+        self.assertEqual([int(row[0]) for row in rows], [record.pk for record in self.records])
+        self.assertIn(self.today.isoformat(), rows[0])
+
+    def test_filters(self):
+        _, *rows = self.csv_rows(line="L1", date_from=(self.today - timedelta(days=7)).isoformat())
+        self.assertEqual([int(row[0]) for row in rows], [self.records[0].pk])
+        _, *rows = self.csv_rows(model="X2", date_to="not-a-date")
+        self.assertEqual([int(row[0]) for row in rows], [self.records[2].pk])
+
+    def test_xlsx_is_a_valid_workbook(self):
+        response, content = self.export(format="xlsx")
+        self.assertIn("filename=\"fai-", response["Content-Disposition"])
+        self.assertTrue(response["Content-Disposition"].endswith('.xlsx"'))
+        namespace = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+        with zipfile.ZipFile(BytesIO(content)) as package:
+            self.assertIn("[Content_Types].xml", package.namelist())
+            ElementTree.fromstring(package.read("xl/workbook.xml"))
+            sheet = ElementTree.fromstring(package.read("xl/worksheets/sheet1.xml"))
+        rows = sheet.findall("s:sheetData/s:row", namespace)
+        self.assertEqual(len(rows), 1 + len(self.records))
+        self.assertEqual(rows[1].find("s:c/s:v", namespace).text, str(self.records[0].pk))
+        self.assertIn("333 <&>", [t.text for t in rows[3].iter(f"{{{namespace['s']}}}t")])
+
+    def test_rows_read_in_keyset_batches(self):
+        columns = export_columns(TestingFirstArticleInspection)
+        with self.assertNumQueries(2, using="default"):
+            rows = list(export_rows(TestingFirstArticleInspection.objects.all(), columns, batch_size=2))
+        self.assertEqual([row[0] for row in rows], [record.pk for record in self.records])
+
+    def test_unmapped_model_and_unknown_form(self):
+        header = [column.name for column in export_columns(OperatorQualificationCheck)]
+        self.assertEqual(header[:3], ["ID", "Emp id", "Name"])
+        self.assertNotIn("Feishu Record Data", header)
+        response = self.client.get(reverse("export_checklist", args=["nope"]))
+        self.assertEqual(response.status_code, 404)
+
+
+class WebhookTests(TestCase):
+    databases = "__all__"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.localdate()
+        cls.work_info = IPQCWorkInfo.objects.create(
+            date=cls.today, shift="A", emp_id="E1001", name="Test Inspector",
+            section="Assembly", line="L1", group="G1", model="X1", color="Black",
+        )
+
+    def post(self, status, **extra):
+        fields = {"Emp_ID": "E1001", "Model": "X1", "Date": self.today.isoformat(), "Status": status}
+        response = self.client.post(
+            reverse("lark_bitable_webhook"), {"fields": fields, **extra}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        webhooks.apply_pending_events()
+        self.work_info.refresh_from_db()
+        return self.work_info.status
+
+    def test_status_can_return_to_an_earlier_value(self):
+        self.assertEqual(self.post("Open"), "Open")
+        self.assertEqual(self.post("Closed"), "Closed")
+        self.assertEqual(self.post("Open"), "Open")
+
+    def test_redelivered_lark_event_is_ignored(self):
+        self.assertEqual(self.post("Open", event_id="ev-1"), "Open")
+        self.assertEqual(self.post("Closed", event_id="ev-2"), "Closed")
+        self.assertEqual(self.post("Open", event_id="ev-1"), "Closed")
+
+
+class DailyFormStatsTests(TestCase):
+    databases = "__all__"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Employee.objects.create_user(employee_id="E1001", full_name="Test Inspector", password="x", role="IPQC")
+        cls.today = timezone.localdate()
+        cls.common = dict(shift="A", emp_id="E1001", name="Test Inspector", section="Assembly", group="G1", color="Black")
+
+    def counts(self, form_type):
+        return {
+            (row.date, row.line, row.inspector_name): row.count
+            for row in DailyFormStats.objects.filter(form_type=form_type).exclude(count=0)
+        }
+
+    def test_create_edit_and_delete_move_the_count(self):
+        fai = TestingFirstArticleInspection.objects.create(
+            date=self.today, line="L1", model="X1", inspector_name="Test Inspector", **self.common
+        )
+        self.assertEqual(self.counts("fai"), {(self.today, "L1", "Test Inspector"): 1})
+
+        fai.remarks = "edited"   # not part of the key
+        fai.save()
+        self.assertEqual(self.counts("fai"), {(self.today, "L1", "Test Inspector"): 1})
+
+        fai = TestingFirstArticleInspection.objects.get(pk=fai.pk)
+        fai.line = "L2"
+        fai.date = self.today - timedelta(days=1)
+        fai.save()
+        self.assertEqual(self.counts("fai"), {(self.today - timedelta(days=1), "L2", "Test Inspector"): 1})
+
+        fai.delete()
+        self.assertEqual(self.counts("fai"), {})
+
+    def test_edit_of_unsynced_model_without_snapshot(self):
+        check = OperatorQualificationCheck.objects.create(date=self.today, line="L1", model="X1", **self.common)
+        check = OperatorQualificationCheck.objects.get(pk=check.pk)
+        check.model = "X2"
+        check.save()
+        rows = DailyFormStats.objects.filter(form_type="operator_qualification").exclude(count=0)
+        self.assertEqual([(row.model, row.count) for row in rows], [("X2", 1)])
+
+    def test_failed_bump_rolls_back_the_row(self):
+        with mock.patch.object(DailyFormStats.objects, "bump", side_effect=DatabaseError("boom")):
+            with self.assertRaises(DatabaseError):
+                OperatorQualificationCheck.objects.create(date=self.today, line="L1", model="X1", **self.common)
+        self.assertFalse(OperatorQualificationCheck.objects.exists())
+
+    def test_fai_list_stats_match_the_list(self):
+        for inspector in ("Test Inspector", "Other Inspector"):
+            TestingFirstArticleInspection.objects.create(
+                date=self.today, line="L1", model="X1", inspector_name=inspector, **self.common
+            )
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("testing_fai_list"))
+        self.assertEqual(len(response.context["fai_records"]), 1)
+        self.assertEqual(response.context["fai_stats"], {"today": 1, "week": 1, "total": 1})
+
+    def test_rebuild_matches_signals(self):
+        TestingFirstArticleInspection.objects.create(
+            date=self.today, line="L1", model="X1", inspector_name="Test Inspector", **self.common
+        )
+        before = self.counts("fai")
+        call_command("rebuild_daily_stats", form="fai", stdout=StringIO())
+        self.assertEqual(self.counts("fai"), before)
+
+
+class FakeResponse:
+    request = None
+
+    def __init__(self, body, status_code=200, headers=None):
+        self.body = body
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeBitable:
+    """
+    Answers records/batch_create and batch_update like Lark: a batch holding
+    a row whose Model is "BAD" is rejected as a whole; ``error_status`` makes
+    every call fail with that HTTP status.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.error_status = None
+        self.next_id = 0
+
+    def request(self, method, url, **kwargs):
+        action = url.rsplit("/", 1)[-1]
+        records = kwargs["json"]["records"]
+        self.calls.append((action, records))
+        if self.error_status:
+            return FakeResponse({"code": -1, "msg": "server error"}, self.error_status)
+        if any(record["fields"].get("Model") == "BAD" for record in records):
+            return FakeResponse({"code": 1254001, "msg": "WrongRequestBody"})
+        if action == "batch_create":
+            self.next_id += len(records)
+            ids = [f"rec{n}" for n in range(self.next_id - len(records) + 1, self.next_id + 1)]
+        else:
+            ids = [record["record_id"] for record in records]
+        return FakeResponse({"code": 0, "data": {"records": [{"record_id": record_id} for record_id in ids]}})
+
+    def patch(self, test):
+        for target, value in (("get_lark_access_token", lambda: "token"), ("lark_client.request", self.request)):
+            patcher = mock.patch(f"{services.__name__}.{target}", value)
+            patcher.start()
+            test.addCleanup(patcher.stop)
+        return self
+
+
+def create_work_info(model="X1", **overrides):
+    values = dict(date=timezone.localdate(), shift="A", emp_id="E1001", name="Test Inspector",
+                  section="Assembly", line="L1", group="G1", model=model, color="Black")
+    values.update(overrides)
+    return IPQCWorkInfo.objects.create(**values)
+
+
+class BitableOutboxTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.lark = FakeBitable().patch(self)
+
+    def test_claim_leases_rows(self):
+        create_work_info()
+        create_work_info()
+        claimed = outbox.claim_batch(10)
+        self.assertEqual(len(claimed), 2)
+        self.assertEqual(outbox.claim_batch(10), [])
+        for entry in BitableOutbox.objects.all():
+            self.assertEqual(entry.attempts, 1)
+            self.assertGreater(entry.next_attempt_at, timezone.now() + timedelta(seconds=outbox.LEASE_SECONDS - 10))
+
+    def test_creates_store_record_ids(self):
+        records = [create_work_info(), create_work_info(model="X2")]
+        self.assertEqual(outbox.process_outbox(), 2)
+        self.assertEqual([action for action, _ in self.lark.calls], ["batch_create"])
+        self.assertEqual(
+            list(BitableOutbox.objects.values_list("status", "record_id")),
+            [(BitableOutbox.STATUS_SENT, "rec1"), (BitableOutbox.STATUS_SENT, "rec2")],
+        )
+        self.assertEqual(
+            [IPQCWorkInfo.objects.get(pk=record.pk).bitable_record_id for record in records], ["rec1", "rec2"]
+        )
+
+    def test_failing_chunk_is_bisected_down_to_the_bad_row(self):
+        records = [create_work_info(model=model) for model in ("X1", "X2", "BAD", "X3")]
+        with self.assertLogs(outbox.logger, "WARNING"):
+            outbox.process_outbox()
+        # [4 rows] -> [X1, X2] ok + [BAD, X3] -> [BAD] fails, [X3] ok
+        self.assertEqual([len(rows) for _, rows in self.lark.calls], [4, 2, 2, 1, 1])
+        entries = {entry.object_id: entry for entry in BitableOutbox.objects.all()}
+        bad = entries.pop(records[2].pk)
+        self.assertEqual({entry.status for entry in entries.values()}, {BitableOutbox.STATUS_SENT})
+        self.assertEqual(bad.status, BitableOutbox.STATUS_PENDING)
+        self.assertIn("1254001", bad.last_error)
+        self.assertGreater(bad.next_attempt_at, timezone.now())
+        self.assertEqual(IPQCWorkInfo.objects.get(pk=records[2].pk).bitable_record_id, "")
+
+    def test_transient_error_backs_off_without_bisecting(self):
+        create_work_info()
+        create_work_info()
+        self.lark.error_status = 503
+        with self.assertLogs(outbox.logger, "WARNING"):
+            outbox.process_outbox()
+        self.assertEqual(len(self.lark.calls), 1)
+        for entry in BitableOutbox.objects.all():
+            self.assertEqual((entry.status, entry.attempts), (BitableOutbox.STATUS_PENDING, 1))
+            self.assertGreaterEqual(entry.next_attempt_at, timezone.now() + timedelta(seconds=outbox.BACKOFF_BASE_SECONDS / 2 - 1))
+
+        # The last allowed attempt fails for good.
+        BitableOutbox.objects.update(attempts=outbox.MAX_ATTEMPTS - 1, next_attempt_at=timezone.now())
+        with self.assertLogs(outbox.logger, "WARNING"):
+            outbox.process_outbox()
+        self.assertEqual(set(BitableOutbox.objects.values_list("status", flat=True)), {BitableOutbox.STATUS_FAILED})
+
+    def test_single_create_logs_instead_of_printing(self):
+        created = FakeResponse({"code": 0, "data": {"record": {"record_id": "recOne"}}})
+        with mock.patch.object(services.lark_client, "request", return_value=created):
+            self.assertEqual(services.create_bitable_record("tbl", {"Model": "X1"}), (True, "recOne"))
+
+        error = FakeResponse({"code": 1254001, "msg": "WrongRequestBody"})
+        with mock.patch.object(services.lark_client, "request", return_value=error), \
+                mock.patch("builtins.print") as print_, self.assertLogs(services.logger, "WARNING") as logs:
+            self.assertEqual(services.create_bitable_record("tbl", {"Model": "X1"}), (False, error.json()))
+        self.assertIn("WrongRequestBody", logs.output[0])
+        print_.assert_not_called()
+
+    def test_record_lookup_error_raises(self):
+        error = FakeResponse({"code": 1254045, "msg": "FieldNameNotFound"})
+        with mock.patch.object(services.lark_client, "request", return_value=error):
+            with self.assertRaisesMessage(RuntimeError, "FieldNameNotFound"):
+                services.find_bitable_record_id("tblFAI", "Public Token", "abc")
+
+
+@override_settings(LARK_TOKEN_REFRESH_MARGIN=300)
+class TenantTokenManagerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 1_000_000.0
+        self.issued = 0
+        self.manager = lark_client.TenantTokenManager("app", "secret")
+        for target, value in (("time.time", lambda: self.now), ("time.sleep", self.sleep), ("send", self.send)):
+            patcher = mock.patch(f"{lark_client.__name__}.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(cache.clear)
+        self.on_sleep = None
+        self.api_calls = []
+
+    def sleep(self, seconds):
+        self.now += seconds
+        if self.on_sleep:
+            self.on_sleep()
+
+    def send(self, method, url, idempotent=None, **kwargs):
+        if url.endswith("tenant_access_token/internal/"):
+            self.issued += 1
+            return FakeResponse({"code": 0, "tenant_access_token": f"t{self.issued}", "expire": 7200})
+        token = kwargs["headers"]["Authorization"].split()[-1]
+        self.api_calls.append(token)
+        code = 99991663 if token == "t1" else 0
+        return FakeResponse({"code": code})
+
+    def test_cached_token_is_reused(self):
+        self.assertEqual(self.manager.get_token(), "t1")
+        self.now += 3600
+        self.assertEqual(self.manager.get_token(), "t1")
+        self.assertEqual(self.issued, 1)
+
+    def test_refreshed_within_the_margin(self):
+        self.manager.get_token()
+        self.now += 7200 - 300 - 1
+        self.assertEqual(self.manager.get_token(), "t1")
+        self.now += 2
+        self.assertEqual(self.manager.get_token(), "t2")
+        self.assertEqual(lark_client.TenantTokenManager("app", "secret").get_token(), "t2")
+
+    def test_one_refresh_at_a_time(self):
+        self.manager.get_token()
+        self.now += 7200 - 100
+        cache.add(self.manager.lock_key, "1", 10)   # another process is refreshing
+        # A token that has not expired yet is used in the meantime.
+        self.assertEqual(self.manager.get_token(), "t1")
+
+        cache.delete(self.manager.cache_key)
+        # No token at all: wait for the other process's refresh instead of issuing a second one.
+        self.on_sleep = lambda: cache.set(self.manager.cache_key, {"token": "other", "expires_at": self.now + 7200})
+        self.assertEqual(self.manager.get_token(), "other")
+        self.assertEqual(self.issued, 1)
+
+    def test_stalled_refresh_is_taken_over(self):
+        cache.add(self.manager.lock_key, "1", 10)
+        self.assertEqual(self.manager.get_token(), "t1")
+        self.assertGreaterEqual(self.now, 1_000_000.0 + self.manager.wait_timeout)
+
+    def test_rejected_token_is_invalidated_and_retried(self):
+        with mock.patch.object(lark_client, "_token_manager", self.manager), \
+                override_settings(LARK_APP_ID="app"):
+            response = lark_client.request("POST", lark_client.api_url("bitable/v1/apps/a/tables/t/records"))
+        self.assertEqual(response.json()["code"], 0)
+        self.assertEqual(self.api_calls, ["t1", "t2"])
+        self.assertEqual(cache.get(self.manager.cache_key)["token"], "t2")
+
+    def test_invalidate_keeps_a_newer_token(self):
+        self.manager.get_token()
+        self.manager.invalidate("t0")
+        self.assertEqual(cache.get(self.manager.cache_key)["token"], "t1")
+        self.manager.invalidate("t1")
+        self.assertIsNone(cache.get(self.manager.cache_key))
+
+    def test_token_failure_is_logged(self):
+        error = lark_client.requests.ConnectionError("unreachable")
+        with mock.patch.object(lark_client, "send", side_effect=error), \
+                self.assertLogs(services.logger, "ERROR") as logs:
+            self.assertIsNone(services.get_lark_access_token())
+        self.assertIn("unreachable", logs.output[0])
+
+
+def sample_value(field, index):
+    """A fixed, valid value for ``field``; ``index`` keeps the values within a row apart."""
+    if field.choices:
+        return field.choices[index % len(field.choices)][0]
+    if isinstance(field, models.UUIDField):
+        return uuid.UUID(int=index)
+    if isinstance(field, models.FileField):
+        return f"ipqc/samples/{field.name}.jpg"
+    if isinstance(field, models.URLField):
+        return f"https://example.com/{field.name}"
+    if isinstance(field, (models.CharField, models.TextField)):
+        return f"{field.name}-{index}"[:field.max_length or None]
+    if isinstance(field, models.BooleanField):
+        return index % 2 == 0
+    if isinstance(field, models.IntegerField):
+        return index
+    if isinstance(field, models.DecimalField):
+        return Decimal(index) / 4
+    if isinstance(field, models.FloatField):
+        return index / 4
+    if isinstance(field, models.DateTimeField):
+        return datetime(2026, 1, 15, 8, index % 60, tzinfo=dt_timezone.utc)
+    if isinstance(field, models.DateField):
+        return date(2026, 1, 1 + index % 28)
+    if isinstance(field, models.TimeField):
+        return time(8, index % 60)
+    return None
+
+
+def sample_instance(model):
+    instance = model()
+    for index, field in enumerate(model._meta.concrete_fields):
+        if not (field.primary_key or field.is_relation):
+            setattr(instance, field.attname, sample_value(field, index))
+    return instance
+
+
+class BitableSerializationTests(TestCase):
+    """
+    Pins what each mapped model sends to Bitable. After an intended mapping
+    change, update bitable_fields.json from ``mapping.serialize(sample_instance(model))``.
+    """
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.expected = json.loads((Path(__file__).parent / "testdata" / "bitable_fields.json").read_text())
+
+    def test_every_mapping_is_pinned(self):
+        self.assertEqual(sorted(REGISTRY), sorted(self.expected))
+
+    def test_serialized_fields(self):
+        for label, mapping in REGISTRY.items():
+            with self.subTest(label):
+                self.assertEqual(mapping.serialize(sample_instance(mapping.model)), self.expected[label])
+
+    def test_values_rows_serialize_like_instances(self):
+        for label, mapping in REGISTRY.items():
+            with self.subTest(label):
+                instance = sample_instance(mapping.model)
+                instance.save()
+                instance = mapping.model.objects.get(pk=instance.pk)
+                (_, fields), = mapping.serialize_queryset(mapping.model.objects.filter(pk=instance.pk))
+                self.assertEqual(fields, mapping.serialize(instance))
+
+
+    def test_digest_compares_numbers_canonically(self):
+        columns = ["A", "B", "C"]
+        self.assertEqual(
+            fields_digest({"A": Decimal("1.50"), "B": "2.0", "C": Decimal("3.10")}, columns),
+            fields_digest({"A": 1.5, "B": 2, "C": [{"type": "text", "text": "3.1"}]}, columns),
+        )
+        self.assertNotEqual(fields_digest({"A": Decimal("1.50")}, ["A"]), fields_digest({"A": 1.05}, ["A"]))
+        self.assertNotEqual(fields_digest({"A": "1.50"}, ["A"]), fields_digest({"A": "1.50 mm"}, ["A"]))
+
+
+class FakeLarkTestCase(TestCase):
+    """Talks to an in-process FakeLarkServer; each mapped model gets its own table (see table_for)."""
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeLarkServer().start()
+        cls.addClassCleanup(cls.server.stop)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.server.reset()
+        overrides = override_settings(
+            LARK_API_BASE_URL=self.server.base_url,
+            LARK_APP_ID="cli_test",
+            LARK_APP_SECRET="secret",
+            LARK_BITABLE_APP_TOKEN_QA="appTest",
+            **{mapping.model.bitable_table_setting: self.table_for(mapping.model) for mapping in REGISTRY.values()},
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    @staticmethod
+    def table_for(model):
+        return f"tbl{model.__name__}"
+
+
+class BackfillRecordIdTests(FakeLarkTestCase):
+    def test_only_unambiguous_rows_are_matched(self):
+        mapping = REGISTRY[IPQCWorkInfo._meta.label_lower]
+        table = self.table_for(IPQCWorkInfo)
+        unique = [create_work_info(line=f"L{n}") for n in range(3)]
+        twins = [create_work_info(line="twin") for _ in range(2)]    # same key twice locally
+        doubled = create_work_info(line="doubled")                  # same key twice in Bitable
+        missing = create_work_info(line="missing")
+        for n, record in enumerate(unique + twins[:1] + [doubled, doubled]):
+            self.server.store(table, f"rec{n}", mapping.serialize(record))
+        self.server.store(table, "recOther", mapping.serialize(create_work_info(line="other")))
+        IPQCWorkInfo.objects.filter(line="other").delete()
+
+        out = StringIO()
+        call_command("backfill_bitable_record_ids", "--model", mapping.label, "--page-size", "2", stdout=out)
+        self.assertIn("3 matched, 2 ambiguous, 1 not found", out.getvalue())
+        self.assertEqual(self.server.calls["bitable/v1/apps/{id}/tables/{id}/records"], 4)
+        self.assertEqual(
+            dict(IPQCWorkInfo.objects.values_list("pk", "bitable_record_id")),
+            {unique[0].pk: "rec0", unique[1].pk: "rec1", unique[2].pk: "rec2",
+             twins[0].pk: "", twins[1].pk: "", doubled.pk: "", missing.pk: ""},
+        )
+
+
+class BitableAttachmentTests(FakeLarkTestCase):
+    upload = "drive/v1/medias/upload_all"
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        overrides = override_settings(MEDIA_ROOT=media_root.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.media_root = Path(media_root.name)
+        self.mapping = REGISTRY[IPQCDisassembleCheckList._meta.label_lower]
+        self.table = self.table_for(IPQCDisassembleCheckList)
+
+    def photo(self, name, content=b"photo"):
+        path = self.media_root / "ipqc" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        return f"ipqc/{name}"
+
+    def create_checklist(self, **photos):
+        instance = sample_instance(IPQCDisassembleCheckList)
+        for attachment in self.mapping.attachments:
+            setattr(instance, attachment.field, photos.get(attachment.field, ""))
+        instance.save()
+        return instance
+
+    def cells(self, instance, column):
+        record_id = IPQCDisassembleCheckList.objects.get(pk=instance.pk).bitable_record_id
+        return self.server.tables[self.table][record_id].get(column)
+
+    def attach_entries(self):
+        return BitableOutbox.objects.filter(action=BitableOutbox.ACTION_ATTACH).order_by("id")
+
+    def test_shared_photo_is_uploaded_once_and_reused(self):
+        first = self.create_checklist(color_match_photo=self.photo("a.jpg"))
+        second = self.create_checklist(color_match_photo=self.photo("b.jpg"), key_photo=self.photo("c.jpg", b"other"))
+        outbox.process_outbox()
+
+        # a.jpg and b.jpg hold the same bytes: one upload between them.
+        self.assertEqual(self.server.calls[self.upload], 2)
+        self.assertEqual(self.server.calls["bitable/v1/apps/{id}/tables/{id}/records/batch_update"], 1)
+        self.assertEqual(set(self.attach_entries().values_list("status", flat=True)), {BitableOutbox.STATUS_SENT})
+        token = self.cells(first, "Color Match Photo")[0]["file_token"]
+        self.assertEqual(self.cells(second, "Color Match Photo"), [{"file_token": token}])
+        self.assertNotEqual(self.cells(second, "Key Photo"), [{"file_token": token}])
+        self.assertEqual(self.cells(first, "Key Photo"), [])
+        self.assertEqual(
+            dict(BitableMedia.objects.values_list("file_token", "parent_node")), {
+                token: "appTest", self.cells(second, "Key Photo")[0]["file_token"]: "appTest",
+            }
+        )
+
+        # A later batch finds the content in BitableMedia and uploads nothing.
+        third = self.create_checklist(defect_photo=self.photo("d.jpg"))
+        outbox.process_outbox()
+        self.assertEqual(self.server.calls[self.upload], 2)
+        self.assertEqual(self.cells(third, "Defect Photo"), [{"file_token": token}])
+
+    def test_failed_upload_only_holds_back_its_records(self):
+        bad = self.create_checklist(color_match_photo=self.photo("bad.jpg", b"bad"))
+        good = self.create_checklist(color_match_photo=self.photo("good.jpg"))
+        upload_file = outbox.upload_file
+
+        def failing_upload(storage, name, parent_node):
+            if name.endswith("bad.jpg"):
+                return False, {"code": 1061002, "msg": "params error"}
+            return upload_file(storage, name, parent_node)
+
+        with mock.patch.object(outbox, "upload_file", failing_upload), self.assertLogs(outbox.logger, "WARNING"):
+            outbox.process_outbox()
+
+        bad_entry, good_entry = self.attach_entries()
+        self.assertEqual(good_entry.status, BitableOutbox.STATUS_SENT)
+        self.assertEqual(len(self.cells(good, "Color Match Photo")), 1)
+        self.assertEqual((bad_entry.status, bad_entry.attempts), (BitableOutbox.STATUS_PENDING, 1))
+        self.assertIn("Uploading ipqc/bad.jpg failed", bad_entry.last_error)
+        self.assertGreater(bad_entry.next_attempt_at, timezone.now())
+        self.assertIsNone(self.cells(bad, "Color Match Photo"))
+
+    def test_oversized_file_is_left_out(self):
+        record = self.create_checklist(color_match_photo=self.photo("big.jpg", b"x" * 10), key_photo=self.photo("k.jpg"))
+        with mock.patch.object(outbox, "MEDIA_UPLOAD_MAX_BYTES", 5), self.assertLogs(outbox.logger, "WARNING"):
+            outbox.process_outbox()
+        self.assertEqual(self.server.calls[self.upload], 1)
+        self.assertEqual(self.cells(record, "Color Match Photo"), [])
+        self.assertEqual(len(self.cells(record, "Key Photo")), 1)
+
+
+@override_settings(LARK_PULL_MODIFIED_FIELD="Modified")
+class PullBitableChangesTests(FakeLarkTestCase):
+    def setUp(self):
+        super().setUp()
+        self.table = self.table_for(IPQCWorkInfo)
+        self.mapping = REGISTRY[IPQCWorkInfo._meta.label_lower]
+        self.cursor_ms = 1_800_000_000_000
+        self.records = [create_work_info(line=f"L{n}", bitable_record_id=f"rec{n}") for n in range(4)]
+        hour = 60 * 60 * 1000
+        edits = [
+            ("rec0", "Edited days ago", -72 * hour),   # outside the day window
+            ("rec1", "Edited before", -2 * hour),      # inside the window, older than the cursor
+            ("rec2", "Approved", hour),
+            ("rec3", "R" * 80, 2 * hour),              # longer than status' max_length
+            ("recUnlinked", "Approved", 3 * hour),
+        ]
+        for record_id, status, offset in edits:
+            self.edit(record_id, status, self.cursor_ms + offset)
+        BitablePullCursor.objects.create(table_id=self.table, model_label=self.mapping.label,
+                                         last_modified_ms=self.cursor_ms)
+
+    def edit(self, record_id, status, modified_ms):
+        """A Status edit made in Lark at ``modified_ms``."""
+        self.server.store(self.table, record_id, {"Status": status, "Modified": modified_ms})
+        self.server.modified[(self.table, record_id)] = modified_ms
+
+    def pull(self):
+        out = StringIO()
+        call_command("pull_bitable_changes", "--model", self.mapping.label, "--page-size", "2", stdout=out)
+        return out.getvalue()
+
+    def statuses(self):
+        return list(IPQCWorkInfo.objects.order_by("pk").values_list("status", flat=True))
+
+    def test_only_changes_since_the_cursor_are_applied(self):
+        self.assertIn("3 modified in Bitable, 2 updated locally, 1 not linked to a local row", self.pull())
+        self.assertEqual(self.statuses(), ["", "", "Approved", "R" * 50])
+        cursor = BitablePullCursor.objects.get(table_id=self.table)
+        self.assertEqual(cursor.last_modified_ms, self.cursor_ms + 3 * 60 * 60 * 1000)
+        # Pulled values are not queued back to Bitable.
+        self.assertFalse(BitableOutbox.objects.filter(action=BitableOutbox.ACTION_UPDATE).exists())
+
+        # Only the record at the cursor is read again, and it changes nothing.
+        self.assertIn("1 modified in Bitable, 0 updated locally, 1 not linked to a local row", self.pull())
+        self.assertEqual(self.statuses(), ["", "", "Approved", "R" * 50])
+
+    def test_cursor_moves_after_each_page(self):
+        apply = pull_bitable_changes.Command.apply
+        cursors = []
+
+        def record_cursor(command, mapping, cursor, page):
+            result = apply(command, mapping, cursor, page)
+            cursors.append(BitablePullCursor.objects.get(pk=cursor.pk).last_modified_ms)
+            return result
+
+        with mock.patch.object(pull_bitable_changes.Command, "apply", record_cursor):
+            self.pull()
+        hour = 60 * 60 * 1000
+        self.assertEqual(cursors, [self.cursor_ms + 2 * hour, self.cursor_ms + 3 * hour])
+
+
+class ReconcileBitableTests(FakeLarkTestCase):
+    def setUp(self):
+        super().setUp()
+        self.table = self.table_for(IPQCWorkInfo)
+        self.mapping = REGISTRY[IPQCWorkInfo._meta.label_lower]
+
+        # Five synced rows, one never synced; the create rows queued by save() are dropped.
+        self.records = [create_work_info(line=f"L{n}") for n in range(6)]
+        for n, record in enumerate(self.records[:5]):
+            record.bitable_record_id = f"recLocal{n}"
+            IPQCWorkInfo.objects.filter(pk=record.pk).update(bitable_record_id=record.bitable_record_id)
+            self.server.store(self.table, record.bitable_record_id, self.mapping.serialize(record))
+        BitableOutbox.objects.all().delete()
+
+    def reconcile(self, *args):
+        out = StringIO()
+        with mock.patch.object(reconcile_bitable, "BATCH_GET_LIMIT", 2):
+            call_command("reconcile_bitable", "--model", self.mapping.label, "--page-size", "2", *args,
+                         verbosity=2, stdout=out)
+        return out.getvalue()
+
+    def test_reports_each_kind_of_difference(self):
+        self.server.store(self.table, "recLocal1", {"Line": "edited in Lark"}, merge=True)
+        del self.server.tables[self.table]["recLocal3"]
+        self.server.store(self.table, "recRemote", self.mapping.serialize(create_work_info(line="remote")))
+        BitableOutbox.objects.all().delete()
+        IPQCWorkInfo.objects.filter(line="remote").delete()
+
+        output = self.reconcile()
+        self.assertIn("3 in sync, 1 divergent, 1 deleted from Bitable, 1 never synced, 1 only in Bitable", output)
+        self.assertIn(f"  divergent: {self.records[1].pk}", output)
+        self.assertIn(f"  deleted: {self.records[3].pk}", output)
+        self.assertIn(f"  never synced: {self.records[5].pk}", output)
+        self.assertEqual(self.server.calls["bitable/v1/apps/{id}/tables/{id}/records/batch_get"], 3)
+
+    def test_queued_rows_are_skipped(self):
+        BitableOutbox.objects.create(model_label=self.mapping.label, object_id=self.records[5].pk, table_id=self.table,
+                                     action=BitableOutbox.ACTION_CREATE)
+        self.assertIn("5 in sync, 0 divergent, 0 deleted from Bitable, 0 never synced", self.reconcile())
+
+    def test_repair_queues_updates_and_creates(self):
+        self.server.store(self.table, "recLocal1", {"Line": "edited in Lark"}, merge=True)
+        del self.server.tables[self.table]["recLocal3"]
+
+        self.assertIn("queued 1 update(s) and 2 create(s)", self.reconcile("--repair"))
+        self.assertEqual(
+            sorted(BitableOutbox.objects.values_list("object_id", "action")),
+            sorted([(self.records[1].pk, BitableOutbox.ACTION_UPDATE), (self.records[3].pk, BitableOutbox.ACTION_CREATE),
+                    (self.records[5].pk, BitableOutbox.ACTION_CREATE)]),
+        )
+        self.assertEqual(IPQCWorkInfo.objects.get(pk=self.records[3].pk).bitable_record_id, "")
+        self.assertIn("0 divergent, 0 deleted from Bitable, 0 never synced", self.reconcile())
+
+
+@override_settings(LARK_RATE_LIMIT=4, LARK_RATE_LIMITS={})
+class RateLimiterTests(SimpleTestCase):
+    endpoint = "bitable/v1/apps/{id}/tables/{id}/records/batch_create"
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.now = 1_000_000.25
+        self.slept = []
+        patcher = mock.patch(f"{lark_client.__name__}.time.time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch(f"{lark_client.__name__}.time.sleep", self.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch(f"{lark_client.__name__}.random.uniform", lambda low, high: 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.limiter = lark_client.RateLimiter("app")
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+    def test_waits_for_the_next_window_when_the_rate_is_used_up(self):
+        for _ in range(4):
+            self.limiter.acquire(self.endpoint)
+        self.assertEqual(self.slept, [])
+        self.limiter.acquire(self.endpoint)
+        self.assertEqual(self.slept, [0.75])
+
+    def test_throttle_halves_the_rate_once_per_second(self):
+        self.limiter.throttled(self.endpoint)
+        self.limiter.throttled(self.endpoint)   # a second caller seeing the same throttle
+        self.assertEqual(self.limiter.rate(self.endpoint), 2)
+        cache.delete(f"{self.limiter.prefix}:{self.endpoint}:cut")
+        self.limiter.throttled(self.endpoint)
+        cache.delete(f"{self.limiter.prefix}:{self.endpoint}:cut")
+        self.limiter.throttled(self.endpoint)
+        self.assertEqual(self.limiter.rate(self.endpoint), self.limiter.floor)
+
+    def test_retry_after_pauses_the_endpoint(self):
+        self.limiter.throttled(self.endpoint, retry_after=2)
+        self.limiter.acquire(self.endpoint)
+        self.assertEqual(self.slept, [2])
+
+    def test_rate_recovers_after_a_quiet_period(self):
+        self.limiter.throttled(self.endpoint)
+        self.now += 1
+        self.limiter.acquire(self.endpoint)
+        self.assertEqual(self.limiter.rate(self.endpoint), 2)   # still within the recovery period
+        self.now += self.limiter.recovery
+        self.limiter.acquire(self.endpoint)
+        self.assertEqual(self.limiter.rate(self.endpoint), 3)
+        for _ in range(3):
+            self.now += 1
+            self.limiter.acquire(self.endpoint)
+        self.assertEqual(self.limiter.rate(self.endpoint), 4)   # never above the ceiling
+
+    def test_gives_up_waiting_after_max_wait(self):
+        self.limiter.throttled(self.endpoint, retry_after=self.limiter.max_wait + 10)
+        with self.assertLogs(lark_client.logger, "WARNING"):
+            self.limiter.acquire(self.endpoint)
+        self.assertEqual(self.slept, [])
+
+
+@override_settings(LARK_RATE_LIMIT=10, LARK_RATE_LIMITS={}, LARK_HTTP_RETRIES=3, LARK_HTTP_BACKOFF=0.5)
+class LarkSendTests(SimpleTestCase):
+    url = "https://open.larkoffice.com/open-apis/bitable/v1/apps/app1/tables/tbl1/records/search"
+    endpoint = "bitable/v1/apps/{id}/tables/{id}/records/search"
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        lark_client.reset_latency_stats()
+        self.addCleanup(lark_client.reset_latency_stats)
+        self.now = 1_000_000.25
+        self.slept = []
+        self.session = mock.Mock()
+        for target, value in (("time.time", lambda: self.now), ("time.sleep", self.sleep),
+                              ("random.uniform", lambda low, high: high), ("get_session", lambda: self.session)):
+            patcher = mock.patch(f"{lark_client.__name__}.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+    def test_idempotent_calls_are_retried_on_5xx_and_timeouts(self):
+        self.session.request.side_effect = [
+            lark_client.requests.Timeout("read timed out"), FakeResponse({"code": -1}, 503), FakeResponse({"code": 0}),
+        ]
+        response = lark_client.send("POST", self.url, idempotent=True, json={})
+        self.assertEqual(response.json(), {"code": 0})
+        self.assertEqual(self.session.request.call_count, 3)
+        self.assertEqual(self.slept, [0.5, 1.0])   # jittered exponential backoff, at its ceiling here
+        self.assertEqual(self.session.request.call_args.kwargs["timeout"], (3.05, 15))
+        self.assertEqual(
+            lark_client.latency_stats()[self.endpoint], {"count": 3, "errors": 2, "avg_ms": mock.ANY, "max_ms": mock.ANY}
+        )
+
+    def test_non_idempotent_posts_are_not_retried(self):
+        self.session.request.side_effect = [FakeResponse({"code": -1}, 503)]
+        self.assertEqual(lark_client.send("POST", self.url, json={}).status_code, 503)
+        self.session.request.side_effect = [lark_client.requests.Timeout("read timed out")]
+        with self.assertRaises(lark_client.requests.Timeout):
+            lark_client.send("POST", self.url, json={})
+        self.assertEqual(self.session.request.call_count, 2)
+        self.assertEqual(self.slept, [])
+
+    def test_throttled_calls_are_retried_and_slow_the_limiter(self):
+        self.session.request.side_effect = [
+            FakeResponse({"code": 99991400}, 429, headers={"x-ogw-ratelimit-reset": "2"}),
+            FakeResponse({"code": 99991400}),   # throttled inside a 200 response
+            FakeResponse({"code": 0}),
+        ]
+        # A non-idempotent POST: a throttled call did nothing, so it is retried anyway.
+        self.assertEqual(lark_client.send("POST", self.url, json={}).json(), {"code": 0})
+        self.assertEqual(self.session.request.call_count, 3)
+        self.assertAlmostEqual(self.slept[0], 2.05)   # the reset hint, plus jitter
+        # Two throttles, seconds apart: the rate is halved twice.
+        self.assertEqual(lark_client.get_rate_limiter().rate(self.endpoint), 2.5)
+
+    def test_endpoint_name_collapses_ids_but_not_actions(self):
+        base = "https://open.larkoffice.com/open-apis/bitable/v1/apps/appX/tables/tblY/records"
+        names = {
+            f"{base}?page_size=500": "bitable/v1/apps/{id}/tables/{id}/records",
+            f"{base}/recZ": "bitable/v1/apps/{id}/tables/{id}/records/{id}",
+            f"{base}/batch_create": "bitable/v1/apps/{id}/tables/{id}/records/batch_create",
+            f"{base}/batch_update": "bitable/v1/apps/{id}/tables/{id}/records/batch_update",
+            f"{base}/batch_get": "bitable/v1/apps/{id}/tables/{id}/records/batch_get",
+            f"{base}/search?page_size=1": "bitable/v1/apps/{id}/tables/{id}/records/search",
+            "https://open.larkoffice.com/open-apis/bitable/v1/apps/appX/tables/tblY/fields": "bitable/v1/apps/{id}/tables/{id}/fields",
+            "https://open.larkoffice.com/open-apis/auth/v3/tenant_access_token/internal/": "auth/v3/tenant_access_token/internal",
+        }
+        for url, name in names.items():
+            with self.subTest(url):
+                self.assertEqual(lark_client.endpoint_name(url), name)
+        self.assertEqual(lark_client.endpoint_name(f"{base}/recA"), lark_client.endpoint_name(f"{base}/recB"))
+
+
+class SyncMetricsTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        sync_metrics.flush()   # whatever earlier tests left behind
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.now = 60_000_000.0
+        clock = mock.Mock(time=lambda: self.now, monotonic=lambda: 0.0)
+        for target, value in (("FLUSH_INTERVAL", 10 ** 9), ("time", clock)):
+            patcher = mock.patch.object(sync_metrics, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_flushes_add_up(self):
+        # Each flush stands for another process adding its own totals.
+        sync_metrics.observe("tblA", 0.04, status=200, code=0, payload_bytes=100)
+        sync_metrics.flush()
+        sync_metrics.observe("tblA", 0.3, status=200, code=0, payload_bytes=50)
+        sync_metrics.observe("tblA", 0.3, status=200, code=0)
+        self.now += 60
+        sync_metrics.observe("tblA", 2, status=200, code=0)
+        sync_metrics.flush()
+
+        stats = sync_metrics.table_stats()["tblA"]
+        self.assertEqual((stats["calls"], stats["errors"], stats["bytes"]), (4, 0, 150))
+        self.assertEqual(stats["avg_ms"], 660.0)
+        self.assertEqual((stats["histogram"]["le_50"], stats["histogram"]["le_500"], stats["histogram"]["le_2500"]), (1, 2, 1))
+        # Older minutes fall out of the window.
+        self.assertEqual(sync_metrics.table_stats(minutes=1)["tblA"]["calls"], 1)
+
+    def test_percentile_picks_the_bucket(self):
+        buckets = [0, 5, 0, 0, 4, 0, 0, 0, 0, 1]
+        self.assertEqual(sync_metrics.percentile_ms(buckets, 10, 50), 100)
+        self.assertEqual(sync_metrics.percentile_ms(buckets, 10, 90), 1000)
+        self.assertIsNone(sync_metrics.percentile_ms(buckets, 10, 95))   # in the open-ended bucket
+        self.assertIsNone(sync_metrics.percentile_ms([0] * 10, 0, 50))
+
+    def test_failures_are_classified(self):
+        sync_metrics.observe("tblA", 0.1, status=200, code=0)
+        sync_metrics.observe("tblA", 0.1, error="ConnectionError: refused")
+        sync_metrics.observe("tblA", 0.1, status=429, code=99991400, throttled=True)
+        sync_metrics.observe("tblA", 0.1, status=404, code=1254040)
+        sync_metrics.observe("tblA", 0.1, status=503)
+        sync_metrics.observe("tblA", 0.1, status=200, code=1254001)
+        sync_metrics.flush()
+
+        stats = sync_metrics.table_stats()["tblA"]
+        self.assertEqual((stats["calls"], stats["errors"], stats["error_rate"]), (6, 5, round(5 / 6, 4)))
+        self.assertEqual(
+            stats["failures"], {"throttled": 1, "http_4xx": 1, "http_5xx": 1, "lark_errors": 1, "exceptions": 1}
+        )
+        self.assertEqual(stats["codes"], {"99991400": 1, "1254040": 1, "1254001": 1})
+        self.assertEqual(stats["last_error"]["error"], "code 1254001")
+
+    def test_status_reports_the_outbox_backlog(self):
+        for status in (BitableOutbox.STATUS_PENDING, BitableOutbox.STATUS_PENDING, BitableOutbox.STATUS_FAILED,
+                       BitableOutbox.STATUS_SENT):
+            BitableOutbox.objects.create(table_id="tblA", action=BitableOutbox.ACTION_CREATE, status=status)
+        BitableOutbox.objects.filter(pk=BitableOutbox.objects.earliest("id").pk).update(
+            created_at=timezone.now() - timedelta(minutes=10)
+        )
+        sync_metrics.observe("tblA", 0.1, status=200, code=0)
+
+        table, = [t for t in sync_metrics.sync_status()["tables"] if t["table_id"] == "tblA"]
+        self.assertEqual((table["pending"], table["failed"], table["calls"]), (2, 1, 1))
+        self.assertEqual(table["setting"], "(dynamic form)")
+        self.assertGreaterEqual(table["oldest_pending_seconds"], 600)
+
+    def test_status_pages_are_admin_only(self):
+        user = Employee.objects.create_user(employee_id="E1001", full_name="Test Inspector", password="x", role="IPQC")
+        admin = Employee.objects.create_superuser(employee_id="A1001", full_name="Admin User", password="x")
+        for name in ("bitable_sync_status", "bitable_sync_status_json"):
+            with self.subTest(name):
+                self.client.force_login(user)
+                self.assertRedirects(self.client.get(reverse(name)), "/no-permission/", fetch_redirect_response=False)
+                self.client.force_login(admin)
+                self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+        self.assertEqual(self.client.get(reverse("bitable_sync_status_json"), {"minutes": 5}).json()["window_minutes"], 5)
+
+
+class BitableUpdateTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.lark = FakeBitable().patch(self)
+        create_work_info()
+        outbox.process_outbox()
+        self.record = IPQCWorkInfo.objects.get()
+        self.lark.calls.clear()
+
+    def pending_updates(self):
+        return list(
+            BitableOutbox.objects.filter(action=BitableOutbox.ACTION_UPDATE, status=BitableOutbox.STATUS_PENDING)
+            .values_list("payload", flat=True)
+        )
+
+    def test_edit_sends_only_the_changed_columns(self):
+        self.record.line = "L9"
+        self.record.save()
+        self.assertEqual(self.pending_updates(), [{"columns": ["Line"]}])
+
+        BitableOutbox.objects.update(next_attempt_at=timezone.now())
+        outbox.process_outbox()
+        self.assertEqual(self.lark.calls, [("batch_update", [{"record_id": "rec1", "fields": {"Line": "L9"}}])])
+
+    def test_save_without_changes_queues_nothing(self):
+        self.record.save()
+        self.assertEqual(self.pending_updates(), [])
+
+    def test_repeated_saves_merge_into_one_row(self):
+        self.record.line = "L9"
+        self.record.save()
+        self.record.model = "X9"
+        self.record.save()
+        self.record.line = "L8"
+        self.record.save()
+        self.assertEqual(self.pending_updates(), [{"columns": ["Line", "Model"]}])
+
+    def test_unknown_changes_resend_every_column(self):
+        self.record.line = "L9"
+        self.record.save()
+        IPQCWorkInfo(**{f.attname: getattr(self.record, f.attname) for f in IPQCWorkInfo._meta.concrete_fields}).save()
+        self.assertEqual(self.pending_updates(), [None])
+
+    def test_claimed_row_is_not_merged_into(self):
+        self.record.line = "L9"
+        self.record.save()
+        BitableOutbox.objects.filter(action=BitableOutbox.ACTION_UPDATE).update(attempts=1)
+        self.record.model = "X9"
+        self.record.save()
+        self.assertEqual(self.pending_updates(), [{"columns": ["Line"]}, {"columns": ["Model"]}])
+
+
+class DynamicFormStatsTests(TestCase):
+    databases = "__all__"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Employee.objects.create_superuser(employee_id="A1001", full_name="Admin User", password="x")
+        cls.form = DynamicForm.objects.create(title="Line check", lark_bitable_table_id="tblX")
+
+    def submit(self, data):
+        return DynamicFormSubmission.objects.create(form=self.form, submitted_by=self.user, data=data)
+
+    def field_stats(self):
+        return {
+            stats.field_name: (stats.count, stats.total, stats.min_value, stats.max_value)
+            for stats in DynamicFormFieldStats.objects.filter(form=self.form)
+        }
+
+    def test_submission_and_delete_update_the_stats(self):
+        first = self.submit({"Temp": 20, "Passed": True, "Note": "ok"})
+        second = self.submit({"Temp": 30.5})
+        stats = DynamicFormStats.objects.get(form=self.form)
+        self.assertEqual((stats.submission_count, stats.last_submission_at), (2, second.created_at))
+        self.assertEqual(self.field_stats(), {"Temp": (2, 50.5, 20, 30.5)})
+
+        first.delete()
+        self.assertEqual(DynamicFormStats.objects.get(form=self.form).submission_count, 1)
+        self.assertEqual(self.field_stats(), {"Temp": (1, 30.5, 30.5, 30.5)})
+        call_command("rebuild_dynamic_form_stats", stdout=StringIO())
+        self.assertEqual(self.field_stats(), {"Temp": (1, 30.5, 30.5, 30.5)})
+
+    def test_deleting_the_min_or_max_recomputes_the_range(self):
+        low, middle, high = (self.submit({"Temp": value}) for value in (10, 20, 30))
+        middle.delete()
+        self.assertEqual(self.field_stats(), {"Temp": (2, 40, 10, 30)})
+        high.delete()
+        self.assertEqual(self.field_stats(), {"Temp": (1, 10, 10, 10)})
+        low.delete()
+        self.assertEqual(self.field_stats(), {"Temp": (0, 0, None, None)})
+
+    def test_dashboard_reads_the_stats(self):
+        self.submit({"Temp": 20})
+        self.submit({"Temp": 30})
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("dynamic_form_dashboard", args=[self.form.pk]))
+        self.assertEqual(response.context["total_submissions"], 2)
+        self.assertEqual(response.context["numeric_summary"], {"Temp": {"mean": 25.0, "max": 30.0, "min": 20.0}})
+
+    def test_before_returns_the_next_page(self):
+        ids = [self.submit({"n": n}).pk for n in range(5)]
+        self.client.force_login(self.user)
+        url = reverse("dynamic_form_submissions_json", args=[self.form.pk])
+        pages, params = [], {"page_size": 2}
+        while True:
+            page = self.client.get(url, params).json()
+            pages.append([row["id"] for row in page["results"]])
+            if not page["has_more"]:
+                self.assertIsNone(page["next_before"])
+                break
+            params["before"] = page["next_before"]
+        self.assertEqual(pages, [ids[4:2:-1], ids[2:0:-1], ids[:1]])
+        self.assertEqual(page["results"][0]["submitted_by"], "Admin User")
+
+
+class ComplianceStatusTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.record = ESDComplianceChecklist.objects.create(
+            date=timezone.localdate(), shift="Day", emp_id="E1001", name="Test Inspector",
+            line="L1", group="G1", model="X1", color="Black",
+        )
+
+    def stored(self):
+        record = ESDComplianceChecklist.objects.get(pk=self.record.pk)
+        return record.pass_count, record.fail_count, record.na_count, record.overall_status
+
+    def test_counts_follow_the_answers(self):
+        total = len(ESDComplianceChecklist.COMPLIANCE_FIELDS)
+        self.assertEqual(self.stored(), (0, 0, total, "N/A"))
+
+        self.record.epa_clothes = "YES"
+        self.record.save()
+        self.assertEqual(self.stored(), (1, 0, total - 1, "MIXED"))
+
+        for name in ESDComplianceChecklist.COMPLIANCE_FIELDS:
+            setattr(self.record, name, "YES")
+        self.record.save()
+        self.assertEqual(self.stored(), (total, 0, 0, "PASS"))
+
+        # update_fields saves the recounted columns too
+        self.record.tray_voltage = "NO"
+        self.record.save(update_fields=["tray_voltage"])
+        self.assertEqual(self.stored(), (total - 1, 1, 0, "FAIL"))
+        self.assertEqual(esd_compliance_status(self.record)["status"], "Non-Compliant")
+
+    def test_backfill_recomputes_stale_counts(self):
+        total = len(ESDComplianceChecklist.COMPLIANCE_FIELDS)
+        others = [
+            ESDComplianceChecklist.objects.create(date=self.record.date, shift="Day", emp_id="E1002", name="Other")
+            for _ in range(2)
+        ]
+        # QuerySet.update bypasses save(), as on rows written before the counts existed.
+        ESDComplianceChecklist.objects.filter(pk=self.record.pk).update(
+            **dict.fromkeys(ESDComplianceChecklist.COMPLIANCE_FIELDS, "YES")
+        )
+        ESDComplianceChecklist.objects.filter(pk=others[0].pk).update(epa_clothes="NO")
+        ESDComplianceChecklist.objects.update(pass_count=0, fail_count=0, na_count=0, overall_status="")
+        ESDComplianceChecklist.objects.filter(pk=others[1].pk).update(na_count=total, overall_status="N/A")
+
+        out = StringIO()
+        # Batches of 2: select + bulk_update, select (nothing stale), empty select.
+        with self.assertNumQueries(4):
+            call_command("backfill_compliance_status", "--model", "esd", "--batch-size", "2", stdout=out)
+        self.assertEqual(out.getvalue().strip(), "esd: 3 records checked, 2 updated")
+        self.assertEqual(self.stored(), (total, 0, 0, "PASS"))
+        self.assertEqual(
+            list(ESDComplianceChecklist.objects.filter(pk__in=[o.pk for o in others]).order_by("pk")
+                 .values_list("pass_count", "fail_count", "na_count", "overall_status")),
+            [(0, 1, total - 1, "FAIL"), (0, 0, total, "N/A")],
+        )
+
+    def test_list_filters_on_the_stored_status(self):
+        self.record.epa_clothes = "NO"
+        self.record.save()
+        user = Employee.objects.create_user(employee_id="E1001", full_name="Test Inspector", password="x", role="IPQC")
+        self.client.force_login(user)
+        url = reverse("esd_compliance_checklist_list")
+        self.assertEqual([r.pk for r in self.client.get(url, {"status": "FAIL"}).context["records"]], [self.record.pk])
+        self.assertEqual(list(self.client.get(url, {"status": "PASS"}).context["records"]), [])
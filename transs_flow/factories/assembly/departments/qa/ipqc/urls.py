@@ -21,6 +21,7 @@ urlpatterns = [
     path('dynamic-form/create/', views.create_dynamic_form, name='create_dynamic_form'),
     path('dynamic-form/<int:form_id>/', views.fill_dynamic_form, name='dynamic_form'),
     path('dynamic-form/<int:form_id>/dashboard/', views.dynamic_form_dashboard, name='dynamic_form_dashboard'),
+    path('dynamic-form/<int:form_id>/submissions.json', views.dynamic_form_submissions_json, name='dynamic_form_submissions_json'),
     path('dynamic-form/success/', views.dynamic_form_success, name='dynamic_form_success'),
     
     # ESD Compliance Checklist URLs
@@ -49,6 +50,12 @@ urlpatterns = [
     path('operator-qualification/list/', views.OperatorQualificationCheckListView.as_view(), name='operator_qualification_list'),
     path('operator-qualification/details/<int:pk>/', views.operator_qualification_detail, name='operator_qualification_detail'),
     path('operator-qualification/success/', views.operator_qualification_success, name='operator_qualification_success'),
+
+    # IMEI traceability
+    path('imei/history/', views.imei_history, name='imei_history'),
+
+    # Bulk export
+    path('export/<str:form>/', views.export_checklist, name='export_checklist'),
  
     # Assembly Audit URLs
     path('assembly-audit/create/', views.IPQCAssemblyAuditCreateView.as_view(), name='ipqc_assembly_audit_create'),
@@ -80,6 +87,10 @@ urlpatterns = [
     
     # Bitable Webhook URL
     path('bitable/webhook/', views.lark_bitable_webhook, name='lark_bitable_webhook'),
+
+    # Lark Bitable sync status (admin only)
+    path('bitable/status/', views.bitable_sync_status, name='bitable_sync_status'),
+    path('bitable/status.json', views.bitable_sync_status_json, name='bitable_sync_status_json'),
     
     # PWA API Endpoints
     path('api/submit-offline-data/', views.api_submit_offline_data, name='api_submit_offline_data'),
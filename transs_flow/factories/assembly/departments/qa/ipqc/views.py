@@ -6,26 +6,31 @@ from django import forms
 import json
 from accounts.models import Employee
 from .forms import WorkInfoForm, IPQCAssemblyAuditForm, FIELDS_WITH_REMARKS, BTBFitmentChecksheetForm, AssDummyTestForm, IPQCDisassembleCheckListForm, NCIssueTrackingForm, ESDComplianceChecklistForm, DustCountCheckForm, TestingFirstArticleInspectionForm, OperatorQualificationCheckForm
-from .services import write_to_bitable, write_to_bitable_dynamic, date_to_ms
+from .bitable_mapping import date_to_ms
+from .pagination import CURSOR_PARAMS, KeysetPaginationMixin
+from . import model_catalog, sync_metrics, webhooks
+from .exports import EXPORT_MODELS, export_columns, export_rows, filter_export
+from core.exports import streaming_export
 from datetime import timedelta, datetime, date
-from .models import IPQCWorkInfo, DynamicForm, DynamicFormField, DynamicFormSubmission, IPQCAssemblyAudit, BTBFitmentChecksheet, AssDummyTest, IPQCDisassembleCheckList, NCIssueTracking, ESDComplianceChecklist, DustCountCheck, TestingFirstArticleInspection, OperatorQualificationCheck
-import pandas as pd
+from .models import home_counts_cache_key, normalize_imei, BitableOutbox, DailyFormStats, IMEIRecord, SearchTerm, IPQCWorkInfo, DynamicForm, DynamicFormField, DynamicFormFieldStats, DynamicFormStats, DynamicFormSubmission, IPQCAssemblyAudit, BTBFitmentChecksheet, AssDummyTest, IPQCDisassembleCheckList, NCIssueTracking, ESDComplianceChecklist, DustCountCheck, TestingFirstArticleInspection, OperatorQualificationCheck
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, ListView, UpdateView, DeleteView, View
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import DetailView
 from accounts.role_decorator import RoleRequiredMixin, role_required
-from django.db.models import Q
+from django.db.models import Count, Q
+from django.core.cache import cache
 from django.db import models
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse, Http404
-from django.db import connections
-from django.views.decorators.http import require_GET
+from django.db import transaction
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET, require_http_methods
 from django.conf import settings
 from django.http import HttpResponse
 import os
 from django.urls import reverse
-import requests
+from django.utils.functional import cached_property
  
 # ==============================================================================
 # PWA HELPER FUNCTIONS
@@ -51,23 +56,18 @@ def get_pwa_context(request):
 # EXISTING FUNCTION-BASED VIEWS (WITH PWA ENHANCEMENTS)
 # ==============================================================================
  
-# --- Fetch models dynamically from your DB ---
+# --- Model autocomplete, served from the in-memory model catalog ---
+def model_catalog_etag(request):
+    return model_catalog.get_catalog().version
+
+
+@require_GET
+@cache_control(private=True, max_age=60)
+@condition(etag_func=model_catalog_etag)
 def ajax_get_models(request):
     q = request.GET.get('q', '').strip()
-    try:
-        with connections['defaultdb'].cursor() as cursor:
-            cursor.execute("""
-                SELECT model_name 
-                FROM model_description 
-                WHERE model_name LIKE %s 
-                ORDER BY model_name ASC
-                LIMIT 20;
-            """, [f"%{q}%"])
-            rows = cursor.fetchall()
-        data = [{'id': r[0], 'text': r[0]} for r in rows]
-    except Exception as e:
-        data = []
-    return JsonResponse(data, safe=False)
+    names = model_catalog.get_catalog().search(q, limit=20)
+    return JsonResponse([{'id': name, 'text': name} for name in names], safe=False)
  
  
 # --- Static list for lines (L1–L15) ---
@@ -141,11 +141,7 @@ def work_info_view(request):
                 }
             }
  
-            success, message = write_to_bitable(work_info)
-            if success:
-                messages.success(request, 'Work info saved and synced to Lark Bitable!')
-            else:
-                messages.warning(request, f'Work info saved but failed to sync: {message}')
+            messages.success(request, 'Work info saved! Lark Bitable sync queued.')
  
             return redirect('work_info_list')
     else:
@@ -248,12 +244,7 @@ def work_info_list(request):
     # Search functionality
     search_query = request.GET.get('q', '')
     if search_query:
-        all_records = all_records.filter(
-            Q(line__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(color__icontains=search_query) |
-            Q(section__icontains=search_query)
-        )
+        all_records = SearchTerm.objects.search(all_records, search_query)
     
     # Filter functionality
     filter_line = request.GET.get('line', '')
@@ -329,37 +320,110 @@ def forms_selection_view(request, work_info_id):
  
 @csrf_exempt
 def lark_bitable_webhook(request):
-    """Webhook endpoint for Lark Bitable automation trigger"""
+    """
+    Webhook endpoint for Lark Bitable automation trigger.
+
+    Takes one event ({"fields": {...}}) or a batch ({"events": [...]}),
+    queues the status changes and acks straight away; the worker applies
+    them in bulk (see webhooks.py). Redeliveries of events with a Lark event id are ignored.
+    """
     if request.method != 'POST':
         return JsonResponse({"error": "Invalid method"}, status=405)
  
     try:
         payload = json.loads(request.body.decode('utf-8'))
-        fields = payload.get('fields', {})
-        
-        emp_id = fields.get('Emp_ID')
-        model_name = fields.get('Model')
-        date = fields.get('Date')
-        status = fields.get('Status')
- 
-        if not all([emp_id, model_name, date, status]):
+        if not isinstance(payload, dict):
+            return JsonResponse({"error": "Expected a JSON object"}, status=400)
+
+        events, invalid = webhooks.parse_events(payload)
+        if not events:
             return JsonResponse({"error": "Missing required fields"}, status=400)
- 
-        # Convert date if it's in timestamp (ms)
-        if isinstance(date, int):
-            date = datetime.fromtimestamp(date / 1000).date()
- 
-        # Update corresponding record
-        updated = IPQCWorkInfo.objects.filter(emp_id=emp_id, model=model_name, date=date).update(status=status)
- 
-        if updated:
-            return JsonResponse({"message": "Status updated successfully"})
-        else:
-            return JsonResponse({"error": "Record not found"}, status=404)
+
+        webhooks.enqueue_events(events)
+        return JsonResponse({"message": "Status update queued", "queued": len(events), "invalid": invalid})
  
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
  
+
+STATUS_WINDOW_OPTIONS = [5, 15, 60]
+
+
+def _status_window(request):
+    try:
+        minutes = int(request.GET.get('minutes', 15))
+    except ValueError:
+        minutes = 15
+    return max(1, min(minutes, 120))
+
+
+@login_required
+@role_required()
+def bitable_sync_status(request):
+    """Admin-only Lark Bitable sync status: outbox backlog, error rate and latency per table"""
+    status = sync_metrics.sync_status(_status_window(request))
+    calls = sum(table.get('calls', 0) for table in status['tables'])
+    errors = sum(table.get('errors', 0) for table in status['tables'])
+    totals = {
+        'pending': sum(table['pending'] for table in status['tables']),
+        'failed': sum(table['failed'] for table in status['tables']),
+        'calls': calls,
+        'error_rate': errors / calls if calls else 0,
+    }
+    return render(request, 'ipqc/bitable_sync_status.html', {
+        'status': status,
+        'totals': totals,
+        'window_options': STATUS_WINDOW_OPTIONS,
+    })
+
+
+@login_required
+@role_required()
+@require_GET
+def bitable_sync_status_json(request):
+    """Same numbers as bitable_sync_status, as JSON"""
+    return JsonResponse(sync_metrics.sync_status(_status_window(request)))
+
+
+HOME_COUNTS_TTL = 60  # seconds; saves by the employee drop the entry earlier
+
+
+def home_counts(emp_id, fai_filter, today):
+    """
+    Today / this week / this month record counts shown on the IPQC home page,
+    one conditional-aggregate query per model, cached per employee.
+    """
+    key = home_counts_cache_key(emp_id, today)
+    counts = cache.get(key)
+    if counts is not None:
+        return counts
+
+    start_of_week = today - timedelta(days=today.weekday())
+    start_of_month = today.replace(day=1)
+    periods = {
+        'today': Q(date=today),
+        'week': Q(date__gte=start_of_week),
+        'month': Q(date__gte=start_of_month),
+    }
+    sources = {
+        'work_info': IPQCWorkInfo.objects.filter(emp_id=emp_id),
+        'audit': IPQCAssemblyAudit.objects.filter(emp_id=emp_id),
+        'esd': ESDComplianceChecklist.objects.filter(emp_id=emp_id),
+        'disassemble': IPQCDisassembleCheckList.objects.filter(emp_id=emp_id),
+        'fai': TestingFirstArticleInspection.objects.filter(**fai_filter),
+    }
+
+    counts = {}
+    for name, queryset in sources.items():
+        counts.update(
+            queryset.filter(date__range=[min(start_of_week, start_of_month), today]).aggregate(**{
+                f'{name}_{period}': Count('id', filter=condition) for period, condition in periods.items()
+            })
+        )
+    cache.set(key, counts, HOME_COUNTS_TTL)
+    return counts
+
+
 @login_required
 @role_required(["IPQC"])
 def home_view(request):
@@ -369,8 +433,6 @@ def home_view(request):
     now = timezone.localtime()
     today_8am = now.replace(hour=8, minute=0, second=0, microsecond=0)
     today = now.date()
-    start_of_week = today - timedelta(days=today.weekday())
-    start_of_month = today.replace(day=1)
  
     # Define the time range (8 AM today → 8 AM next day)
     if now < today_8am:
@@ -401,30 +463,7 @@ def home_view(request):
     if not is_admin and emp_id:
         base_filter['inspector_name'] = getattr(user, 'full_name', '') or user.username
  
-    # Work Info counts
-    work_info_today = IPQCWorkInfo.objects.filter(date=today, emp_id=emp_id).count()
-    work_info_week = IPQCWorkInfo.objects.filter(date__range=[start_of_week, today], emp_id=emp_id).count()
-    work_info_month = IPQCWorkInfo.objects.filter(date__range=[start_of_month, today], emp_id=emp_id).count()
- 
-    # Assembly Audit counts
-    audit_today = IPQCAssemblyAudit.objects.filter(date=today, emp_id=emp_id).count()
-    audit_week = IPQCAssemblyAudit.objects.filter(date__range=[start_of_week, today], emp_id=emp_id).count()
-    audit_month = IPQCAssemblyAudit.objects.filter(date__range=[start_of_month, today], emp_id=emp_id).count()
- 
-    # ESD Compliance counts
-    esd_today = ESDComplianceChecklist.objects.filter(date=today, emp_id=emp_id).count()
-    esd_week = ESDComplianceChecklist.objects.filter(date__range=[start_of_week, today], emp_id=emp_id).count()
-    esd_month = ESDComplianceChecklist.objects.filter(date__range=[start_of_month, today], emp_id=emp_id).count()
- 
-    # IPQC Disassemble counts
-    disassemble_today = IPQCDisassembleCheckList.objects.filter(date=today, emp_id=emp_id).count()
-    disassemble_week = IPQCDisassembleCheckList.objects.filter(date__range=[start_of_week, today], emp_id=emp_id).count()
-    disassemble_month = IPQCDisassembleCheckList.objects.filter(date__range=[start_of_month, today], emp_id=emp_id).count()
- 
-    # FAI counts
-    fai_today = TestingFirstArticleInspection.objects.filter(date=today, **base_filter).count()
-    fai_week = TestingFirstArticleInspection.objects.filter(date__range=[start_of_week, today], **base_filter).count()
-    fai_month = TestingFirstArticleInspection.objects.filter(date__range=[start_of_month, today], **base_filter).count()
+    counts = home_counts(emp_id, base_filter, today)
  
     recent_audits = IPQCAssemblyAudit.objects.filter(emp_id=emp_id).order_by('-created_at')[:5]
     dynamic_forms = DynamicForm.objects.all().order_by('-created_at')
@@ -437,30 +476,8 @@ def home_view(request):
         'is_admin': is_admin,
         'dynamic_forms': dynamic_forms,
         
-        # Work Info counts
-        'work_info_today': work_info_today,
-        'work_info_week': work_info_week,
-        'work_info_month': work_info_month,
-        
-        # Audit counts
-        'audit_today': audit_today,
-        'audit_week': audit_week,
-        'audit_month': audit_month,
-        
-        # ESD counts
-        'esd_today': esd_today,
-        'esd_week': esd_week,
-        'esd_month': esd_month,
-        
-        # Disassemble counts
-        'disassemble_today': disassemble_today,
-        'disassemble_week': disassemble_week,
-        'disassemble_month': disassemble_month,
-        
-        # FAI counts
-        'fai_today': fai_today,
-        'fai_week': fai_week,
-        'fai_month': fai_month,
+        # work_info_/audit_/esd_/disassemble_/fai_ + today/week/month
+        **counts,
         
         'recent_audits': recent_audits,
         **get_pwa_context(request)
@@ -561,21 +578,27 @@ def fill_dynamic_form(request, form_id):
             cleaned_data = form.cleaned_data
  
             dynamic_data = {k: v for k, v in cleaned_data.items() if k not in prefill_work_info}
-            submission = DynamicFormSubmission.objects.create(
-                form=form_obj,
-                submitted_by=request.user,
-                data=dynamic_data
-            )
- 
             ipqc_data = {k: v for k, v in cleaned_data.items() if k in prefill_work_info}
-            for field, value in ipqc_data.items():
-                setattr(work_info_today, field.lower(), value)
-            work_info_today.save()
- 
             combined_data = {**ipqc_data, **dynamic_data}
             if 'Date' in combined_data and isinstance(combined_data['Date'], (datetime, date)):
                 combined_data['Date'] = date_to_ms(combined_data['Date'])
  
+            with transaction.atomic():
+                submission = DynamicFormSubmission.objects.create(
+                    form=form_obj,
+                    submitted_by=request.user,
+                    data=dynamic_data
+                )
+ 
+                for field, value in ipqc_data.items():
+                    setattr(work_info_today, field.lower(), value)
+                work_info_today.save()
+ 
+                BitableOutbox.objects.enqueue(
+                    table_id=form_obj.lark_bitable_table_id,
+                    payload=combined_data,
+                )
+ 
             # PWA: Add data to context for frontend to save to IndexedDB
             context = {
                 'offline_data': {
@@ -586,11 +609,7 @@ def fill_dynamic_form(request, form_id):
                 }
             }
             
-            success, message = write_to_bitable_dynamic(form_obj.lark_bitable_table_id, combined_data)
-            messages.success(
-                request,
-                f"Form submitted! {message if success else 'Saved locally to MySQL.'}"
-            )
+            messages.success(request, "Form submitted! Lark Bitable sync queued.")
             return render(request, 'ipqc/dynamic_form_success.html', context)
     else:
         form = CustomForm()
@@ -651,36 +670,73 @@ def create_dynamic_form(request):
 @role_required()
 def dynamic_form_dashboard(request, form_id):
     form_obj = get_object_or_404(DynamicForm, id=form_id)
-    submissions = DynamicFormSubmission.objects. filter(form=form_obj)
- 
-    df = pd. DataFrame([s.data for s in submissions])
-    df['submitted_by'] = [s.submitted_by.full_name for s in submissions]
-    df['created_at'] = [s.created_at for s in submissions]
- 
-    total_submissions = len(df)
-    latest_submission = df['created_at']. max() if  not df.empty else  None
- 
-    numeric_summary = {}
-    for col in df.columns:
-        if pd.api.types.is_numeric_dtype(df[col]):
-            numeric_summary[col] = {
-                'mean': round(df[col].mean(), 2),
-                'max': df[col]. max(),
-                'min': df[col]. min(),
-            }
+    stats = DynamicFormStats.objects.filter(form=form_obj).first()
+ 
+    numeric_summary = {
+        field.field_name: {'mean': field.mean, 'max': field.max_value, 'min': field.min_value}
+        for field in DynamicFormFieldStats.objects.filter(form=form_obj, count__gt=0).order_by('field_name')
+    }
  
     context = {
         "form_obj": form_obj,
-        'total_submissions': total_submissions,
-        "latest_submission": latest_submission,
+        'total_submissions': stats.submission_count if stats else 0,
+        "latest_submission": stats.last_submission_at if stats else None,
         "numeric_summary": numeric_summary,
-        "data_json": df.to_json(orient='records') if not df.empty else '[]',
+        "columns": list(form_obj.fields.values_list('label', flat=True)),
+        "rows_url": reverse('dynamic_form_submissions_json', args=[form_obj.id]),
         **get_pwa_context(request)
     }
  
     return render(request, "ipqc/dynamic_dashboard.html", context)
  
  
+SUBMISSIONS_PAGE_SIZE = 50
+SUBMISSIONS_MAX_PAGE_SIZE = 500
+ 
+ 
+@login_required
+@role_required()
+@require_GET
+def dynamic_form_submissions_json(request, form_id):
+    """
+    One page of a dynamic form's submissions, newest first. Pass the last
+    ``id`` seen as ``?before=`` for the next page.
+    """
+    form_obj = get_object_or_404(DynamicForm, id=form_id)
+    try:
+        page_size = min(int(request.GET.get('page_size', SUBMISSIONS_PAGE_SIZE)), SUBMISSIONS_MAX_PAGE_SIZE)
+        before = int(request.GET['before']) if request.GET.get('before') else None
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'page_size and before must be integers'}, status=400)
+    page_size = max(page_size, 1)
+ 
+    submissions = DynamicFormSubmission.objects.filter(form=form_obj).order_by('-id')
+    if before is not None:
+        submissions = submissions.filter(id__lt=before)
+    rows = list(submissions.values('id', 'data', 'submitted_by_id', 'created_at')[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+ 
+    # Employees live in another database: one lookup for the whole page instead of a join.
+    user_ids = {row['submitted_by_id'] for row in rows if row['submitted_by_id']}
+    names = dict(Employee.objects.filter(pk__in=user_ids).values_list('pk', 'full_name')) if user_ids else {}
+ 
+    results = [
+        {
+            'id': row['id'],
+            'submitted_by': names.get(row['submitted_by_id'], ''),
+            'created_at': timezone.localtime(row['created_at']).isoformat(),
+            'data': row['data'],
+        }
+        for row in rows
+    ]
+    return JsonResponse({
+        'results': results,
+        'has_more': has_more,
+        'next_before': results[-1]['id'] if has_more else None,
+    })
+ 
+ 
 # ==============================================================================
 # IPQC ASSEMBLY AUDIT VIEWS (NEW & UPDATED)
 # ==============================================================================
@@ -693,7 +749,7 @@ class UserCanEditAuditMixin(UserPassesTestMixin):
             return True
         return audit.emp_id == user.employee_id
  
-class IPQCAssemblyAuditListView(RoleRequiredMixin, LoginRequiredMixin, ListView):
+class IPQCAssemblyAuditListView(RoleRequiredMixin, LoginRequiredMixin, KeysetPaginationMixin, ListView):
     allowed_roles = ["IPQC"]
     model = IPQCAssemblyAudit
     template_name = 'ipqc/audit_list.html'
@@ -1039,7 +1095,7 @@ class BTBFitmentChecksheetCreateView(RoleRequiredMixin, LoginRequiredMixin, Crea
         messages.success(self.request, "BTB Fitment Checksheet submitted successfully!")
         return render(self.request, 'ipqc/btb_checksheet_success.html', context)
  
-class BTBFitmentChecksheetListView(RoleRequiredMixin, LoginRequiredMixin, ListView):
+class BTBFitmentChecksheetListView(RoleRequiredMixin, LoginRequiredMixin, KeysetPaginationMixin, ListView):
     allowed_roles = ["IPQC"]
     model = BTBFitmentChecksheet
     template_name = 'ipqc/btb_checksheet_list.html'
@@ -1157,12 +1213,11 @@ class AssyDummyTestCreate(RoleRequiredMixin, LoginRequiredMixin, CreateView):
         messages.success(self.request, "Assy Dummy Test submitted successfully!")
         return render(self.request, 'ipqc/ass_dummy_test_success.html', context)
     
-class AssDummyTestListView(RoleRequiredMixin, LoginRequiredMixin, ListView):
+class AssDummyTestListView(RoleRequiredMixin, LoginRequiredMixin, KeysetPaginationMixin, ListView):
     allowed_roles = ["IPQC"]
     model = AssDummyTest
     template_name = 'ipqc/ass_dummy_test_list.html'
     context_object_name = 'tests'
-    ordering = ['-date', '-id']
     paginate_by = 25
     
     def get_context_data(self, **kwargs):
@@ -1259,7 +1314,38 @@ class IPQCDisassembleCheckListCreateView(RoleRequiredMixin, LoginRequiredMixin,
         messages.error(self.request, "❌ Please correct the highlighted errors before submitting.")
         return super().form_invalid(form)
 
-class IPQCDisassembleCheckListView(RoleRequiredMixin, LoginRequiredMixin, ListView):
+def filter_by_search(queryset, request):
+    """Narrow a checklist list by the ``?q=`` search box, through the search index"""
+    return SearchTerm.objects.search(queryset, request.GET.get('q', ''))
+
+
+def filter_by_compliance(queryset, request):
+    """
+    Narrow a compliance checklist list by ``?status=`` (PASS / FAIL / MIXED / N/A)
+    and a ``?date_from=`` / ``?date_to=`` range, using the stored status columns.
+    """
+    status = request.GET.get('status', '').strip()
+    if status in dict(queryset.model.OVERALL_STATUS_CHOICES):
+        queryset = queryset.filter(overall_status=status)
+    for param, lookup in (('date_from', 'date__gte'), ('date_to', 'date__lte')):
+        value = request.GET.get(param, '').strip()
+        if value:
+            try:
+                queryset = queryset.filter(**{lookup: date.fromisoformat(value)})
+            except ValueError:
+                pass
+    return queryset
+
+
+def compliance_querystring(request):
+    """The list's current search and filter parameters, for pagination links"""
+    params = request.GET.copy()
+    for name in CURSOR_PARAMS:
+        params.pop(name, None)
+    return params.urlencode()
+
+
+class IPQCDisassembleCheckListView(RoleRequiredMixin, LoginRequiredMixin, KeysetPaginationMixin, ListView):
     allowed_roles = ["IPQC"]
     model = IPQCDisassembleCheckList
     template_name = 'ipqc/ipqc_disassemble_list.html'
@@ -1267,58 +1353,17 @@ class IPQCDisassembleCheckListView(RoleRequiredMixin, LoginRequiredMixin, ListVi
     paginate_by = 20
 
     def get_queryset(self):
-        queryset = super().get_queryset().order_by('-created_at')
-        query = self.request.GET.get('q', '').strip()
-        if query:
-            queryset = queryset.filter(
-                Q(name__icontains=query) |
-                Q(emp_id__icontains=query) |
-                Q(model__icontains=query) |
-                Q(color__icontains=query)
-            )
-        return queryset
-    
-    def get_overall_status(self):
-        choice_fields = [field.name for field in self._meta.fields 
-                        if field.choices and field.name not in ['created_by']]
-        
-        ok_count = 0
-        not_ok_count = 0
-        total_checked = 0
-        
-        for field_name in choice_fields:
-            value = getattr(self, field_name)
-            if value == 'OK':
-                ok_count += 1
-                total_checked += 1
-            elif value == 'Not OK':
-                not_ok_count += 1
-                total_checked += 1
-        
-        if total_checked == 0:
-            return 'MIXED'
-        elif not_ok_count == 0:
-            return 'PASS'
-        elif ok_count == 0:
-            return 'FAIL'
-        else:
-            return 'MIXED'
+        queryset = filter_by_search(super().get_queryset(), self.request)
+        return filter_by_compliance(queryset, self.request)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        today = timezone.now().date()
-        week_start = today - datetime.timedelta(days=today.weekday())
-        
-        all_records = self.model.objects.all()
-        
-        stats = {
-            'today': all_records.filter(created_at__date=today).count(),
-            'week': all_records.filter(created_at__date__gte=week_start).count(),
-            'total': all_records.count(),
-        }
+        stats = DailyFormStats.objects.summary(DailyFormStats.FORM_DISASSEMBLE)
         
         context['ipqc_disassemble_stats'] = stats
+        context['status_choices'] = self.model.OVERALL_STATUS_CHOICES
+        context['filter_querystring'] = compliance_querystring(self.request)
         context['total_records'] = stats['total']
         context['recent_submissions'] = self.model.objects.order_by('-created_at')[:5]
         context.update(get_pwa_context(self.request))
@@ -1511,7 +1556,7 @@ class NCIssueTrackingCreateView(RoleRequiredMixin, LoginRequiredMixin, CreateVie
         messages.success(self.request, "✅ NC Issue Tracking submitted successfully!")
         return render(self.request, 'ipqc/nc_issue_success.html', context)
     
-class NCIssueTrackingListView(RoleRequiredMixin, LoginRequiredMixin, ListView):
+class NCIssueTrackingListView(RoleRequiredMixin, LoginRequiredMixin, KeysetPaginationMixin, ListView):
     allowed_roles = ["IPQC"]
     model = NCIssueTracking
     template_name = 'ipqc/nc_issue_tracking_list.html'
@@ -1519,16 +1564,7 @@ class NCIssueTrackingListView(RoleRequiredMixin, LoginRequiredMixin, ListView):
     paginate_by = 20
 
     def get_queryset(self):
-        queryset = super().get_queryset().order_by('-created_at')
-        query = self.request.GET.get('q', '').strip()
-        if query:
-            queryset = queryset.filter(
-                Q(name__icontains=query) |
-                Q(emp_id__icontains=query) |
-                Q(model__icontains=query) |
-                Q(color__icontains=query)
-            )
-        return queryset
+        return filter_by_search(super().get_queryset(), self.request)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -1622,7 +1658,7 @@ class ESDComplianceChecklistCreateView(RoleRequiredMixin, LoginRequiredMixin, Cr
         messages.success(self.request, "✅ ESD Compliance Checklist submitted successfully!")
         return render(self.request, 'ipqc/esd_success.html', context)
 
-class ESDComplianceCheckListView(RoleRequiredMixin, LoginRequiredMixin, ListView):
+class ESDComplianceCheckListView(RoleRequiredMixin, LoginRequiredMixin, KeysetPaginationMixin, ListView):
     allowed_roles = ["IPQC", "admin", "superuser"]
     model = ESDComplianceChecklist
     template_name = 'ipqc/esd_compliance_checklist_list.html'
@@ -1630,42 +1666,8 @@ class ESDComplianceCheckListView(RoleRequiredMixin, LoginRequiredMixin, ListView
     paginate_by = 10
 
     def get_queryset(self):
-        queryset = super().get_queryset().order_by('-date', '-created_at')
-        search_query = self.request.GET.get('q')
-
-        if search_query:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) |
-                Q(emp_id__icontains=search_query) |
-                Q(line__icontains=search_query) |
-                Q(model__icontains=search_query)
-            )
-
-        return queryset
-    
-    def get_overall_status(self):
-        audit_fields = [f.name for f in self._meta.fields if f.choices]
-        
-        ok_count = 0
-        not_ok_count = 0
-        na_count = 0
-        
-        for field_name in audit_fields:
-            value = getattr(self, field_name)
-            if value == 'OK':
-                ok_count += 1
-            elif value == 'NOT_OK':
-                not_ok_count += 1
-            elif value == 'NA':
-                na_count += 1
-
-        if not_ok_count > 0:
-            return 'FAIL'
-        if ok_count > 0 and na_count > 0:
-            return 'MIXED'
-        if ok_count > 0:
-            return 'PASS'
-        return 'N/A'
+        queryset = filter_by_search(super().get_queryset(), self.request)
+        return filter_by_compliance(queryset, self.request)
 
     def __str__(self):
         return f"{self.date} - {self.line} - {self.name}"
@@ -1673,14 +1675,12 @@ class ESDComplianceCheckListView(RoleRequiredMixin, LoginRequiredMixin, ListView
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        base_queryset = self.model.objects.all()
-        today = timezone.now().date()
-        
-        context['total_records'] = base_queryset.count()
-        context['today_records'] = base_queryset.filter(date=today).count()
-        
-        start_of_week = today - timedelta(days=today.weekday())
-        context['week_records'] = base_queryset.filter(date__gte=start_of_week).count()
+        stats = DailyFormStats.objects.summary(DailyFormStats.FORM_ESD)
+        context['total_records'] = stats['total']
+        context['today_records'] = stats['today']
+        context['week_records'] = stats['week']
+        context['status_choices'] = self.model.OVERALL_STATUS_CHOICES
+        context['filter_querystring'] = compliance_querystring(self.request)
         
         context.update(get_pwa_context(self.request))
         return context
@@ -1776,17 +1776,16 @@ def esd_compliance_checklist_details(request, pk):
             url = photo.url if photo.url.startswith('/media/') else f"{settings.MEDIA_URL}{photo}"
             available_photos.append({'url': url, 'label': label})
 
-    overall_status = 'N/A'
-    if hasattr(record, 'get_overall_status'):
-        overall_status = record.get_overall_status()
-
     data = {
         'basic_info': basic_info,
         'compliance': compliance_data,
         'readings': readings,
         'photos': available_photos,
         'remark': record.remark,
-        'overall_status': overall_status,
+        'overall_status': record.overall_status,
+        'pass_count': record.pass_count,
+        'fail_count': record.fail_count,
+        'na_count': record.na_count,
         'created_at': record.created_at.strftime('%Y-%m-%d %H:%M:%S'),
     }
     return JsonResponse(data)
@@ -1877,22 +1876,14 @@ class DustCountCreateView(RoleRequiredMixin, LoginRequiredMixin, CreateView):
         messages.success(self.request, "✅ Dust Count Check submitted successfully!")
         return render(self.request, 'ipqc/dust_count_success.html', context)
 
-class DustCountListView(ListView):
+class DustCountListView(KeysetPaginationMixin, ListView):
     model = DustCountCheck
     template_name = 'ipqc/dust_count_checklist_list.html'
     context_object_name = 'records'
     paginate_by = 10
 
     def get_queryset(self):
-        queryset = super().get_queryset().order_by('-date', '-created_at')
-        search_query = self.request.GET.get('q')
-        if search_query:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) |
-                Q(emp_id__icontains=search_query) |
-                Q(line__icontains=search_query)
-            )
-        return queryset
+        return filter_by_search(super().get_queryset(), self.request)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -2006,47 +1997,32 @@ class TestingFirstArticleInspectionCreateView(LoginRequiredMixin, CreateView):
         context.update(get_pwa_context(self.request))
         return context
  
-class TestingFirstArticleInspectionListView(LoginRequiredMixin, ListView):
+class TestingFirstArticleInspectionListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = TestingFirstArticleInspection
     template_name = 'ipqc/testing_fai_list.html'
     context_object_name = 'fai_records'
     paginate_by = 10
-    ordering = ['-date', '-created_at']
- 
-    def get_queryset(self):
-        user = self.request.user
-        queryset = super().get_queryset()
-        search_query = self.request.GET.get('q')
-
-        if search_query:
-            queryset = queryset.filter(
-                Q(inspector_name__icontains=search_query) |
-                Q(model__icontains=search_query) |
-                Q(color__icontains=search_query) |
-                Q(imei_number__icontains=search_query)
-            )
 
+    @cached_property
+    def inspector_filter(self):
+        """Non-admins only see (and count) the records they inspected"""
+        user = self.request.user
         if user.is_superuser or user.groups.filter(name__in=['Admin', 'QA']).exists():
-            return queryset
-        else:
-            inspector_name = getattr(user, 'full_name', None) or getattr(user, 'name', None) or getattr(user, 'username', None) or str(user)
-            return queryset.filter(inspector_name=inspector_name)
+            return {}
+        inspector_name = getattr(user, 'full_name', None) or getattr(user, 'name', None) or getattr(user, 'username', None) or str(user)
+        return {'inspector_name': inspector_name}
+ 
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(**self.inspector_filter)
+        # After the inspector filter, so the prefix fast paths only look at the user's own records
+        return filter_by_search(queryset, self.request)
  
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        queryset_for_stats = self.get_queryset()
-        
-        today = timezone.now().date()
-        week_start = today - timezone.timedelta(days=today.weekday())
-        
         context.update({
             'page_title': 'FAI Records',
-            'fai_stats': {
-                'today': queryset_for_stats.filter(date=today).count(),
-                'week': queryset_for_stats.filter(date__gte=week_start).count(),
-                'total': queryset_for_stats.count(),
-            },
+            'fai_stats': DailyFormStats.objects.summary(DailyFormStats.FORM_FAI, **self.inspector_filter),
             'breadcrumbs': [
                 {'name': 'Dashboard', 'url': reverse_lazy('ipqc_home')}, 
                 {'name': 'FAI List', 'url': '#'}
@@ -2259,37 +2235,23 @@ class OperatorQualificationCheckCreateView(CreateView):
         context.update(get_pwa_context(self.request))
         return context
 
-class OperatorQualificationCheckListView(ListView):
+class OperatorQualificationCheckListView(KeysetPaginationMixin, ListView):
     model = OperatorQualificationCheck
     template_name = 'ipqc/operator_qualification_list.html'
     context_object_name = 'records'
-    ordering = ['-created_at']
     paginate_by = 10
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        q = self.request.GET.get('q')
-        if q:
-            queryset = queryset.filter(
-                models.Q(emp_id__icontains=q) |
-                models.Q(name__icontains=q) |
-                models.Q(model__icontains=q) |
-                models.Q(color__icontains=q) |
-                models.Q(line__icontains=q)
-            )
-        return queryset
+        return filter_by_search(super().get_queryset(), self.request)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        today = timezone.now().date()
-        week_ago = today - timedelta(days=7)
+        today = timezone.localdate()
         
-        context['stats'] = {
-            'today': OperatorQualificationCheck.objects.filter(date=today).count(),
-            'week': OperatorQualificationCheck.objects.filter(date__gte=week_ago).count(),
-            'total': OperatorQualificationCheck.objects.count(),
-        }
+        context['stats'] = DailyFormStats.objects.summary(
+            DailyFormStats.FORM_OPERATOR_QUALIFICATION, today=today, week_start=today - timedelta(days=7)
+        )
         
         context.update(get_pwa_context(self.request))
         return context
@@ -2333,6 +2295,88 @@ def operator_qualification_detail(request, pk):
     
     return JsonResponse(data)
 
+# ==============================================================================
+# IMEI TRACEABILITY
+# ==============================================================================
+
+IMEI_LOOKUP_MAX = 5000
+IMEI_DETAIL_URLS = {
+    'ipqc.ipqcdisassemblechecklist': ('disassemble', 'ipqc_disassemble_detail'),
+    'ipqc.testingfirstarticleinspection': ('fai', 'testing_fai_detail'),
+}
+
+
+@login_required
+@role_required(["IPQC", "QA"])
+@require_http_methods(["GET", "POST"])
+def imei_history(request):
+    """
+    Every disassemble and FAI inspection of one or many IMEIs, in one call.
+
+    GET ``?imei=`` (repeated or comma separated) for a few handsets; POST a
+    JSON body ``{"imeis": [...]}`` for customer-return batches of up to
+    IMEI_LOOKUP_MAX IMEIs.
+    """
+    if request.method == 'POST':
+        try:
+            raw = json.loads(request.body or b'{}').get('imeis')
+        except (ValueError, AttributeError):
+            return JsonResponse({'error': 'Expected a JSON object with an "imeis" list'}, status=400)
+        if not isinstance(raw, list):
+            return JsonResponse({'error': 'Expected a JSON object with an "imeis" list'}, status=400)
+    else:
+        raw = [value for param in request.GET.getlist('imei') for value in param.split(',')]
+
+    imeis, invalid = [], []
+    for value in raw:
+        imei = normalize_imei(value)
+        if imei is None:
+            invalid.append(value)
+        elif imei not in imeis:
+            imeis.append(imei)
+    if not imeis:
+        return JsonResponse({'error': 'No IMEI given'}, status=400)
+    if len(imeis) > IMEI_LOOKUP_MAX:
+        return JsonResponse({'error': f'At most {IMEI_LOOKUP_MAX} IMEIs per request'}, status=400)
+
+    history = IMEIRecord.objects.history(imeis)
+    for inspections in history.values():
+        for inspection in inspections:
+            form, url_name = IMEI_DETAIL_URLS[inspection.pop('model_label')]
+            inspection['form'] = form
+            inspection['detail_url'] = reverse(url_name, args=[inspection['id']])
+    return JsonResponse({
+        'results': history,
+        'not_found': [imei for imei in imeis if imei not in history],
+        'invalid': invalid,
+    })
+
+# ==============================================================================
+# BULK EXPORT
+# ==============================================================================
+
+@login_required
+@role_required(["IPQC", "QA"])
+@require_GET
+def export_checklist(request, form):
+    """
+    Stream every ``form`` checklist matching ``?date_from=&date_to=&line=&model=``
+    as CSV, or as XLSX with ``?format=xlsx``.
+    """
+    model = EXPORT_MODELS.get(form)
+    if model is None:
+        raise Http404("Unknown checklist")
+    columns = export_columns(model)
+    queryset = filter_export(model.objects.all(), request.GET)
+    filename = f"{form}-{timezone.localdate():%Y%m%d}"
+    return streaming_export(
+        [column.name for column in columns],
+        export_rows(queryset, columns),
+        filename,
+        file_format=request.GET.get('format', 'csv'),
+        sheet_name=str(model._meta.verbose_name_plural),
+    )
+
 # ==============================================================================
 # PWA API ENDPOINTS
 # ==============================================================================
@@ -0,0 +1,105 @@
+"""
+Lark Bitable webhook: status changes for IPQC work info.
+
+The endpoint only parses the events and inserts them into
+BitableWebhookEvent with one statement; redeliveries of events carrying a
+Lark event id are dropped by the unique event_id. The worker then applies the queue in batches: the
+latest status per (emp_id, model, date) is written to IPQCWorkInfo with a
+single CASE/WHEN UPDATE.
+"""
+from datetime import datetime
+
+import pytz
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from .models import BitableWebhookEvent, IPQCWorkInfo
+
+APPLY_BATCH_SIZE = 1000
+
+
+def parse_date(value):
+    """Bitable dates arrive as ms timestamps (IST midnight) or as YYYY-MM-DD strings."""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000, tz=pytz.timezone("Asia/Kolkata")).date()
+    if isinstance(value, str):
+        value = value.strip()
+        if value.isdigit():
+            return parse_date(int(value))
+        return datetime.strptime(value[:10], "%Y-%m-%d").date()
+    raise ValueError(f"Unsupported date {value!r}")
+
+
+def event_id_for(event):
+    """
+    Lark's event id, or None when the payload has none. The automation
+    trigger sends only the fields, and two identical field sets are not the
+    same event (a status can go A -> B -> A), so those are never deduplicated;
+    applying the latest status twice is harmless.
+    """
+    header = event.get("header") or {}
+    event_id = event.get("event_id") or header.get("event_id") or event.get("uuid")
+    return str(event_id)[:128] if event_id else None
+
+
+def parse_events(payload):
+    """
+    Accepts a single event ({"fields": {...}}) or a batch ({"events": [...]}).
+    Returns (unsaved BitableWebhookEvent rows, number of invalid events).
+    """
+    raw_events = payload.get("events") if isinstance(payload.get("events"), list) else [payload]
+    events, seen, invalid = [], set(), 0
+    for event in raw_events:
+        fields = (event or {}).get("fields") or {}
+        emp_id, model_name, status = fields.get("Emp_ID"), fields.get("Model"), fields.get("Status")
+        try:
+            date = parse_date(fields.get("Date"))
+        except (TypeError, ValueError, OverflowError, OSError):
+            date = None
+        if not all([emp_id, model_name, date, status]):
+            invalid += 1
+            continue
+        event_id = event_id_for(event)
+        if event_id is not None:
+            if event_id in seen:
+                continue
+            seen.add(event_id)
+        events.append(BitableWebhookEvent(
+            event_id=event_id, emp_id=str(emp_id)[:20], model=str(model_name)[:100], date=date, status=str(status)[:50]
+        ))
+    return events, invalid
+
+
+def enqueue_events(events):
+    """Insert the events in one statement; ones whose Lark event id was already received are ignored."""
+    BitableWebhookEvent.objects.bulk_create(events, ignore_conflicts=True)
+
+
+def apply_pending_events(limit=APPLY_BATCH_SIZE):
+    """Apply one batch of queued status changes. Returns the number of events consumed."""
+    with transaction.atomic(using=BitableWebhookEvent.objects.db):
+        events = list(
+            BitableWebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True)
+            .order_by("id")
+            .values_list("id", "emp_id", "model", "date", "status")[:limit]
+        )
+        if not events:
+            return 0
+
+        # Latest event per work-info key wins.
+        latest = {}
+        for _, emp_id, model_name, date, status in events:
+            latest[(emp_id, model_name, date)] = status
+
+        match = Q()
+        whens = []
+        for (emp_id, model_name, date), status in latest.items():
+            key = Q(emp_id=emp_id, model=model_name, date=date)
+            match |= key
+            whens.append(When(key, then=Value(status)))
+        IPQCWorkInfo.objects.filter(match).update(status=Case(*whens, default=F("status")))
+
+        BitableWebhookEvent.objects.filter(pk__in=[event[0] for event in events]).update(processed_at=timezone.now())
+    return len(events)
@@ -5,8 +5,11 @@ LARK_APP_ID = "cli_a802ed86e438d028"
 LARK_APP_SECRET = "mfbtudMamxM9nKq5tUoh43AJNJT7iJWu"
 BITABLE_APP_TOKEN = "UbZRbYrtqaDGwMsY9WmlqhAmgGf"
 TABLE_ID = "tblq3hkrNHWvvVJz"
+TIMEOUT = (3.05, 15)  # connect, read
 # ----------------------------------------
 
+session = requests.Session()
+
 def get_lark_access_token():
     """Get Lark tenant access token"""
     url = "https://open.larkoffice.com/open-apis/auth/v3/tenant_access_token/internal/"
@@ -14,7 +17,7 @@ def get_lark_access_token():
     data = {"app_id": LARK_APP_ID, "app_secret": LARK_APP_SECRET}
 
     try:
-        resp = requests.post(url, headers=headers, json=data)
+        resp = session.post(url, headers=headers, json=data, timeout=TIMEOUT)
         resp.raise_for_status()
         token = resp.json().get("tenant_access_token")
         print("✅ Tenant Access Token:", token)
@@ -33,7 +36,7 @@ def fetch_table_schema():
     headers = {"Authorization": f"Bearer {token}"}
 
     try:
-        resp = requests.get(url, headers=headers)
+        resp = session.get(url, headers=headers, timeout=TIMEOUT)
         print("Status code:", resp.status_code)
         data = resp.json()
 
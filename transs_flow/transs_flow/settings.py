@@ -231,6 +231,30 @@ LARK_TABLE_ESD_COMPLIANCE = "tblZbqVZw4X3HCzA"
 LARK_TABLE_DUST_MEASUREMENT = "tblq4hfUqiEnnAYn"
 LARK_TABLE_TESTING_FAI = "tblckPOHzkHQGbFN"
 
+# Lark HTTP client (ipqc/lark_client.py)
+LARK_HTTP_TIMEOUT = (3.05, 15)      # (connect, read) seconds
+LARK_HTTP_RETRIES = 3               # retries for idempotent calls
+LARK_HTTP_POOL_SIZE = 10            # keep-alive connections per process
+
+# Lark API rate limit (requests/second per app and endpoint). The limiter halves
+# its rate on throttle responses and climbs back towards this ceiling.
+LARK_RATE_LIMIT = 10
+LARK_RATE_LIMITS = {                # per-endpoint ceilings overriding LARK_RATE_LIMIT
+    "auth/v3/tenant_access_token/internal": 5,
+}
+
+# Seconds before expiry at which the cached tenant_access_token is refreshed
+LARK_TOKEN_REFRESH_MARGIN = 300
+
+# Lark Bitable outbox worker (manage.py run_bitable_worker)
+LARK_OUTBOX_MAX_ATTEMPTS = 8        # attempts before a row is marked FAILED
+LARK_OUTBOX_BACKOFF_BASE = 30       # seconds, doubled on every failed attempt
+LARK_OUTBOX_BACKOFF_MAX = 3600      # seconds
+LARK_BATCH_CREATE_LIMIT = 500       # records per records/batch_create call
+LARK_MEDIA_UPLOAD_WORKERS = 4       # parallel evidence photo uploads per worker
+LARK_UPDATE_COALESCE_SECONDS = 5    # edits to one record within this window go out as one update
+LARK_PULL_MODIFIED_FIELD = "Last Modified Time"  # ModifiedTime column pull_bitable_changes filters on
+
 
 AUTH_USER_MODEL = 'accounts.Employee'
 
@@ -248,6 +272,24 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Shared cache (Lark tenant token, rate limits, ...), e.g. on the same Redis as
+# channels: REDIS_CACHE_URL=redis://127.0.0.1:6379/1. Without it (dev boxes,
+# test runs) each process gets its own in-memory cache.
+REDIS_CACHE_URL = os.environ.get("REDIS_CACHE_URL", "")
+if REDIS_CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_CACHE_URL,
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 